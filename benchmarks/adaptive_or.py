@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+# Benchmark: an adaptive Or on a skewed distribution of values
+# - 95% of the values are matched by the last alternative
+# - "by type": Num() | Seq(Str()) | Str() on strings, the alternatives before Str() can't accept a str, so a plain Or
+#   skips them as cheaply as an adaptive one
+# - "same type": Seq(Num()) | Seq(Bool()) | Seq(Str()) on lists of strings, a plain Or validates the failing
+#   sequences first, an adaptive Or learns to try Seq(Str()) first, and only checks the ones declared before it with
+#   is_valid(), which stops at the first item, so the results are the same as the plain Or's
+
+import random, timeit
+from validdict import *
+
+VALUES = 20_000
+REPEAT = 3
+
+random.seed(1)
+cases = {
+    "by type": (
+        lambda adaptive: Or(Num(), Seq(Str()), Str(), adaptive=adaptive),
+        [ random.choice(("a", "b", "c")) if random.random() < 0.95 else random.choice((1, 2.5, ["a"])) for _ in range(VALUES) ]),
+    "same type": (
+        lambda adaptive: Or(Seq(Num()), Seq(Bool()), Seq(Str()), adaptive=adaptive),
+        [ [ random.choice(("a", "b", "c")) ] * 20 if random.random() < 0.95 else [ 1 ] * 20 for _ in range(VALUES) ]),
+}
+
+for case, (alternatives, values) in cases.items():
+    document = { "values": values }
+    schemas = { name: Schema({ "values": Seq(alternatives(adaptive)) }).compile() for name, adaptive in (("plain", False), ("adaptive", True)) }
+    assert repr(schemas["plain"].validate(document)) == repr(schemas["adaptive"].validate(document))
+    for detail in (Detail.FULL, Detail.NON_PASS):
+        for name, schema in schemas.items():
+            seconds = min(timeit.repeat(lambda: schema.validate(document, detail=detail), number=1, repeat=REPEAT))
+            print(f"{case:>9} {detail.name:>8} {name:>8}: {seconds * 1000:8.1f} ms  {VALUES / seconds / 1000:8.1f} k values/s")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+# Benchmark: validating a wide map
+# - a 10k key document produces 30k+ results, one for each key, and two for each Or'd value
+# - result messages and comments are rendered lazily, the "eager" runs read every message and comment
+#   right after validation, which is what every result used to pay for up front
+
+import timeit, tracemalloc
+from validdict import *
+
+KEYS = 10_000
+REPEAT = 5
+
+schema = Schema({
+    OptionalKey(f"key{i}", comment="optional key"): Str(comment="string value") | Num(gte=0, comment="numeric value")
+    for i in range(KEYS)
+}).compile()
+document = { f"key{i}": "value" if i % 2 else i for i in range(KEYS) }
+
+
+def lazy():
+    return schema.validate(document)
+
+def eager():
+    results = schema.validate(document)
+    for result in results:
+        result.message, result.comment
+    return results
+
+def peak_allocation(func) -> int:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+print(f"{len(lazy())} results for a {KEYS} key map")
+for name, func in (("eager", eager), ("lazy", lazy)):
+    seconds = min(timeit.repeat(func, number=1, repeat=REPEAT))
+    print(f"{name:>6}: {seconds * 1000:8.1f} ms  {peak_allocation(func) / 1024 / 1024:8.1f} MiB peak")
@@ -1,5 +1,5 @@
 import pytest
-from validdict import Any
+from validdict import Any, Schema, Str, Num, Seq, Map, Or, OtherKeys
 from validdict.contextual import ContextualValidator, CallbackValidator # objects under test
 
 
@@ -50,3 +50,16 @@ class TestCallbackValidator:
         results = validator.validate({ "key": "value" }, context=self.test_context)
         assert not results
 
+
+    def test_path_dependent_callback_is_valid(self):
+        validator = CallbackValidator(lambda cc: Str() if cc.path[-1] == "a" else Num())                 # the callback indexes the path
+        schema = Schema({ "a": validator, "b": validator })
+        for document in ({ "a": "x", "b": 1 }, { "a": 1, "b": "x" }):
+            assert schema.is_valid(document) == bool(schema.validate(document)) == bool(schema.compile().validate(document))
+        assert schema.is_valid({ "a": "x", "b": 1 })
+
+        validator = CallbackValidator(lambda cc: Str() if str(cc.path).endswith("a") else Num())
+        for value in ({ "s": [ { "a": "x" } ] }, { "s": [ { "a": 1 } ] }, { "s": [ { "b": 1 } ] }):
+            schema = Schema({ "s": Seq(Or(Map({ "a": validator }), Map({ OtherKeys(): Num() }))) })
+            assert schema.is_valid(value) == bool(schema.validate(value))
+        assert schema.validator._reads_path() and not Map({ "a": Num(), "s": Seq(Str() | Num()) })._reads_path()  # only then are paths built for is_valid()
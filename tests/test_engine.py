@@ -0,0 +1,59 @@
+import pickle
+import sys
+from validdict import Schema, Map, Seq, Str, Num, Any, OptionalKey, OtherKeys, CallbackValidator, Detail # objects under test
+from validdict.engine import compile_iterative, _Planner
+
+
+def callback(cc):
+    return Num() if cc.context is not None else Any()
+
+
+TREE = Map({ "name": Str(), OptionalKey("children"): Seq(CallbackValidator(lambda cc: TREE)) })
+
+
+def build_tree(depth, name="leaf"):
+    document = { "name": name }
+    for i in range(depth):
+        document = { "name": f"node {i}", "children": [ document ] }
+    return document
+
+
+class TestEngine:
+
+    def test_same_results(self, monkeypatch):
+        # Test that walking every validator gives the same results as validate(), at every detail level
+        monkeypatch.setattr(_Planner, "_leaf_depth", 0)
+        schema = {
+            "map": Map({ "a": Num(), "b": Seq(Str(), min_len=2) }),
+            "seq": Seq(CallbackValidator(callback)),
+            "or": Str() | Seq(Num(), columnar=True) | Map({ "a": CallbackValidator(callback) }),
+            OtherKeys(): Num(),
+        }
+        documents = [
+            { "map": { "a": 1, "b": [ "x", "y" ] }, "seq": [ 1, 2 ], "or": "s" },
+            { "map": { "a": "1", "b": [ 1 ], "c": 2 }, "seq": [ "x" ], "or": { "a": "x" }, "other": "x" },
+            { "map": [], "seq": {}, "or": [ 1, "x" ] },
+            "not a dict",
+        ]
+        for detail in Detail:
+            compiled = compile_iterative(Schema(schema).validator, detail)
+            for document in documents:
+                expected = Schema(schema).validate(document, detail=detail)
+                actual = compiled(document, None, document)
+                assert [ repr(result) for result in actual ] == [ repr(result) for result in expected ]
+                assert actual._counts == expected._counts and bool(actual) == bool(expected)
+
+    def test_deep_documents(self):
+        schema = Schema(TREE).compile(iterative=True)
+        depth = sys.getrecursionlimit() * 10
+        assert schema.validate(build_tree(depth))
+        results = schema.validate(build_tree(depth, name=1), detail=Detail.INVALID_ONLY)
+        assert not results
+        assert len(results) == 1
+
+    def test_schema_compile_iterative(self):
+        schema = Schema(TREE).compile(iterative=True)
+        assert schema.iterative
+        assert schema.validate(build_tree(3))
+        assert pickle.loads(pickle.dumps(Schema({ "a": Num() }).compile(iterative=True))).iterative
+        assert not Schema(TREE).compile().iterative
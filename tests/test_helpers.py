@@ -1,5 +1,5 @@
 import pytest
-from validdict.helpers import format_sequence, path_padding, format_path, extend_path # objects under test
+from validdict.helpers import format_sequence, path_padding, format_path, extend_path, Path # objects under test
 
 
 class TestHelpers:
@@ -106,3 +106,34 @@ class TestHelpers:
         path = []
         expected_result = []
         assert extend_path(path) == expected_result
+
+    def test_path(self):
+        # Test that extending a path shares the parent instead of copying it
+        parent = extend_path(key="home")
+        child1 = extend_path(parent, "sperry")
+        child2 = extend_path(parent, "item_{}", 2)
+        assert isinstance(child1, Path)
+        assert child1.parent is parent and child2.parent is parent
+        assert len(child1) == 2
+        assert child1 == ["home", "sperry"]
+        assert child2 == ["home", "item_2"]
+        assert child2[-1] == "item_2"
+        assert list(child2) == ["home", "item_2"]
+        assert str(child2) == "home.item_2"
+        assert repr(child2) == "['home', 'item_2']"
+
+        # Test that labels are only formatted when read
+        child3 = extend_path(parent, "Key('{}')", 3)
+        assert child3._label == "Key('{}')"
+        assert child3.label == "Key('3')"
+
+        # Test conversion from a list, and formatting non-string labels
+        path = Path.from_list(["home", 1])
+        assert path == ["home", 1]
+        assert format_path(path) == "    home.1"
+        assert Path() == []
+
+        # Test that patterns replace the label arguments
+        item = extend_path(extend_path(path, "item_{}", 7), "key")
+        assert str(item) == "home.1.item_7.key"
+        assert item.to_pattern() == "home.1.item_*.key"
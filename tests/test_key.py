@@ -1,5 +1,8 @@
 import pytest
-from validdict import Schema, Any, Num, Outcome
+from validdict import Schema, Any, Num, Outcome, Detail
+from validdict.scalars import ScalarValidator
+from validdict.validator import Validator
+from validdict.locator import Locator
 from validdict import RequiredKey, OptionalKey, OtherKeys, StartsWith # objects under test
 
 
@@ -177,3 +180,46 @@ class TestKeyValidators:
         results = schema.validate({"prefix_age": 25})
         assert len(results.filter(Outcome.FAIL)) == 0
         assert results
+
+    def test_cached_key_validators(self):
+        """
+        Tests that key validators build their name validators once and reuse them
+        - Asserts that a fixed key name's validator is built at construction
+        - Asserts that OtherKeys shares one validator per key type, with the same messages as fresh validators
+        - Asserts that validators built per key name are cached, least recently used first out
+        """
+        key = RequiredKey("name")
+        assert key._validator is not None
+        assert key.validate("name")
+        assert not key.validate("other")
+        assert key.compile()("name", None, None)
+
+        key = OtherKeys()
+        assert key.validate("extra") and key.validate("extra")
+        assert key.is_valid(1)
+        assert set(key._key_names) == {str, int} and key._validators == {}
+        for name in ("extra", "other", 1, 2.5, float("nan"), True):
+            assert key.validate(name).validator is key._validator_for(type(name)())
+            assert repr(key.validate(name)) == repr(Validator.for_value(name).validate(name))
+            for detail in Detail:
+                assert repr(key.compile(detail)(name, None, None)) == repr(detail.apply(Validator.for_value(name).validate(name)))
+        for i in range(OtherKeys._cache_size + 1):
+            assert key.compile()(f"key_{i}", None, None)
+        assert len(key._key_names) == 4                                                            # str, int, float and bool
+
+        class Name(str): pass
+        class NameValidator(ScalarValidator):
+            def __init__(self, *accepted_values, **outcomes):
+                super().__init__((Name,), accepted_values, **outcomes)
+        Locator.register(Name, NameValidator)
+        try:
+            for i in range(OtherKeys._cache_size + 1):
+                assert key.validate(Name(f"key_{i}")) and key.validate(Name("key_1"))
+            assert len(key._validators[Name]) == OtherKeys._cache_size
+            assert Name("key_1") in key._validators[Name] and Name("key_0") not in key._validators[Name]
+            assert isinstance(key.validate(Name("key_0")).validator, NameValidator)
+        finally:
+            del Locator()._components[Name]
+
+        with pytest.raises(TypeError):
+            key.validate(object())
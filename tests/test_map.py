@@ -1,6 +1,7 @@
 import pytest
-from validdict import RequiredKey, OptionalKey, Str, StartsWith, OtherKeys, Any
-from validdict.map import Map # object under test
+from validdict import RequiredKey, OptionalKey, Str, Num, StartsWith, OtherKeys, Any, Outcome
+from validdict import Or, Detail
+from validdict.map import Map, OneOf # objects under test
 
 
 class TestMap:
@@ -84,3 +85,151 @@ class TestMap:
         assert not validator.validate({"wrong-key": "value"})
         assert not validator.validate("string")
 
+    def test_routed_starts_with_validation(self):
+        validator = Map({
+            StartsWith("x-acme-", "x-foo-"): Num(),
+            StartsWith("Y-", case_sensitive=False): Str(),
+            OtherKeys(): Any(),
+        })
+        assert validator.validate({"x-acme-key": 1, "x-foo-key": 2, "y-key": "a", "Y-KEY": "b"})
+        assert not validator.validate({"x-acme-key": "a"})
+        assert not validator.validate({"y-key": 1})
+        assert validator.validate({"X-ACME-key": "a"})                                              # case_sensitive, so it's an OtherKeys()
+        assert validator.is_valid({"x-acme-key": 1, "Y-key": "a"})
+
+        class Name(str): pass
+        validator = Map({ "key": Any(), StartsWith("x-"): Num(), StartsWith("Y-", case_sensitive=False): Str() })
+        for value, valid in (({"key": 1, Name("x-a"): 1, Name("y-b"): "a"}, True), ({"key": 1, Name("x-a"): "a"}, False), ({Name("key"): 1}, False)):  # any str can start with a prefix, only a str is a fixed name
+            assert validator.is_valid(value) == bool(validator.validate(value)) == bool(validator.compile()(value, None, None)) == valid
+        assert "must start with 'x-'" in repr(validator.validate({"key": 1, Name("x-a"): 1}))
+
+    def test_missing_required_keys(self):
+        validator = Map({ "a": Any(), "b": Any(), "c": Any(), OtherKeys(): Any() })
+        assert validator._missing_required_keys({"a": 1, "b": 2, "c": 3}) == []
+        assert validator._missing_required_keys({"c": 3, "other": 4}) == ["a", "b"]
+        results = [ result for result in validator.validate({"b": 2}) if result.outcome == Outcome.FAIL ]
+        assert len(results) == 1
+        assert results[0].value == "a, c"
+        assert results[0].message == "missing required key(s)"
+
+        # any key satisfies a required key that doesn't FAIL when it's missing
+        validator = Map({ RequiredKey("a", invalid_outcome=Outcome.WARN): Any(), RequiredKey(Num(1)): Any(), OtherKeys(): Any() })
+        assert validator._missing_required_keys({}) == ["a", validator.required_keys[1].accepted_name]
+        assert validator._missing_required_keys({"b": 2}) == [validator.required_keys[1].accepted_name]
+        assert validator._missing_required_keys({1: 2}) == []
+
+        # only a str key can be a fixed key name, a str subclass that's equal to it is an unknown key
+        class Name(str): pass
+        validator = Map({ "a": Any(), "b": Any() })
+        assert validator._missing_required_keys({Name("a"): 1, "b": 2}) == ["a"]
+        assert Map({ "a": Any(), RequiredKey(Num(1)): Any() })._missing_required_keys({Name("a"): 1, 1: 2}) == ["a"]
+        for value in ({Name("a"): 1, "b": 2}, {"a": 1, "b": 2, Name("c"): 3}):
+            results = validator.validate(value)
+            assert [ repr(result) for result in validator.compile()(value, None, None) ] == [ repr(result) for result in results ]
+            assert not validator.is_valid(value) and not results
+        assert [ result.message for result in validator.validate({Name("a"): 1, "b": 2}) if not result ] == ["missing required key(s)", "unknown key name"]
+
+    def test_indexed_key_validation(self):
+        validator = Map({
+            "key": Str(),
+            OptionalKey("optional"): Num(),
+            StartsWith("x-"): Any(),
+            OtherKeys(): Num(),
+        })
+        assert set(validator._key_index.keys()) == {"key", "optional"}
+        assert validator.validate({"key": "value", "optional": 1, "x-key": None, "other": 1})
+        assert not validator.validate({"key": "value", "other": "value"})
+
+        validator = Map({
+            RequiredKey(Str()): Num(),                                                              # declared first, so it wins over the fixed key below
+            "key": Str(),
+        })
+        assert validator._key_index["key"] == (validator.keys[0], validator.keys[1])
+        assert validator.validate({"key": 1})
+        assert not validator.validate({"key": "value"})
+
+
+    def test_compiled_map_validation(self):
+        validator = Map({
+            RequiredKey(Str()): Num(),                                                              # declared first, so it wins over the fixed key below
+            "key": Str(),
+        })
+        compiled = validator.compile()
+        for value in ({}, {"key": "value"}, {"key": 1}, {"other": 1}, {1: 1}, "string"):
+            assert repr(compiled(value, None, value)) == repr(validator.validate(value, context=value))
+        assert compiled({"key": 1}, None, None)
+        assert not compiled({"key": "value"}, None, None)
+
+    def test_or_of_maps_shape_check(self):
+        calls = []
+        small, large = Map({ "name": Str(), OptionalKey("size"): Num() }), Map({ "name": Str(), "size": Num(), "tags": Any() })
+        small.validate = lambda value, path=None, context=None: calls.append(value) or Map.validate(small, value, path, context)
+        assert small._accepts_shape({ "name": "x" })
+        assert not small._accepts_shape({ "size": 1 })                                              # missing a required key
+        assert not small._accepts_shape({ "name": "x", "tags": [] })                                # no key for "tags"
+        assert Map({ "name": Str(), OtherKeys(): Any() })._accepts_shape({ "name": "x", "tags": [] })
+        assert Map({ "name": Str(), StartsWith("t"): Any() })._accepts_shape({ "name": "x", "tags": [] })
+
+        or_validator = Or(small, large)
+        value = { "name": "x", "size": 1, "tags": [] }
+        results = or_validator.validate(value)
+        assert results and calls == []                                                              # small can't be valid, it's never run
+        assert [ str(result.path) for result in results ][:2] == [ "None", "Or(Map(...))" ]
+        assert repr(or_validator.compile()(value, None, None)) == repr(results)
+        results = or_validator.validate({ "name": 1, "tags": [] })
+        assert not results and len(calls) == 1                                                     # only run to report its failures
+        assert [ str(result.path) for result in results ][:2] == [ "None", "Or(Map(...))" ]
+        for detail in Detail:
+            compiled = or_validator.compile(detail)
+            for value in ({ "name": "x" }, { "name": "x", "size": 1, "tags": [] }, { "name": 1, "tags": [] }, {}):
+                assert repr(compiled(value, None, None)) == repr(detail.apply(or_validator.validate(value)))
+
+
+class TestOneOf:
+
+    def test_one_of_constructor(self):
+        with pytest.raises(TypeError):
+            OneOf(Map({ "kind": Str("A") }), Map({ "kind": Str("B") }), discriminator="")
+        with pytest.raises(TypeError):
+            OneOf(Map({ "kind": Str("A") }), Num(), discriminator="kind")
+        with pytest.raises(TypeError):
+            OneOf(Map({ "kind": Str("A") }), Map({ "kind": Str() }), discriminator="kind")               # no literal tags
+        with pytest.raises(TypeError):
+            OneOf(Map({ "kind": Str("A") }), Map({ OptionalKey("kind"): Str("B") }), discriminator="kind")
+        with pytest.raises(TypeError):
+            OneOf(Map({ "kind": Str("A") }), Map({ "kind": Str("A", "B") }), discriminator="kind")      # ambiguous tag
+
+    def test_one_of_validation(self):
+        alternatives = (Map({ "kind": Str("A"), "size": Num() }), Map({ "kind": Str("B", "b"), "name": Str() }))
+        validator, or_validator = OneOf(*alternatives, discriminator="kind"), Or(*alternatives)
+        for value in ({ "kind": "A", "size": 1 }, { "kind": "b", "name": "x" }):
+            results = validator.validate(value)
+            assert results
+            assert [ repr(result) for result in results ][1:] == [ repr(result) for result in or_validator.validate(value) ][1:]
+        results = validator.validate({ "kind": "B", "size": 1 })
+        assert not results
+        assert len(results) == 6                                                                    # only the B alternative's results
+        results = validator.validate({ "kind": "C" })
+        assert not results
+        assert "must be a known 'kind' tag: one of ('A', 'B', 'b')" in repr(results)
+        assert not validator.validate({ "size": 1 })
+        assert not validator.validate("A")
+        for detail in Detail:
+            compiled = validator.compile(detail)
+            for value in ({ "kind": "A", "size": 1 }, { "kind": "B", "size": 1 }, { "kind": [ "A" ] }, {}, "A"):
+                assert repr(compiled(value, None, None)) == repr(detail.apply(validator.validate(value)))
+                assert validator.is_valid(value) == bool(validator.validate(value))
+
+    def test_one_of_composition(self):
+        one_of = OneOf(Map({ "kind": Str("A"), "size": Num() }), Map({ "kind": Str("B"), "name": Str() }), discriminator="kind")
+        validator = one_of | Str()
+        assert validator.validators == [ one_of, validator.validators[1] ]                          # a OneOf isn't flattened into the Or
+        assert repr(validator) == "must be OneOf(...) | Str(...)"
+        results = validator.validate({ "kind": "Z" })
+        assert not results
+        assert "must be a known 'kind' tag: one of ('A', 'B')" in repr(results)
+        assert len(results) == 4                                                                    # the Or, the OneOf, its unknown tag, and Str()
+        assert validator.validate({ "kind": "B", "name": "x" }) and validator.validate("x")
+        for detail in Detail:
+            for value in ({ "kind": "Z" }, { "kind": "A", "size": 1 }, "x"):
+                assert repr(validator.compile(detail)(value, None, None)) == repr(detail.apply(validator.validate(value)))
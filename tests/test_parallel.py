@@ -0,0 +1,61 @@
+import json
+import pickle
+import pytest
+from validdict.validator import Outcome
+from validdict import Str, Num, Seq, Map, OptionalKey, Any, Schema, Detail
+from validdict.results import ResultSummary
+from validdict.__main__ import main
+from validdict.parallel import validate_parallel, load_schema # objects under test
+
+SCHEMA = Schema({ "key1": Str("value1"), "key2": Seq(Num() | Map({ "a": Num() })), OptionalKey("key3", valid_outcome=Outcome.WARN): Any() })
+
+
+class TestParallel:
+
+    def test_schema_pickling(self):
+        schema = pickle.loads(pickle.dumps(SCHEMA))
+        document = { "key1": "value2", "key2": [ 1, { "a": "x" } ], "key3": 3 }
+        assert repr(schema.validate(document)) == repr(SCHEMA.validate(document))
+
+    def test_load_schema(self):
+        assert isinstance(load_schema("tests.test_parallel:SCHEMA"), Schema)
+        assert repr(load_schema("tests.test_parallel:SCHEMA.validator")) == repr(SCHEMA)
+        with pytest.raises(TypeError):
+            load_schema("tests.test_parallel.SCHEMA")
+
+    def test_validate_parallel(self):
+        documents = [ { "key1": "value1" if i % 3 else "x", "key2": [ i, { "a": i if i % 2 else "y" } ], "key3": i } for i in range(20) ]
+        for detail in (Detail.FULL, Detail.INVALID_ONLY):
+            results = list(validate_parallel("tests.test_parallel:SCHEMA", iter(documents), workers=2, chunk_size=3, detail=detail, max_failures=1))
+            expected = list(SCHEMA.validate_many(documents, detail=detail, max_failures=1))
+            assert [ repr(r) for r in results ] == [ repr(r) for r in expected ]
+            assert [ (bool(r), r.fail_count, r.warn_count, r.truncated) for r in results ] == [ (bool(r), r.fail_count, r.warn_count, r.truncated) for r in expected ]
+
+        # Test that a pickled schema gives the same results
+        results = list(validate_parallel(SCHEMA, documents[:4], workers=2))
+        assert [ repr(r) for r in results ] == [ repr(SCHEMA.validate(d)) for d in documents[:4] ]
+
+        with pytest.raises(TypeError):
+            list(validate_parallel(Schema({ "key": Str(lambda: "x") }), documents))
+        with pytest.raises(TypeError):
+            list(validate_parallel(SCHEMA, documents, chunk_size=0))
+
+    def test_validate_jsonl(self, tmp_path):
+        documents = [ { "key1": "value1" if i % 3 else "x", "key2": [ i, { "a": i if i % 2 else "y" } ] } for i in range(12) ]
+        lines = [ json.dumps(document) for document in documents ] + [ "", "{ not json" ]
+        path = tmp_path / "documents.jsonl"
+        path.write_text("\n".join(lines))
+
+        expected = [ (n, repr(results)) for n, results in enumerate(SCHEMA.validate_many(documents, detail=Detail.NON_PASS), 1) if not results ]
+        for shard_size in (1, 64, 1 << 22):
+            summary = ResultSummary()
+            results = list(SCHEMA.validate_jsonl(str(path), workers=2, shard_size=shard_size, summary=summary))
+            assert [ (n, repr(r)) for n, r in results[:-1] ] == expected
+            assert results[-1][0] == 14 and not results[-1][1]
+            assert "must be a JSON document" in repr(results[-1][1])
+            assert (summary.document_count, summary.invalid_count) == (13, len(expected) + 1)
+
+        # Test the command line
+        assert main([ "tests.test_parallel:SCHEMA", str(path), "--workers", "1" ]) == 1
+        path.write_text(lines[1] + "\n")
+        assert main([ "tests.test_parallel:SCHEMA", str(path), "--workers", "1" ]) == 0
@@ -1,5 +1,6 @@
 import pytest
-from validdict.results import Outcome, OutcomeProvider, FixedOutcome, Result, ResultSet # objects under test
+from validdict.helpers import Path
+from validdict.results import Outcome, OutcomeProvider, FixedOutcome, Result, ResultSet, ColumnarResultSet # objects under test
 
 
 class TestOutcomeProvider:
@@ -60,6 +61,15 @@ class TestResult:
         with pytest.raises(TypeError):
             Result(Outcome.NONE, "value", [], "not a validator")
 
+    def test_result_lazy_message(self):
+        fo = FixedOutcome(Outcome.PASS, message="a message", comment="a comment")
+        result = Result(Outcome.PASS, "value", [], fo)
+        assert not hasattr(result, "__dict__")
+        assert result._message is None and result._comment is None
+        assert result.message == "a message"
+        assert result.comment == " # a comment"
+        assert repr(result) == "'value' a message = 'PASS' # a comment"
+
     def test_result_or(self):
         fo = FixedOutcome(Outcome.PASS)
         results = Result(Outcome.PASS, "value1", [], fo) | Result(Outcome.PASS, "value2", [], fo)
@@ -146,3 +156,52 @@ class TestResultSet:
         assert len(results.filter(Outcome.FAIL)) == 1
         with pytest.raises(TypeError):
             results.filter("not an outcome enum")
+
+    def test_nested_result_sets(self):
+        fo = FixedOutcome(Outcome.PASS)
+        child = ResultSet(Result(Outcome.PASS, "value1", [], fo), Result(Outcome.PASS, "value2", [], fo))
+        parent = ResultSet(Result(Outcome.PASS, "value0", [], fo), child)
+        child.add_results(Result(Outcome.FAIL, "value3", [], fo))                                   # changing an added set doesn't change the parent
+        assert parent and len(parent) == 3
+        assert [ result.value for result in parent ] == [ "value0", "value1", "value2" ]
+        assert not child and len(child) == 3
+        assert [ result.value for result in child ] == [ "value1", "value2", "value3" ]
+
+        for results in (ResultSet(Result(Outcome.PASS, "value1", [], fo), Result(Outcome.FAIL, "value2", [], fo)),
+                        ColumnarResultSet(Result(Outcome.PASS, "value1", [], fo), Result(Outcome.FAIL, "value2", [], fo))):
+            results.add_results(results)                                                            # a set added to itself adds its results so far
+            assert len(results) == 4 and results.fail_count == 2
+            assert [ result.value for result in results ] == [ "value1", "value2" ] * 2
+            results.add_results(results, Result(Outcome.PASS, "value3", [], fo), results)
+            assert len(results) == 13 and results.fail_count == 6
+
+        results = ResultSet(Result(Outcome.FAIL, "leaf", [], fo))
+        for depth in range(5000):                                                                   # deeper than the recursion limit
+            results = ResultSet(Result(Outcome.PASS, depth, [], fo), results, Result(Outcome.PASS, depth, [], fo))
+        assert not results and len(results) == 10001
+        assert [ result.value for result in results ][4999:5002] == [ 0, "leaf", 0 ]
+
+    def test_outcome_counts(self):
+        results = ResultSet()
+        results.add_results(Result(Outcome.PASS, "value1", [], FixedOutcome(Outcome.PASS)))
+        results.add_results(ResultSet(Result(Outcome.INFO, "value2", [], FixedOutcome(Outcome.INFO)), Result(Outcome.WARN, "value3", [], FixedOutcome(Outcome.WARN))))
+        results.add_results(Result(Outcome.FAIL, "value4", [], FixedOutcome(Outcome.FAIL)), Result(Outcome.NONE, "value5", [], None))
+        assert (results.pass_count, results.info_count, results.warn_count, results.fail_count) == (1, 1, 1, 1)
+        assert results.result_count == 4 and len(results) == 5
+
+
+class TestColumnarResultSet:
+
+    def test_rows(self):
+        fo = FixedOutcome(Outcome.PASS)
+        results = ColumnarResultSet(Result(Outcome.PASS, "value0", ["key"], fo))
+        results.add_row(Outcome.PASS, 1, Path(None, "key"), fo, 0)
+        results.add_row(Outcome.FAIL, 2, Path(None, "key"), fo, 1)
+        assert len(results) == 3 and not results
+        assert results.pass_count == 2 and results.fail_count == 1
+        assert repr(results) == "  key:'value0'  = 'PASS'\n    key.item_0:'1'  = 'PASS'\n    key.item_1:'2'  = 'FAIL'"
+        assert [ result.value for result in results.filter(Outcome.FAIL) ] == [ 2 ]
+
+        parent = ResultSet(results)
+        results.add_row(Outcome.PASS, 3, Path(None, "key"), fo, 2)                                  # rows added later aren't part of the parent
+        assert len(parent) == 3 and len(list(parent)) == 3 and len(results) == 4
@@ -48,6 +48,15 @@ class TestStr:
         assert Str("A", "B").validate("A")
         assert Str("A", "B").validate("B")
         assert not Str("A", "B").validate("C")
+        assert Str("A", "B").is_valid("B")
+        assert not Str("A", "B").is_valid("C")
+        assert Str("a", case_sensitive=False).is_valid("A")
+        assert not Str().is_valid(1234)
+        assert Num(range(0, 10), gt=2).is_valid(5)
+        assert not Num(range(0, 10), gt=2).is_valid(1)
+        assert not Num().is_valid(True)
+        assert Regex(r"A", r"B").is_valid("B")
+        assert not Regex(r"A").is_valid(1234)
 
     def test_str_validation(self):
 
@@ -236,6 +245,20 @@ class TestNum:
         results = schema.validate({"key": 15})
         assert not results
 
+    def test_merged_range_num_validation(self):
+        validator = Num(range(0, 10), range(5, 20), range(30, 20, -1), range(40, 50, 2), 100, 2.5)
+
+        assert validator._interval_starts == (0, 21)                                                # overlapping ranges merged, descending range normalized
+        assert validator._interval_stops == (20, 31)
+        for value in (0, 19, 21, 30, 40, 48, 100, 2.5, 7.0):
+            assert validator.validate(value)
+        for value in (-1, 20, 31, 41, 50, 99, 7.5, float("nan"), "7", True):
+            assert not validator.validate(value)
+
+        validator = Str(*[f"code_{i}" for i in range(5000)])
+        assert validator.validate("code_4999")
+        assert not validator.validate("code_5000")
+
     def test_relational_num_validation(self):
         schema = Schema(
             {
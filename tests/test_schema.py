@@ -1,6 +1,10 @@
+import json
+import tracemalloc
 import pytest
 from validdict.validator import Outcome
 from validdict.results import Result, ResultSet, FixedOutcome
+from validdict import Str, Num, Bool, Regex, Seq, Map, Any, RequiredKey, OptionalKey, OtherKeys, StartsWith, CallbackValidator, Or
+from validdict import Detail
 from validdict import Schema # object under test
 
 
@@ -16,6 +20,136 @@ class TestSchema:
         schema = Schema({})
         assert schema.validate({})
 
+    def test_schema_compile(self):
+        schema_def = {
+            "key1": Str(),
+            "key2": CallbackValidator(lambda cc: Str(cc.context["key1"])),
+            "num": Num(range(0, 10), 20, gte=0),
+            "seq": Seq(Str("a", "B", case_sensitive=False) | Num(), min_len=1),
+            RequiredKey("warn", invalid_outcome=Outcome.WARN): Bool(),
+            OptionalKey("map"): Map({ "regex": Regex(r"\w+"), OtherKeys(): Any() }),
+            StartsWith("x-"): Any(),
+        }
+        documents = [
+            {},
+            { "key1": "v", "key2": "v", "num": 5, "seq": ["A", 1], "warn": True, "map": { "regex": "abc", "other": 1 }, "x-1": None },
+            { "key1": "v", "key2": "w", "num": 15, "seq": [], "map": { "regex": "a b" }, "unknown": 1 },
+            { "key1": 1, "seq": [True, "c"], "map": "not a map" },
+            "not a dict",
+        ]
+        schema = Schema(schema_def)
+        compiled = Schema(schema_def).compile()
+        assert compiled.compiled is not None
+        for document in documents:
+            assert repr(compiled.validate(document)) == repr(schema.validate(document))
+            assert bool(compiled.validate(document)) == bool(schema.validate(document))
+
+    def test_schema_is_valid(self):
+        schema = Schema({
+            "key1": Str(),
+            "key2": CallbackValidator(lambda cc: Str(cc.context["key1"])),
+            "seq": Seq(Num() | Str(), max_len=2),
+            RequiredKey("warn", invalid_outcome=Outcome.WARN): Bool(),
+            OptionalKey("map"): Map({ "regex": Regex(r"\w+") }),
+        })
+        documents = [
+            {},
+            { "key1": "v", "key2": "v", "seq": [1, "a"] },
+            { "key1": "v", "key2": "w", "seq": [1, "a"] },
+            { "key1": "v", "key2": "v", "seq": [1, "a", 2] },
+            { "key1": "v", "key2": "v", "seq": [], "map": { "regex": "a b" } },
+            { "key1": "v", "key2": "v", "seq": [], "unknown": 1 },
+            "not a dict",
+        ]
+        for document in documents:
+            assert schema.is_valid(document) == bool(schema.validate(document))
+
+    def test_schema_detail(self):
+        schema = Schema({
+            "key1": Str(),
+            "key2": CallbackValidator(lambda cc: Str(cc.context["key1"])),
+            "seq": Seq(Num() | Str(), max_len=2),
+            RequiredKey("warn", invalid_outcome=Outcome.WARN): Bool(),
+            OptionalKey("map"): Map({ "regex": Regex(r"\w+") }),
+        })
+        documents = [
+            {},
+            { "key1": "v", "key2": "v", "seq": [1, "a"], "warn": True },
+            { "key1": "v", "key2": "w", "seq": [1, None, 2] },
+            { "key1": "v", "key2": "v", "seq": [], "map": { "regex": "a b" }, "unknown": 1 },
+            "not a dict",
+        ]
+        for document in documents:
+            full = schema.validate(document)
+            for detail in Detail:
+                results = schema.validate(document, detail=detail)
+                assert [ repr(result) for result in results ] == [ repr(result) for result in full if detail.keeps(result.outcome, result.validator) ]
+                assert bool(results) == bool(full)
+                assert (results.pass_count, results.fail_count, results.warn_count) == (full.pass_count, full.fail_count, full.warn_count)
+
+        results = schema.validate(documents[2], detail=Detail.NON_PASS)
+        assert len(results) == results.fail_count + results.warn_count
+        assert len(schema.validate(documents[2], detail=Detail.COUNTS_ONLY)) == 0
+
+    def test_schema_max_failures(self):
+        schema = Schema({ "items": Seq(Num() | Str() | Map({ "a": Num() })) })
+
+        document = { "items": [ 1, "a", { "a": 2 } ] * 10 }
+        results = schema.validate(document, max_failures=1)                                         # failed Or alternatives aren't counted
+        assert results and not results.truncated
+        assert repr(results) == repr(schema.validate(document))
+
+        document = { "items": [ None ] * 1000 }
+        results = schema.validate(document, max_failures=5)
+        assert not results and results.truncated
+        assert results.fail_count < 50
+        results = schema.validate(document, detail=Detail.INVALID_ONLY, max_failures=5)
+        assert not results and results.truncated and len(results) < 50
+        assert not schema.validate(document).truncated
+
+        for schema, document in ((Schema(Seq(Num()) | Seq(Str())), [ "a", "b" ]), (Schema(Map({ "a": Seq(Num()) }) | Map({ OtherKeys(): Seq(Str()) })), { "a": [ "a", "b" ] })):
+            results = schema.validate(document, max_failures=1)                                     # the first alternative stops early, but it's discarded
+            assert results and not results.truncated
+            assert schema.summarize_many([ document ], max_failures=1).truncated_count == 0
+
+        with pytest.raises(TypeError):
+            schema.validate(document, max_failures=0)
+
+    def test_schema_validate_many(self):
+        schema = Schema({ "id": Num(gte=0), "tags": Seq(Str()), OptionalKey("warn", valid_outcome=Outcome.WARN): Any() })
+        documents = [ { "id": 1, "tags": [ "a" ] }, { "id": -1, "tags": [ "a", 2, 3 ] }, { "id": 2, "tags": [], "warn": 1 }, "not a dict" ]
+
+        results = schema.validate_many(iter(documents))
+        assert not isinstance(results, list)
+        assert [ repr(result) for result in results ] == [ repr(schema.validate(document)) for document in documents ]
+        for detail in Detail:
+            for max_failures in (None, 1):
+                assert [ repr(result) for result in schema.validate_many(documents, detail=detail, max_failures=max_failures) ] \
+                    == [ repr(schema.validate(document, detail=detail, max_failures=max_failures)) for document in documents ]
+
+        summary = schema.summarize_many(documents, max_failures=1)
+        assert (summary.document_count, summary.invalid_count, summary.truncated_count) == (4, 2, 1)
+        assert summary.outcome_counts[Outcome.FAIL] == 2 and summary.outcome_counts[Outcome.WARN] == 1
+        assert summary.path_counts == { "id": { Outcome.FAIL: 1 }, "OptionalKey(<value>)": { Outcome.WARN: 1 }, "": { Outcome.FAIL: 1 } }
+        summary = schema.summarize_many(documents)
+        assert summary.path_counts["tags.item_*"] == { Outcome.FAIL: 2 }
+
+    def test_schema_validate_records(self):
+        schema = Schema({ "id": Num(gte=0), "kind": Str("a", "b"), OptionalKey("score"): Num(range(0, 10)), "ctx": CallbackValidator(lambda cc: Num() if cc.context["kind"] == "a" else Str()) })
+        records = [
+            { "id": 1, "kind": "a", "ctx": 1 }, { "id": -1, "kind": "c", "ctx": 1 }, { "id": 2.5, "kind": "b", "ctx": "x", "score": 11 },
+            { "kind": "a", "id": 3, "ctx": "x" }, { "id": 4, "other": 1 }, "not a dict",
+        ]
+        for detail in Detail:
+            assert [ repr(results) for results in schema.validate_records(records, detail=detail) ] \
+                == [ repr(schema.validate(record, detail=detail)) for record in records ]
+        assert [ bool(results) for results in schema.validate_records(iter(records), context={ "kind": "b" }) ] == [ False, False, False, True, False, False ]
+        assert repr(Schema(Seq(Num())).validate_records([ [ 1 ], [ "x" ] ])) == repr([ Schema(Seq(Num())).validate([ 1 ]), Schema(Seq(Num())).validate([ "x" ]) ])
+
+        class Name(str): pass
+        schema, records = Schema({ "id": Num(), StartsWith("x-"): Any() }), [ { "id": 1, "x-a": 1 }, { Name("id"): 1, "x-a": 1 }, { "id": 1, Name("x-a"): 1 } ]  # equal keys, different key types
+        assert [ repr(results) for results in schema.validate_records(records) ] == [ repr(schema.validate(record)) for record in records ]
+
     def test_schema_logging(self):
 
         def assert_outcome(message, expected_outcome):
@@ -38,4 +172,59 @@ class TestSchema:
 
         Schema.log_results(results)
         Schema.log_results(results, logging_config=logging_config)
-    
\ No newline at end of file
+    
+
+    def test_schema_validate_stream(self):
+        schema = Schema({ "key1": Str(), "key2": Seq(Num() | Map({ "a": Num() }), max_len=2), OptionalKey("key3"): Any(), OtherKeys(): CallbackValidator(lambda cc: Seq() if isinstance(cc.value, list) else Num()) })
+        for document in (
+            { "key1": "value1", "key2": [ 1, { "a": 2 } ], "key3": { "deep": [ 1 ] }, "key4": [ "x" ] },
+            { "key2": [ "x", { "a": "y" }, [ 1 ] ], "key4": { "b": 1 }, "key5": 5 },
+            [ "not", "a", "map" ],
+        ):
+            text = json.dumps(document)
+            for detail in Detail:
+                expected = schema.validate(document, context=document, detail=detail)
+                results = schema.validate_stream(text, context=document, detail=detail, chunk_size=4)
+                assert repr(results) == repr(expected)
+                assert bool(results) == bool(expected)
+        with pytest.raises(ValueError):
+            schema.validate_stream('{ "key1": "value1" } { }')
+
+    def test_schema_validate_stream_wide_map(self):
+        class WideMap:                                                                              # reads a map with many keys, without building it
+            def __init__(self, keys:int) -> None:
+                self.chunks = ( ("{" if start == 1 else "") + ",".join(f'"key{i}": {i}' for i in range(start, min(start + 500, keys + 1))) + ("," if start + 500 <= keys else "}")
+                    for start in range(1, keys + 1, 500) )
+            def read(self, size:int=-1) -> str:
+                return next(self.chunks, "")
+        schema = Schema({ "key1": Num(), RequiredKey(Str("z")): Any(), OtherKeys(): Num() })
+        peaks = []
+        for keys in (500, 5_000):
+            tracemalloc.start()
+            results = schema.validate_stream(WideMap(keys), detail=Detail.COUNTS_ONLY)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            assert not results and results.fail_count == 1 and results.pass_count == keys * 2 + 1     # only the required key 'z' is missing
+        assert peaks[1] < peaks[0] * 2                                                              # the key names aren't kept
+
+    def test_schema_iter_validate(self):
+        schema = Schema({ "key1": Str("value1"), "key2": Seq(Num() | Map({ "a": Num() }), min_len=1), OptionalKey("key3"): CallbackValidator(lambda cc: Str(cc.context["key1"])), OtherKeys(): Any() })
+        for document in (
+            { "key1": "value1", "key2": [ 1, { "a": 2 } ], "key3": "value1", "key4": [ "x" ] },
+            { "key1": "value2", "key2": [ "x", { "a": "y" } ], "key3": "value1" },
+            [ "not", "a", "map" ],
+        ):
+            assert [ repr(result) for result in schema.iter_validate(document) ] == [ repr(result) for result in ResultSet(schema.validate(document)) ]
+
+        # a callback that reads its path selects the same alternative of an Or as validate()
+        callback = CallbackValidator(lambda cc: Str() if str(cc.path) == "Or(Map(...)).a" else Num())
+        for union in (Schema(Map({ "a": callback }) | Map({ OtherKeys(): Any() })), Schema(Or(Map({ "a": callback }), Map({ OtherKeys(): Any() }), adaptive=True))):
+            for document in ({ "a": "x" }, { "a": 1 }, { "zz": 1 }):
+                assert [ repr(result) for result in union.iter_validate(document) ] == [ repr(result) for result in ResultSet(union.validate(document)) ]
+
+        # Test stopping at the first failure
+        first_failure = next(result for result in schema.iter_validate({ "key1": "value2", "key2": [] }) if not result)
+        assert repr(first_failure) == "  key1:'value2' must be type 'str' with value 'value1' = 'FAIL'"
+        Schema.log_results(schema.iter_validate({ "key1": "value2" }), Outcome.FAIL)
+        with pytest.raises(TypeError):
+            Schema.log_results(schema.iter_validate({ "key1": "value2" }), "FAIL")
@@ -1,5 +1,6 @@
 import pytest
-from validdict import Schema, Any, Str, Num, Outcome
+from array import array
+from validdict import Schema, Any, Str, Num, Bool, Outcome, Detail
 from validdict import Seq # object under test
 
 class TestSeq:
@@ -119,3 +120,49 @@ class TestSeq:
         results = schema.validate({"key": ["aaa", 1, "bbb", 2, False]})
         assert len(results.filter(Outcome.FAIL)) == 3
         assert not results
+
+    def test_columnar_seq_validation(self):
+        for item_validator in (Num(gte=0), Str("A") | Num()):
+            schema = Schema({ "key": Seq(item_validator, min_len=2) })
+            columnar_schema = Schema({ "key": Seq(item_validator, min_len=2, columnar=True) })
+            for document in ({ "key": [ 1, 2, 3 ] }, { "key": [ 1, -2, "A", None ] }, { "key": "A" }):
+                results = schema.validate(document)
+                columnar_results = columnar_schema.validate(document)
+                assert repr(columnar_results) == repr(results)
+                assert bool(columnar_results) == bool(results)
+                assert columnar_results.fail_count == results.fail_count
+                assert repr(columnar_results.filter(Outcome.FAIL)) == repr(results.filter(Outcome.FAIL))
+                assert repr(columnar_schema.compile().validate(document)) == repr(results)
+
+    def test_bulk_seq_validation(self):
+        # Test that scalar items checked in batched passes have the same results as items validated one at a time
+        for item_validator in (Num(gte=0, lte=100), Num(1, 2.5, range(10, 20)), Bool(True), Str("a", "b")):
+            for columnar in (False, True):
+                seq = Seq(item_validator, columnar=columnar)
+                for document in ([], [ 1, 2.5, 15, 100 ], [ 1, -1, 15.5, float("nan"), True, "a", None ] * 300, [ "a", "b", "c" ]):
+                    for detail in (Detail.NON_PASS, Detail.INVALID_ONLY, Detail.COUNTS_ONLY):
+                        expected = detail.apply(seq.validate(document))
+                        results = seq.compile(detail)(document, None, None)
+                        assert repr(results) == repr(expected)
+                        assert results.fail_count == expected.fail_count and results.pass_count == expected.pass_count
+                    assert seq.is_valid(document) == bool(seq.validate(document))
+
+    def test_array_seq_validation(self):
+        schema = Schema({ "key": Seq(Num(gte=0)) })
+        assert schema.validate({ "key": array("d", [ 1.0, 2.5 ]) })
+        assert schema.is_valid({ "key": memoryview(array("b", [ 1, 2 ])) })
+        results = schema.compile().validate({ "key": array("q", [ 1, -2, 3 ]) }, detail=Detail.INVALID_ONLY)
+        assert not results
+        assert [ str(result.path) for result in results ] == [ "key.item_1" ]
+
+    def test_numpy_seq_validation(self):
+        numpy = pytest.importorskip("numpy")
+        for item_validator in (Num(gte=0, lte=100), Num(1, range(10, 20)), Bool(False), Str("a")):
+            seq = Seq(item_validator)
+            for document in (numpy.array([ 1.0, -1.0, 15.0, numpy.nan ]), numpy.array([ 0, 15, 200 ]), numpy.array([ True, False ]), numpy.array([ "a", "b" ])):
+                for detail in (Detail.FULL, Detail.NON_PASS, Detail.COUNTS_ONLY):
+                    expected = detail.apply(seq.validate(document.tolist()))
+                    results = seq.compile(detail)(document, None, None)
+                    items, expected_items = [ r for r in results if r.validator is not seq ], [ r for r in expected if r.validator is not seq ]   # the Seq result's value is the array
+                    assert repr(items) == repr(expected_items)
+                    assert results.fail_count == expected.fail_count
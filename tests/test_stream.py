@@ -0,0 +1,39 @@
+import io
+import json
+import pytest
+from validdict.stream import iter_json_events, materialize, skip, run, SCALAR, START_MAP, KEY, END_MAP, START_SEQ, END_SEQ # objects under test
+
+
+class TestStream:
+
+    def test_json_events(self):
+        events = list(iter_json_events('{ "a": [ 1, 2.5, "x" ], "b": { "c": null }, "d": true }'))
+        assert events == [
+            (START_MAP, None),
+            (KEY, "a"), (START_SEQ, None), (SCALAR, 1), (SCALAR, 2.5), (SCALAR, "x"), (END_SEQ, None),
+            (KEY, "b"), (START_MAP, None), (KEY, "c"), (SCALAR, None), (END_MAP, None),
+            (KEY, "d"), (SCALAR, True),
+            (END_MAP, None),
+        ]
+        assert list(iter_json_events(" 42 ")) == [ (SCALAR, 42) ]
+
+    def test_json_events_chunks(self):
+        # Test that tokens split across chunks, in text and binary sources, are read like json.loads() reads them
+        document = { "kéy": [ -1.5e-3, 12345678901234567890, "esc\"aped\\\n", "\U0001F600", False, None, {}, [] ] }
+        text = json.dumps(document, ensure_ascii=False)
+        for chunk_size in (1, 3, 1 << 16):
+            for source in (text, io.StringIO(text), io.BytesIO(text.encode())):
+                events = iter_json_events(source, chunk_size)
+                assert run(materialize(next(events)), events) == document
+
+    def test_json_event_errors(self):
+        for text in ("", "[1,]", '{"a" 1}', "[1 2]", "{} x", "tru", '"abc', "[1]]", "{1: 2}"):
+            with pytest.raises(ValueError):
+                list(iter_json_events(text, 2))
+        with pytest.raises(TypeError):
+            iter_json_events("{}", 0)
+
+    def test_skip(self):
+        events = iter_json_events('[ { "a": [ 1, { } ] }, 2 ] ')
+        assert run(skip(next(events)), events) == []
+        assert next(events, None) is None
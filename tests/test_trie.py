@@ -0,0 +1,32 @@
+import pytest
+from validdict.trie import PrefixTrie # object under test
+
+
+class TestPrefixTrie:
+
+    def test_trie_constructor(self):
+        trie = PrefixTrie()
+        assert isinstance(trie, PrefixTrie)
+        assert not trie
+        assert list(trie.matches("anything")) == []
+        assert trie.first("anything", "default") == "default"
+
+    def test_trie_matches(self):
+        trie = PrefixTrie()
+        trie.add("x-", 1)
+        trie.add("x-acme-", 2)
+        trie.add("X-FOO-", 3, case_sensitive=False)
+        assert trie
+        assert list(trie.matches("x-acme-key")) == [("x-", 1), ("x-acme-", 2)]
+        assert list(trie.matches("x-foo-key")) == [("x-", 1), ("X-FOO-", 3)]
+        assert list(trie.matches("X-Foo-key")) == [("X-FOO-", 3)]
+        assert list(trie.matches("X-ACME-key")) == []
+        assert trie.first("x-acme-key") == 1
+        assert trie.first("X-Foo-key") == 3
+        assert trie.first("y-key") is None
+
+    def test_trie_duplicate_prefixes(self):
+        trie = PrefixTrie()
+        trie.add("ab", 1)
+        trie.add("ab", 2)
+        assert list(trie.matches("abc")) == [("ab", 1), ("ab", 2)]
@@ -1,5 +1,5 @@
 import pytest
-from validdict import Str, Num, Bool, Outcome, Seq
+from validdict import Str, Num, Bool, Outcome, Seq, Detail, Map, OtherKeys, CallbackValidator
 from validdict.validator import ResultSet, Result
 from validdict.validator import Validator, Or, Any # objects under test
 
@@ -77,6 +77,9 @@ class TestOr:
         with pytest.raises(TypeError):
             Or(Num(), "string")
 
+        with pytest.raises(TypeError):
+            Or(Num(), Str(), adaptive=1)
+
     def test_or_validation(self):
         assert (Str() | Num()).validate("A")
         assert (Str("A") | Num(1234) | Bool(False)).validate("A")
@@ -88,6 +91,81 @@ class TestOr:
         assert (Str("A") | Seq(Str("B"))).validate(["B", "B"])
         assert not (Str("A") | Seq(Str("B"))).validate(["B", "A"])
 
+    def test_or_is_valid(self):
+        assert (Str() | Num()).is_valid("A")
+        assert (Str("A") | Num(1234) | Bool(False)).is_valid(1234)
+        assert not (Str("A") | Num(1234) | Bool(False)).is_valid(True)
+        assert (Str("A") | Seq(Str("B"))).is_valid(["B", "B"])
+        assert not (Str("A") | Seq(Str("B"))).is_valid(["B", "A"])
+        assert not Or(Str(), Num(), valid_outcome=Outcome.WARN, invalid_outcome=Outcome.WARN).is_valid("A")
+
+
+    def test_or_type_dispatch(self):
+        calls = []
+        num, seq = Num(), Seq(Str())
+        num.validate = lambda value, path=None: calls.append(value) or Num.validate(num, value, path)
+        or_validator = Or(num, Str("A", case_sensitive=False), seq, Any())
+
+        results = or_validator.validate("a")
+        assert results and calls == []                                                              # Num can't accept a str, it's never run
+        results = or_validator.validate({"key": 1})
+        assert results and calls == []
+        assert [ str(result.path) for result in results ] == [ "None", "Or(Any(...))" ]
+        assert or_validator.validate(1) and calls == [ 1 ]
+
+        or_validator = Or(num, Str(), seq)
+        results = or_validator.validate({"key": 1})
+        assert not results
+        assert [ (str(result.path), result.outcome) for result in results ] == [
+            ("None", Outcome.FAIL), ("Or(Num(...))", Outcome.FAIL), ("Or(Str(...))", Outcome.FAIL), ("Or(Seq(...))", Outcome.FAIL)
+        ]
+        assert [ repr(result) for result in or_validator.compile()({"key": 1}, None, None) ] == [ repr(result) for result in results ]
+        assert not or_validator.is_valid(True)
+        assert calls == [ 1 ]
+
+        mismatches = []
+        num._type_mismatch = lambda value, path=None: mismatches.append(value) or Num._type_mismatch(num, value, path)
+        or_validator = Or(num, seq, Str())
+        assert or_validator.validate("a") and or_validator.compile()("a", None, None)
+        assert mismatches == []                                                                     # only built when the Or fails
+        assert not or_validator.validate(None) and mismatches == [ None ]
+
+    def test_or_adaptive(self, monkeypatch):
+        monkeypatch.setattr(Or, "_reorder_interval", 4)
+        plain, adaptive = Or(Num(), Seq(Str()), Str(), Str("A")), Or(Num(), Seq(Str()), Str(), Str("A"), adaptive=True)
+        for value in [ "A" ] * 4:
+            assert repr(adaptive.validate(value)) == repr(plain.validate(value))
+        assert adaptive._order == (2, 0, 1, 3)                                                      # Str() was valid most often, ties keep their order
+
+        num = Num(gt=0)
+        plain, adaptive = Or(num, Num(), Str()), Or(num, Num(), Str(), adaptive=True)
+        for value in [ -1 ] * 4:
+            assert repr(adaptive.validate(value)) == repr(plain.validate(value))
+        assert adaptive._order == (1, 0, 2)
+        results = adaptive.validate(5)
+        assert repr(results) == repr(plain.validate(5))                                             # the valid one declared first is returned
+        assert [ str(result.path) for result in results ] == [ "None", "Or(Num(...))" ] and list(results)[1].validator is num
+        for value in ("A", 5, -1, [ "A" ], None):
+            assert repr(adaptive.validate(value)) == repr(plain.validate(value))
+            assert adaptive.is_valid(value) == plain.is_valid(value)
+            for detail in Detail:
+                assert repr(adaptive.compile(detail)(value, None, None)) == repr(plain.compile(detail)(value, None, None))
+
+        adaptive = Or(Num(), Str(), adaptive=True) | Bool()
+        assert adaptive.adaptive and len(adaptive.validators) == 3                                 # flattening keeps it adaptive
+        for value in [ True ] * 8:
+            assert adaptive.is_valid(value)
+            list(adaptive.iter_validate(value))
+        assert adaptive._hits == [ 0, 0, 0 ] and adaptive._order == (0, 1, 2)                      # only validate() counts the hits
+
+        callback = CallbackValidator(lambda cc: Str() if str(cc.path) == "Or(Map(...)).a" else Num())  # the alternatives declared earlier are re-checked at the same path
+        plain, adaptive = Or(Map({ "a": callback }), Map({ OtherKeys(): Any() })), Or(Map({ "a": callback }), Map({ OtherKeys(): Any() }), adaptive=True)
+        compiled = adaptive.compile()
+        for value in [ { "zz": 1 } ] * 8:
+            adaptive.validate(value) and compiled(value, None, None)
+        assert adaptive._order == (1, 0)
+        assert repr(adaptive.validate({ "a": "x" })) == repr(compiled({ "a": "x" }, None, None)) == repr(plain.validate({ "a": "x" }))
+        assert [ str(result.path) for result in plain.validate({ "a": "x" }) ][:2] == [ "None", "Or(Map(...))" ]
 
 class TestAny:
 
@@ -105,3 +183,5 @@ class TestAny:
         assert Any().validate(True)
         assert Any().validate({})
         assert Any().validate([])
+        assert Any().is_valid(None)
+        assert not Any(valid_outcome=Outcome.FAIL).is_valid(None)
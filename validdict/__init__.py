@@ -4,5 +4,6 @@ from .key import KeyValidator, RequiredKey, OptionalKey, OtherKeys, StartsWith
 from .scalars import Str, Num, Bool, Regex
 from .contextual import CallbackValidator, CallbackKeyValidator, ContextualValidator
 from .seq import Seq
-from .map import Map
+from .map import Map, OneOf
 from .schema import Schema
+from .results import Detail
@@ -0,0 +1,35 @@
+# Command Line: validate a JSON Lines file against a schema
+#   python -m validdict package.module:SCHEMA data.jsonl --workers 8
+
+from __future__ import annotations
+import argparse
+import sys
+from .results import ResultSummary, Detail
+from .parallel import validate_jsonl
+
+
+def main(argv:list[str]=None) -> int:
+    """
+    Validates a JSON Lines file, printing the results of each line that isn't valid, then the summary of every line
+    :param argv:            the command line arguments, default: sys.argv[1:]
+    :return:                the exit status: 0 when every line is valid, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(prog="python -m validdict", description="Validate each line of a JSON Lines file against a schema")
+    parser.add_argument("schema", help="import path of the schema, like 'package.module:attribute'")
+    parser.add_argument("path", help="path of the JSON Lines file")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, default: the number of CPUs")
+    parser.add_argument("--shard-size", type=int, default=1 << 22, help="number of bytes a worker validates at a time")
+    parser.add_argument("--detail", choices=[ detail.name for detail in Detail ], default=Detail.NON_PASS.name, help="the results to print of each line that isn't valid")
+    parser.add_argument("--max-failures", type=int, default=None, help="number of invalid results to stop each line at")
+    args = parser.parse_args(argv)
+
+    summary = ResultSummary()
+    for line, results in validate_jsonl(args.schema, args.path, workers=args.workers, shard_size=args.shard_size, detail=Detail[args.detail], max_failures=args.max_failures, summary=summary):
+        print(f"line {line}:")
+        print(repr(results))
+    print(repr(summary))
+    return 0 if summary.invalid_count == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
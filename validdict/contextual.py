@@ -1,9 +1,11 @@
 ## Contextual Validators
 
 from __future__ import annotations
-from .results import Outcome, Result, ResultSet
+from typing import Callable, Iterator
+from .results import Outcome, Result, ResultSet, Detail, FailureBudget
 from .validator import Validator
 from .key import KeyValidator
+from .helpers import Path
 
 
 class ContextualValidator(Validator):
@@ -11,7 +13,7 @@ class ContextualValidator(Validator):
     Base class for validators that accept a context dict during validation
     """
 
-    def validate(self, value: object, path: list[str] = None, context: object = None) -> Result|ResultSet:
+    def validate(self, value: object, path: Path = None, context: object = None) -> Result|ResultSet:
         """
         abstract validation method
         :param value:       the value to validate
@@ -21,8 +23,46 @@ class ContextualValidator(Validator):
         """
         raise NotImplementedError(self)
 
+    def iter_validate(self, value:object, path:Path=None, context:object=None) -> Iterator[Result]:
+        """
+        validates a value with context, yielding its Results one at a time
+        - this default implementation iterates the results of validate()
+        :param value:       the value to validate
+        :param path:        list of parent keys for nested/compound structures
+        :param context:     the context validation is occurring against
+        :return:            iterator of the Results
+        """
+        results = self.validate(value, path=path, context=context)
+        if isinstance(results, Result):
+            yield results
+        else:
+            yield from results
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a value with context, falling back on validate()
+        :param value:       the value to validate
+        :param context:     the context validation is occurring against
+        :param path:        list of parent keys for nested/compound structures
+        :return:            True if the value is valid
+        """
+        return bool(self.validate(value, path=path, context=context))
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result|ResultSet]:
+        """
+        compiles the validator into a closure with the signature fn(value, path, context)
+        - this default implementation binds validate() and passes the context through
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        validate = self.validate
+        def compiled(value:object, path:Path=None, context:object=None) -> Result|ResultSet:
+            return validate(value, path=path, context=context)
+        return Validator._with_detail(compiled, detail, budget)
+
     @staticmethod
-    def validate_with_context(validator:Validator|ContextualValidator, value:object, path:list[str]=None, context:object=None) -> Result|ResultSet:
+    def validate_with_context(validator:Validator|ContextualValidator, value:object, path:Path=None, context:object=None) -> Result|ResultSet:
         """
         Helper method that wraps a validator and properly validates with context if possible
         """
@@ -43,7 +83,7 @@ class CallbackValidator(ContextualValidator):
         """
         Inner class that represents the full context data passed to the callback
         """
-        def __init__(self, value:object, context:object, path:list[str], valid_outcome:Outcome, invalid_outcome:Outcome, comment:str) -> None:
+        def __init__(self, value:object, context:object, path:Path, valid_outcome:Outcome, invalid_outcome:Outcome, comment:str) -> None:
             self.value = value
             self.context = context
             self.path = path
@@ -59,7 +99,7 @@ class CallbackValidator(ContextualValidator):
         self.callback = callback
         self.repr = f"must pass callback '{self.callback.__name__}'"
 
-    def validate(self, value:object, path:list[str]=None, context:object=None) -> Result|ResultSet:
+    def validate(self, value:object, path:Path=None, context:object=None) -> Result|ResultSet:
         """
         Validates a value by allowing user code to decide how to validate it at runtime
         :param value:       the value to validate
@@ -75,6 +115,59 @@ class CallbackValidator(ContextualValidator):
         # in the case that there was no callback or a non-Validator was returned from the callback, return invalid Result
         return Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
 
+    def iter_validate(self, value:object, path:Path=None, context:object=None) -> Iterator[Result]:
+        """
+        validates a value with the validator selected by the callback, yielding its Results one at a time
+        :param value:       the value to validate
+        :param path:        list of parent keys for nested/compound structures
+        :param context:     the context validation is occurring against
+        :return:            iterator of the Results
+        """
+        if type(self).validate is not CallbackValidator.validate or not callable(self.callback):
+            yield from super().iter_validate(value, path, context)
+            return
+        validator = self.callback(CallbackValidator.CallbackContext(value, context, path, self.valid_outcome, self.invalid_outcome, self.comment))
+        if isinstance(validator, Validator):
+            yield from validator.iter_validate(value, path, context)                                # non-contextual validators ignore the context, like validate_with_context()
+        else:
+            yield Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a value with the validator selected by the callback
+        - the callback is given the same CallbackContext as validate(), path included, so it selects the same validator
+        :param value:       the value to validate
+        :param context:     the context validation is occurring against
+        :param path:        list of parent keys for nested/compound structures
+        :return:            True if the value is valid
+        """
+        if type(self).validate is not CallbackValidator.validate:
+            return super().is_valid(value, context, path)
+        if callable(self.callback):
+            validator = self.callback(CallbackValidator.CallbackContext(value, context, path, self.valid_outcome, self.invalid_outcome, self.comment))
+            if isinstance(validator, Validator):
+                return validator.is_valid(value, context, path)
+        return False
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result|ResultSet]:
+        """
+        compiles the callback into a closure
+        - the validator returned by the callback is only known at validation time, so it is validated uncompiled
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not CallbackValidator.validate or not callable(self.callback):
+            return super().compile(detail, budget)
+        callback, validate_with_context = self.callback, ContextualValidator.validate_with_context
+        valid_outcome, invalid_outcome, comment = self.valid_outcome, self.invalid_outcome, self.comment
+        def compiled(value:object, path:Path=None, context:object=None) -> Result|ResultSet:
+            validator = callback(CallbackValidator.CallbackContext(value, context, path, valid_outcome, invalid_outcome, comment))
+            if isinstance(validator, Validator):
+                return validate_with_context(validator, value, path, context)
+            return Result(outcome=invalid_outcome, value=value, path=path, validator=self)
+        return Validator._with_detail(compiled, detail, budget)
+
 
 class CallbackKeyValidator(CallbackValidator, KeyValidator):
     """
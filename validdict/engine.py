@@ -0,0 +1,234 @@
+# Iterative Validation Engine
+# - walks the document and the validation tree with an explicit stack instead of recursion, so the depth of a
+#   document is only limited by memory, e.g. recursive schemas that refer back to themselves through callbacks
+
+from __future__ import annotations
+from typing import Callable
+from .results import Result, ResultSet, ColumnarResultSet, Detail, FixedOutcome
+from .validator import Validator, Or
+from .contextual import ContextualValidator, CallbackValidator
+from .map import Map
+from .seq import Seq, _SEQUENCE_TYPES
+from .helpers import format_sequence, extend_path, Path
+
+# plan kinds, each plan is a tuple that starts with its kind
+_LEAF = 0                                                                                           # (_LEAF, compiled closure), a subtree validated by its compiled closure
+_MAP = 1
+_SEQ = 2
+_OR = 3
+_CALLBACK = 4
+
+_START = object()                                                                                   # sentinel for a frame that hasn't been given a child result yet
+
+
+class _Planner(object):
+    """
+    Builds the plan of each validator the engine meets, once
+    - shallow subtrees without callbacks are compiled into a single closure, they can't nest deeply, and the
+      compiled closures have the least overhead; Map, Seq and Or nodes above them, and callbacks, are walked
+    - plans are built when first needed, so building them never recurses either
+    """
+    _leaf_depth:int = 32                                                                            # the deepest subtree that's compiled into a single closure
+    _cache_size:int = 1024                                                                          # max plans cached, before the cache is cleared
+
+    def __init__(self, detail:Detail) -> None:
+        """
+        constructor
+        :param detail:      the results to keep
+        """
+        self.detail = detail
+        self.plans = {}                                                                             # id(validator) -> (validator, plan), the validator keeps its id from being reused
+
+    def plan_for(self, validator:Validator) -> tuple:
+        """
+        gets the plan of a validator, building it on first use
+        :param validator:   the validator
+        :return:            the plan
+        """
+        cached = self.plans.get(id(validator))
+        if cached is not None and cached[0] is validator:
+            return cached[1]
+        if len(self.plans) >= self._cache_size:
+            self.plans.clear()
+        plan = self._build(validator)
+        self.plans[id(validator)] = (validator, plan)
+        return plan
+
+    @staticmethod
+    def is_shallow(validator:Validator, max_depth:int) -> bool:
+        """
+        tells whether a subtree has no callbacks, and is no deeper than max_depth, without recursing
+        :param validator:   the root of the subtree
+        :param max_depth:   the deepest subtree that's shallow
+        :return:            True if the subtree can be compiled into a single closure
+        """
+        pending = [ (validator, 1) ]
+        while len(pending) > 0:
+            validator, depth = pending.pop()
+            if depth > max_depth:
+                return False
+            if isinstance(validator, CallbackValidator):
+                return False
+            if isinstance(validator, Map):
+                pending.extend((value, depth + 1) for value in validator.map.values())
+            elif isinstance(validator, Seq) and validator.validator is not None:
+                pending.append((validator.validator, depth + 1))
+            elif isinstance(validator, Or):
+                pending.extend((alternative, depth + 1) for alternative in validator.validators)
+        return True
+
+    def _build(self, validator:Validator) -> tuple:
+        """
+        private helper that builds the plan of a validator
+        """
+        detail = self.detail
+        if _Planner.is_shallow(validator, self._leaf_depth):
+            return (_LEAF, validator.compile(detail))
+        if type(validator) is CallbackValidator and callable(validator.callback):
+            return (_CALLBACK, validator, detail.apply, detail.result_factory(validator.invalid_outcome, validator))
+        if isinstance(validator, Map) and type(validator).validate is Map.validate and type(validator)._validate_key_value_pair is Map._validate_key_value_pair:
+            return self._build_map(validator)
+        if isinstance(validator, Seq) and type(validator).validate is Seq.validate:
+            min_len = validator.min_len.compile(detail) if validator.min_len is not None else None
+            max_len = validator.max_len.compile(detail) if validator.max_len is not None else None
+            return (_SEQ, validator.validator, min_len, max_len,
+                detail.result_factory(validator.valid_outcome, validator), detail.result_factory(validator.invalid_outcome, validator),
+                ColumnarResultSet if validator.columnar else ResultSet)
+        if isinstance(validator, Or) and type(validator).validate is Or.validate:
+            return (_OR, validator, detail.result_factory(validator.valid_outcome, validator), detail.result_factory(validator.invalid_outcome, validator), detail.apply)
+        return (_LEAF, validator.compile(detail))                                                   # anything else validates its own children
+
+    def _build_map(self, validator:Map) -> tuple:
+        """
+        private helper that builds the plan of a map, with a closure that matches a key to its key and value validators
+        """
+        detail = self.detail
+        match = validator._compile_key_match({ key: (key.compile(detail), value) for key, value in validator.map.items() })  # -> (key result, value validator)
+        return (_MAP, match, validator._missing_required_keys,
+            detail.result_factory(validator.valid_outcome, validator), detail.result_factory(validator.invalid_outcome, validator),
+            detail.result_factory(validator.invalid_outcome, FixedOutcome(validator.invalid_outcome, is_valid=False, message="missing required key(s)")),
+            detail.result_factory(validator.invalid_outcome, FixedOutcome(validator.invalid_outcome, is_valid=False, message="unknown key name")))
+
+
+def compile_iterative(validator:Validator, detail:Detail=Detail.FULL) -> Callable[[object, Path, object], Result|ResultSet]:
+    """
+    Compiles a validator into a closure that validates with an explicit stack instead of recursion
+    - the results are identical to validate(), at any depth of document
+    :param validator:       the root of the validation tree
+    :param detail:          the results to keep
+    :return:                the compiled validation closure, with the signature fn(value, path, context)
+    """
+    planner = _Planner(detail)
+    plan_for, is_shallow, leaf_depth = planner.plan_for, _Planner.is_shallow, _Planner._leaf_depth
+    validate_with_context, CallbackContext = ContextualValidator.validate_with_context, CallbackValidator.CallbackContext
+    root = plan_for(validator)
+
+    def compiled(value:object, path:Path=None, context:object=None) -> Result|ResultSet:
+        plan, stack = root, []                                                                      # stack of frames: lists that start with the plan of the frame's validator
+        while True:
+            # start validating the value with the plan, until there's a result, or a frame for its children
+            kind = plan[0]
+            if kind == _LEAF:
+                result = plan[1](value, path, context)
+            elif kind == _MAP:
+                if isinstance(value, dict):
+                    rval = ResultSet(plan[3](value, path))
+                    missing = plan[2](value)
+                    if len(missing) > 0:
+                        rval.add_results(plan[5](format_sequence(missing, quote=""), extend_path(path, "RequiredKey('<all>')")))
+                    stack.append([ plan, rval, iter(value.items()), path, context, None ])      # [ plan, results, pairs, path, context, key result ]
+                    result = _START
+                else:
+                    result = ResultSet(plan[4](value, path))
+            elif kind == _SEQ:
+                if isinstance(value, _SEQUENCE_TYPES):
+                    items = Seq._items(value)
+                    rval = plan[6](plan[4](value, path))
+                    if plan[2] is not None:
+                        rval.add_results(plan[2](len(items), extend_path(path, "min_len"), None))
+                    if plan[3] is not None:
+                        rval.add_results(plan[3](len(items), extend_path(path, "max_len"), None))
+                    if plan[1] is not None:
+                        stack.append([ plan, rval, enumerate(items), path ])                      # [ plan, results, items, path ]
+                        result = _START
+                    else:
+                        result = rval
+                else:
+                    result = plan[6](plan[5](value, path))
+            elif kind == _OR:
+                stack.append([ plan, ResultSet(), plan[1]._alternatives(type(value)), 0, value, path ])    # [ plan, results, alternatives, next alternative, value, path ]
+                result = _START
+            else: # _CALLBACK
+                callback_validator = plan[1]
+                selected = callback_validator.callback(CallbackContext(value, context, path, callback_validator.valid_outcome, callback_validator.invalid_outcome, callback_validator.comment))
+                if not isinstance(selected, Validator):
+                    result = plan[3](value, path)
+                elif id(selected) in planner.plans or not is_shallow(selected, leaf_depth):
+                    if not isinstance(selected, ContextualValidator):
+                        context = None                                                              # like validate_with_context()
+                    plan = plan_for(selected)
+                    continue
+                else:
+                    result = plan[2](validate_with_context(selected, value, path, context))         # like the compiled callback, the selected validator isn't compiled
+
+            # give the result to the frames waiting for it, until one of them has another value to validate
+            while True:
+                if len(stack) == 0:
+                    return result
+                frame = stack[-1]
+                frame_plan = frame[0]
+                kind = frame_plan[0]
+                if kind == _MAP:
+                    rval, path, context = frame[1], frame[3], frame[4]
+                    if result is not _START:
+                        rval.add_results(frame[5], result)
+                    match = frame_plan[1]
+                    for k, v in frame[2]:
+                        key_result, value_validator = match(k, path, context)
+                        if key_result is None:
+                            rval.add_results(frame_plan[6](k, extend_path(path, "Key('{}')", k)))
+                            continue
+                        frame[5] = key_result
+                        plan, value, path = plan_for(value_validator), v, extend_path(path, k)
+                        break
+                    else:
+                        stack.pop()
+                        result = rval
+                        continue
+                    if not isinstance(value_validator, ContextualValidator):
+                        context = None                                                              # like validate_with_context(), but the context of the frame is kept
+                    break
+                elif kind == _SEQ:
+                    rval = frame[1]
+                    if result is not _START:
+                        rval.add_results(result)
+                    for item_index, item in frame[2]:
+                        plan, value, path, context = plan_for(frame_plan[1]), item, extend_path(frame[3], "item_{}", item_index), None   # like validate(), items get no context
+                        break
+                    else:
+                        stack.pop()
+                        result = rval
+                        continue
+                    break
+                else: # _OR
+                    results, alternatives, index, value, path = frame[1], frame[2], frame[3], frame[4], frame[5]
+                    if result is not _START:
+                        if result:
+                            stack.pop()
+                            result = ResultSet(frame_plan[2](value, path), result)
+                            continue
+                        results.add_results(result)
+                    while index < len(alternatives):
+                        alternative, label, can_accept = alternatives[index]
+                        index += 1
+                        if can_accept:
+                            break
+                        results.add_results(frame_plan[4](alternative._type_mismatch(value, extend_path(path, label))))
+                    else:
+                        stack.pop()
+                        result = ResultSet(frame_plan[3](value, path), results)
+                        continue
+                    frame[3] = index
+                    plan, path, context = plan_for(alternative), extend_path(path, label), None    # like validate(), sub-validators get no context
+                    break
+    return compiled
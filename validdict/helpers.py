@@ -20,6 +20,106 @@ def format_sequence(seq:tuple|list, separator:str=", ", quote:str="'", prefix:st
     return rval
 
 
+# sentinel for Path labels that don't need formatting
+_UNFORMATTED = object()
+
+
+class Path(object):
+    """
+    Path of parent keys for nested/compound structures
+    - each node only points at its parent, so extending a path is O(1) and siblings share their parents
+    - a label can be a format string with an argument, it's only formatted when the path is read
+    - behaves like the list of labels it represents: len(), iteration, indexing and == against lists
+    """
+    __slots__ = ("parent", "_label", "_arg", "_len")
+
+    def __init__(self, parent:Path=None, label:object=None, arg:object=_UNFORMATTED) -> None:
+        """
+        constructor
+        :param parent:      the parent path, None for the root
+        :param label:       the label of this node, or a format string when arg is provided, None for an empty path
+        :param arg:         optional argument that is formatted into the label when it's first read
+        """
+        self.parent = parent
+        self._label = label
+        self._arg = arg
+        self._len = (0 if parent is None else parent._len) + (0 if label is None else 1)
+
+    @staticmethod
+    def from_list(path:list[str]) -> Path:
+        """
+        builds a path from a list of labels
+        :param path:        the list of labels
+        :return:            the equivalent Path
+        """
+        rval = Path()
+        for label in path:
+            rval = Path(rval, label)
+        return rval
+
+    @property
+    def label(self) -> object:
+        """
+        :return:            the label of this node, formatted when it's read
+        """
+        if self._arg is not _UNFORMATTED:
+            return self._label.format(self._arg)
+        return self._label
+
+    def to_pattern(self, wildcard:str="*") -> str:
+        """
+        :param wildcard:    the text that replaces the arguments of formatted labels, like sequence item indexes
+        :return:            the dot-delimited path, with the same pattern for every item of a sequence
+        """
+        labels = []
+        node = self
+        while node is not None:
+            if node._label is not None:
+                labels.append(str(node._label if node._arg is _UNFORMATTED else node._label.format(wildcard)))
+            node = node.parent
+        labels.reverse()
+        return ".".join(labels)
+
+    def to_list(self) -> list[str]:
+        """
+        :return:            the list of labels from the root to this node
+        """
+        rval = []
+        node = self
+        while node is not None:
+            if node._label is not None:
+                rval.append(node.label)
+            node = node.parent
+        rval.reverse()
+        return rval
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> object:
+        return iter(self.to_list())
+
+    def __getitem__(self, index:int|slice) -> object:
+        return self.to_list()[index]
+
+    def __eq__(self, other:object) -> bool:
+        if isinstance(other, (Path, list)):
+            return len(self) == len(other) and self.to_list() == list(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self.to_list()))
+
+    def __str__(self) -> str:
+        """
+        :return:            the dot-delimited path
+        """
+        return ".".join(str(label) for label in self.to_list())
+
+    def __repr__(self) -> str:
+        return repr(self.to_list())
+
+
 def path_padding(path, padding:str="  ", offset:int=0) -> str:
     """
     returns a padding string for indenting based on the number of items in a path list
@@ -27,25 +127,27 @@ def path_padding(path, padding:str="  ", offset:int=0) -> str:
     return "" if (path is None or padding is None) else padding * (len(path) + offset)
 
 
-def format_path(path:list[str]=None, prefix:str="", suffix:str="", padding:str="  ", padding_offset:int=0) -> str:
+def format_path(path:Path|list[str]=None, prefix:str="", suffix:str="", padding:str="  ", padding_offset:int=0) -> str:
     """
     formats a result path for printing as a dot-delimited string
     """
-    if isinstance(path, list) and len(path) > 0:
-        return path_padding(path, padding, padding_offset) + prefix + ".".join(path) + suffix
+    if isinstance(path, (Path, list)) and len(path) > 0:
+        return path_padding(path, padding, padding_offset) + prefix + ".".join(str(label) for label in path) + suffix
     return ""
 
 
-def extend_path(path:list[str]=None, key:str=None) -> list[str]:
+def extend_path(path:Path|list[str]=None, key:str=None, arg:object=_UNFORMATTED) -> Path:
     """
     adds key to the end of path, handling Nones
+    - the parent path is shared, not copied, so this is O(1) for Paths
+    :param path:        the parent path, a list of keys is converted into a Path
+    :param key:         the key to add, or a format string when arg is provided
+    :param arg:         optional argument that is formatted into the key when the path is read
     """
     if path is None and key is None:
         return None
-    if path is None:
-        return [key]
-    rval = path.copy()
+    if isinstance(path, list):
+        path = Path.from_list(path)
     if key is None:
-        return rval
-    rval.append(key)
-    return rval
+        return path
+    return Path(path, key, arg)
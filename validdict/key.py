@@ -1,16 +1,45 @@
 # Key Validators
 
 from __future__ import annotations
-from .results import Outcome, Result
+from typing import Callable
+from collections import OrderedDict
+from .results import Outcome, Result, Detail, FailureBudget
 from .validator import Validator
-from .scalars import ScalarValidator
-from .helpers import format_sequence
+from .scalars import ScalarValidator, Str, Num, Bool
+from .helpers import format_sequence, Path
+
+
+class _KeyName(ScalarValidator):
+    """
+    Validates any key name of one type, for a KeyValidator without a fixed key name
+    - the Str, Num or Bool built for a key name always accepts that name, so one validator per type stands in for them
+    - the message names the key like the message of the validator built for it, and is only rendered when it's read
+    """
+    def __init__(self, validator_type:type, accepted_types:tuple, *, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> None:
+        """
+        constructor
+        :param validator_type:      the validator class the Locator builds for the key names
+        :param accepted_types:      the accepted_types of that validator class
+        :param valid_outcome:       the outcome to apply to the result when the value is valid, default: PASS
+        :param invalid_outcome:     the outcome to apply to the result when the value is invalid, default: FAIL
+        :param comment:             comment associated with the possible outcomes
+        """
+        super().__init__(accepted_types, (), valid_outcome=valid_outcome, invalid_outcome=invalid_outcome, comment=comment)
+        self.validator_type = validator_type
+
+    def _message_for(self, value:object) -> str:
+        return repr(self.validator_type(value))
 
 
 class KeyValidator(Validator):
     """
     Base class for validating keys in a map
+    - the validator for a fixed key name is built once, when the KeyValidator is constructed
+    - without a fixed key name, the str, int, float and bool key names share one validator per type, other key names
+      have their validators cached by name, least recently used first out
     """
+    _shared_types:tuple = (Str, Num, Bool)                                                          # validator classes whose key names share one validator per type
+    _cache_size:int = 256                                                                           # max key names cached per type, before the least recently used is dropped
 
     def __init__(self, accepted_name:str|ScalarValidator=None, *, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> None:
         """
@@ -28,20 +57,89 @@ class KeyValidator(Validator):
             raise TypeError(f"{self.__class__.__name__} accepted_name must be a non-zero length string, or a ScalarValidator")
         self.accepted_name = accepted_name
         self.repr = super().__repr__() if self.accepted_name is None else repr(self.accepted_name)
+        self._validator = None if self.accepted_name is None else self._build_validator(self.accepted_name)
+        self._key_names = {}                                                                        # key type -> validator shared by its key names
+        self._validators = {}                                                                       # key type -> OrderedDict(key name -> validator)
+
+    def _build_validator(self, accepted_name:object) -> Validator:
+        """
+        private helper that builds the validator that exclusively validates the accepted key name
+        """
+        return Validator.for_value(accepted_name, valid_outcome=self.valid_outcome, invalid_outcome=self.invalid_outcome, comment=self.comment)
 
-    def validate(self, value: object, path: list[str] = None) -> Result:
+    def _validator_for(self, value:object) -> Validator:
+        """
+        private helper that gets the validator to validate a key name with
+        :param value:       the key name to validate
+        :return:            the validator for the fixed key name, the validator shared by key names of the provided
+                            key name's type, or the cached validator for the provided key name
+        """
+        if self._validator is not None:
+            return self._validator
+        value_type = type(value)
+        validator = self._key_names.get(value_type)
+        if validator is not None:
+            return validator
+        validators = self._validators.get(value_type)
+        if validators is None:                                                                      # first key name of this type
+            validator = self._build_validator(value)
+            if type(validator) in self._shared_types:
+                validator = self._key_names[value_type] = _KeyName(
+                    type(validator), validator.accepted_types, valid_outcome=self.valid_outcome, invalid_outcome=self.invalid_outcome, comment=self.comment
+                )
+            else:
+                self._validators[value_type] = OrderedDict(((value, validator),))
+            return validator
+        validator = validators.get(value)
+        if validator is None:
+            if len(validators) >= self._cache_size:
+                validators.popitem(last=False)
+            validator = validators[value] = self._build_validator(value)
+        else:
+            validators.move_to_end(value)
+        return validator
+
+    def validate(self, value: object, path: Path = None) -> Result:
         """
         validate that the provided key name matches the validator's key name
         :param value:       the key name to validate
         :param path:        list of parent keys for nested/compound structures
         :return:            validation result with validation outcome
         """
-        return Validator.for_value(
-            value if self.accepted_name is None else self.accepted_name,
-            valid_outcome=self.valid_outcome,
-            invalid_outcome=self.invalid_outcome,
-            comment=self.comment,
-        ).validate(value, path=path)
+        return self._validator_for(value).validate(value, path=path)
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        check that the provided key name matches the validator's key name, without building a Result
+        :param value:       the key name to validate
+        :param context:     unused, key validators are not contextual
+        :param path:        unused, the key name alone decides
+        :return:            True if the key name matches
+        """
+        if type(self).validate is not KeyValidator.validate:
+            return super().is_valid(value, context, path)
+        return self._validator_for(value).is_valid(value)
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not KeyValidator.validate:
+            return super()._reads_path()
+        return False
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result]:
+        """
+        compiles the key validator into a closure
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not KeyValidator.validate:
+            return super().compile(detail, budget)
+        if self._validator is not None:
+            return self._validator.compile(detail, budget)
+        validator_for = self._validator_for
+        def compiled(value:object, path:Path=None, context:object=None) -> Result:
+            return validator_for(value).validate(value, path=path)
+        return Validator._with_detail(compiled, detail, budget)
 
 
 class RequiredKey(KeyValidator):
@@ -122,7 +220,7 @@ class StartsWith(KeyValidator, ScalarValidator):
             self.accepted_prefixes = tuple(ap.lower() for ap in accepted_prefixes)
         self.repr = f"must start with " + format_sequence(self.accepted_prefixes, prefix="one of (", suffix=")")
 
-    def validate(self, value: object, path: list[str] = None) -> Result:
+    def validate(self, value: object, path: Path = None) -> Result:
         """
         validate that the provided key name matches the validator's key name
         :param value:       the key name to validate
@@ -134,3 +232,38 @@ class StartsWith(KeyValidator, ScalarValidator):
             if any(test_value.startswith(ap) for ap in self.accepted_prefixes):
                 return Result(outcome=self.valid_outcome, value=value, path=path, validator=self)
         return Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        check that the provided key name starts with one of the accepted prefixes, without building a Result
+        :param value:       the key name to validate
+        :param context:     unused, key validators are not contextual
+        :param path:        unused, the key name alone decides
+        :return:            True if the key name matches
+        """
+        if type(self).validate is not StartsWith.validate:
+            return Validator.is_valid(self, value, context, path)
+        return (self.valid_outcome != self.invalid_outcome and isinstance(value, str)
+            and (value if self.case_sensitive else value.lower()).startswith(self.accepted_prefixes))
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not StartsWith.validate:
+            return Validator._reads_path(self)
+        return False
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result]:
+        """
+        compiles the prefix checks into a closure
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not StartsWith.validate:
+            return Validator.compile(self, detail, budget)
+        accepted_prefixes, case_sensitive = self.accepted_prefixes, self.case_sensitive
+        valid_result, invalid_result = detail.result_factory(self.valid_outcome, self, budget), detail.result_factory(self.invalid_outcome, self, budget)
+        def compiled(value:object, path:Path=None, context:object=None) -> Result:
+            if isinstance(value, str) and (value if case_sensitive else value.lower()).startswith(accepted_prefixes):
+                return valid_result(value, path)
+            return invalid_result(value, path)
+        return compiled
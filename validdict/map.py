@@ -1,11 +1,18 @@
 # Map validator
 
-from .results import Outcome, FixedOutcome, Result, ResultSet
-from .validator import Validator, Any
-from .key import KeyValidator, RequiredKey, OtherKeys, StartsWith
+from typing import Callable, Generator, Iterator
+from .results import Outcome, FixedOutcome, Result, ResultSet, Detail, FailureBudget
+from .validator import Validator, Or, Any
+from .key import KeyValidator, RequiredKey, OptionalKey, OtherKeys, StartsWith
+from .scalars import ScalarValidator, Str
 from .contextual import ContextualValidator
-from .helpers import format_sequence, extend_path
+from .helpers import format_sequence, extend_path, Path
 from .locator import Locator
+from .trie import PrefixTrie
+from .stream import SCALAR, START_MAP, KEY, END_MAP, skip
+
+_STR_TYPE = frozenset((str,))                                                                       # the only key type that fixed key names are looked up by
+
 
 class Map(ContextualValidator):
     """
@@ -30,6 +37,7 @@ class Map(ContextualValidator):
         if not isinstance(map, dict):
             raise TypeError(f"Map must be of type dict (not {type(map)})")
         super().__init__(valid_outcome=valid_outcome, invalid_outcome=invalid_outcome, comment=comment)
+        self.repr = None                                                                            # built lazily by __repr__()
 
         # convert all the raw keys/values that aren't Validators into Validators
         self.map = {                                                                                # dictionary comprehension that... 
@@ -57,46 +65,44 @@ class Map(ContextualValidator):
             raise TypeError(f"KeyValidator(s) ({format_sequence([ type(v).__name__ for v in illegal_validators ])}) may not be used to validate values")
 
         # look for ambiguous fixed key names
-        key_names = []
-        for key in self.map.keys():                                                                 # loop over all the keys in the map...
-            if not isinstance(key, (OtherKeys, StartsWith)):                                        # if they are a KeyValidator with a fixed "accepted_value"...
-                key_names.append(key.accepted_name)                                                 # add the KeyValidator's accepted value to the key_names
-        duplicates = set(name for name in key_names if key_names.count(name) > 1)                   # look for duplicates in the fixed value key_names
+        fixed_keys = [ key for key in self.map.keys() if not isinstance(key, (OtherKeys, StartsWith)) ]   # KeyValidators with a fixed "accepted_value"
+        key_names, duplicates = set(), set()
+        for key in fixed_keys:
+            if key.accepted_name in key_names:
+                duplicates.add(key.accepted_name)                                                   # look for duplicates in the fixed value key_names
+            key_names.add(key.accepted_name)
         if len(duplicates) != 0:
             raise TypeError(f"Map has duplicate key names: {duplicates}")
 
         # look for cases where StartsWith() KeyValidators overlap with fixed keys
+        # - all the prefixes go into a trie, so each key name is checked against every prefix in O(len(name))
+        starts_with_keys = [ kv for kv in self.map.keys() if isinstance(kv, StartsWith) ]
+        prefixes = PrefixTrie()
+        for i, kv in enumerate(starts_with_keys):
+            for p, prefix in enumerate(kv.accepted_prefixes):
+                prefixes.add(prefix, (i, p), kv.case_sensitive)
         duplicates = []
-        for kv in (kv for kv in self.map.keys() if isinstance(kv, StartsWith)):
-            for prefix in kv.accepted_prefixes:
-                for fk in (fk for fk in self.map.keys() if not isinstance(fk, (OtherKeys, StartsWith))):
-                    if kv.case_sensitive:
-                        if fk.accepted_name.startswith(prefix):
-                            duplicates.append(f"StartsWith('{prefix}') overlaps with Key('{fk.accepted_name}')")
-                    else:
-                        if fk.accepted_name.lower().startswith(prefix.lower()):
-                            duplicates.append(f"StartsWith('{prefix}') overlaps with Key('{fk.accepted_name}')")
+        for f, fk in enumerate(fixed_keys):
+            if isinstance(fk.accepted_name, str):
+                for prefix, (i, p) in prefixes.matches(fk.accepted_name):
+                    duplicates.append(((i, p, f), f"StartsWith('{prefix}') overlaps with Key('{fk.accepted_name}')"))
         if len(duplicates) != 0:
-            raise TypeError(f"Map has ambiguous StartsWith() keys: {duplicates}")
+            raise TypeError(f"Map has ambiguous StartsWith() keys: {[ message for _, message in sorted(duplicates, key=lambda d: d[0]) ]}")
 
-        # now look for StartsWith() KeyValidators that overlap with each other, this is not pretty, 
-        # and it's even worse due to the fact that some StartsWith are case_sensitive and some are not
+        # now look for StartsWith() KeyValidators that overlap with each other, some are case_sensitive and some are not,
+        # so the prefixes are all looked up case-folded, and pairs of case_sensitive prefixes are then compared exactly
+        folded = PrefixTrie()
+        for j, kv in enumerate(starts_with_keys):
+            for q, prefix in enumerate(kv.accepted_prefixes):
+                folded.add(prefix, (j, q, kv.case_sensitive), case_sensitive=False)
         duplicates = []
-        for i, kv_i in enumerate(kv for kv in self.map.keys() if isinstance(kv, StartsWith)):
-            case_sensitive_i = kv_i.case_sensitive
-            for prefix_i in kv_i.accepted_prefixes:
-                for j, kv_j in enumerate(kv for kv in self.map.keys() if isinstance(kv, StartsWith)):
-                    if i != j:  # don't compare a list against itself
-                        case_sensitive_j = kv_j.case_sensitive
-                        for prefix_j in kv_j.accepted_prefixes:
-                            if case_sensitive_i and case_sensitive_j:
-                                if prefix_i.startswith(prefix_j):
-                                    duplicates.append(f"StartsWith({prefix_j}) overlaps with StartsWith({prefix_i})")
-                            else:
-                                if prefix_i.lower().startswith(prefix_j.lower()):
-                                    duplicates.append(f"StartsWith({prefix_j}) overlaps with StartsWith({prefix_i})")
+        for i, kv_i in enumerate(starts_with_keys):
+            for p, prefix_i in enumerate(kv_i.accepted_prefixes):
+                for prefix_j, (j, q, case_sensitive_j) in folded.matches(prefix_i):
+                    if i != j and not (kv_i.case_sensitive and case_sensitive_j and not prefix_i.startswith(prefix_j)):  # don't compare a list against itself
+                        duplicates.append(((i, p, j, q), f"StartsWith({prefix_j}) overlaps with StartsWith({prefix_i})"))
         if len(duplicates) != 0:
-            raise TypeError(f"Map has ambiguous StartsWith() keys: {duplicates}")
+            raise TypeError(f"Map has ambiguous StartsWith() keys: {[ message for _, message in sorted(duplicates, key=lambda d: d[0]) ]}")
 
         # TODO: are there additional structural checks that need to be done?
 
@@ -106,16 +112,70 @@ class Map(ContextualValidator):
         self.other_keys = [ key for key in self.map.keys() if isinstance(key, OtherKeys) ]          # will be used fore second-chance (OtherKeys() catch-all) validations
         if len(self.other_keys) > 1:
             raise TypeError("Map cannot have multiple OtherKeys() keys")
+        self._key_labels = { key: f"{key.__class__.__name__}(<value>)" for key in self.map.keys() }  # path labels for the key results
+
+        # index the fixed key names, so that a key finds its KeyValidator with a hash lookup, and route keys
+        # to their StartsWith() KeyValidator through a prefix trie in O(len(key))
+        # - everything else (validator-named and callback keys) is tried in order, but only when neither finds the key
+        # - StartsWith() can't overlap a fixed key name, so only the other keys declared earlier can take precedence
+        self._key_index = {}                                                                        # fixed key name -> tuple of KeyValidators to try, in order
+        self._prefix_trie = PrefixTrie()                                                            # StartsWith() prefix -> tuple of KeyValidators to try, in order
+        unindexed_keys = []
+        for key in self.keys:
+            if Map._is_fixed_key(key) and key.valid_outcome != key.invalid_outcome:
+                self._key_index[key.accepted_name] = tuple(
+                    kv for kv in unindexed_keys if type(kv).validate is not StartsWith.validate
+                ) + (key,)
+            elif type(key).validate is StartsWith.validate and key.valid_outcome != key.invalid_outcome:
+                for prefix in key.accepted_prefixes:
+                    self._prefix_trie.add(prefix, tuple(unindexed_keys) + (key,), key.case_sensitive)
+            else:
+                unindexed_keys.append(key)
+        self._unindexed_keys = tuple(unindexed_keys)                                                # KeyValidators to try, in order, when the key isn't indexed or routed
+        self._allowed_names = (frozenset(self._key_index)                                           # the only key names a valid map can have, None when any name might be
+            if len(self._unindexed_keys) == 0 and not self._prefix_trie and len(self.other_keys) == 0 else None)
+        self._missing_required_keys = self._compile_missing_required_keys()                        # will be used for required key checks without building Results
+        self._paths_read = any(key._reads_path() or value._reads_path() for key, value in self.map.items())  # the paths of the keys and values are only built for is_valid() when one reads them
+
+    def __getstate__(self) -> dict:
+        """
+        pickles the map without its compiled missing required key check, which is rebuilt when unpickled
+        """
+        state = self.__dict__.copy()
+        del state["_missing_required_keys"]
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        self.__dict__.update(state)
+        self._missing_required_keys = self._compile_missing_required_keys()
 
     def __repr__(self) -> str:
         """
         string representation of the validator
         """
+        if self.repr is not None:
+            return self.repr                                                                        # the description is built once, on first use
         validator_repr_max_len = 60
         map_description = "{ " + ", ".join(k.__class__.__name__ + "(): " + v.__class__.__name__ + "()" for k, v in self.map.items()) + " }"
-        return "must be a map like: " + (map_description if len(map_description) <= validator_repr_max_len else (map_description[:validator_repr_max_len] + " <snip>"))
+        self.repr = "must be a map like: " + (map_description if len(map_description) <= validator_repr_max_len else (map_description[:validator_repr_max_len] + " <snip>"))
+        return self.repr
     
-    def _validate_key_value_pair(self, k:object, v:object, key_validators:list[KeyValidator], path:list[str]=None, context:object=None) -> ResultSet:
+    def _candidate_keys(self, k:object) -> tuple[KeyValidator, ...]:
+        """
+        Class helper function that looks up the first-chance KeyValidators that k could match, in declaration order
+        - only a str key can be a fixed key name, Str() accepts the exact type, but any str can match a StartsWith() prefix
+        :param k:                   the key to look up
+        :return:                    the KeyValidators to try
+        """
+        if type(k) is str:
+            candidates = self._key_index.get(k)
+            if candidates is not None:
+                return candidates
+        elif not isinstance(k, str):
+            return self._unindexed_keys
+        return self._prefix_trie.first(k, self._unindexed_keys) if self._prefix_trie else self._unindexed_keys
+
+    def _validate_key_value_pair(self, k:object, v:object, key_validators:list[KeyValidator], path:Path=None, context:object=None) -> ResultSet:
         """
         Class helper function that validates a key:value pair against the map
         :param k:                   the Key to validate
@@ -125,14 +185,14 @@ class Map(ContextualValidator):
         """
         rval = ResultSet()
         for key_validator in key_validators:
-            key_result = ContextualValidator.validate_with_context(key_validator, k, extend_path(path, f"{key_validator.__class__.__name__}(<value>)"), context)
+            key_result = ContextualValidator.validate_with_context(key_validator, k, extend_path(path, self._key_labels[key_validator]), context)
             if key_result:
                 rval.add_results(key_result)
                 rval.add_results(ContextualValidator.validate_with_context(self.map[key_validator], v, extend_path(path, k), context))
                 break # out of for each key_validator
         return rval
     
-    def validate(self, value:object, path:list[str]=None, context:object=None) -> ResultSet:
+    def validate(self, value:object, path:Path=None, context:object=None) -> ResultSet:
         """
         validates a dict, makes sure it has all required keys and validates all values against the validator's own map of validators
         :param value:       the map to validate
@@ -145,16 +205,13 @@ class Map(ContextualValidator):
             rval.add_results(Result(outcome=self.valid_outcome, value=value, path=path, validator=self))
 
             # validate that all required keys are present in the dict
-            missing_required_keys = []
-            for key_validator in self.required_keys:
-                if not any(key_validator.validate(key).outcome != Outcome.FAIL for key in value.keys()):
-                    missing_required_keys.append(key_validator.accepted_name)
+            missing_required_keys = self._missing_required_keys(value)
             if len(missing_required_keys) > 0:
-                rval.add_results(Result(outcome=self.invalid_outcome, value=format_sequence(missing_required_keys, quote=""), path=extend_path(path, f"RequiredKey('<all>')"), validator=FixedOutcome(self.invalid_outcome, is_valid=False, message="missing required key(s)")))
+                rval.add_results(Result(outcome=self.invalid_outcome, value=format_sequence(missing_required_keys, quote=""), path=extend_path(path, "RequiredKey('<all>')"), validator=FixedOutcome(self.invalid_outcome, is_valid=False, message="missing required key(s)")))
 
             # validate each key/value pair against it's KeyValidator and matching value Validator
             for k, v in value.items():                                                              # loop over all the key/value pairs in the dict to validate each of them
-                first_chance_results = self._validate_key_value_pair(k, v, self.keys, path, context)
+                first_chance_results = self._validate_key_value_pair(k, v, self._candidate_keys(k), path, context)
                 if len(first_chance_results) > 0:                                           # if the first chance (required/optional keys) results were found
                     rval.add_results(first_chance_results)                                          # add the results
                 else:                                                                               # else, move on to trying to match the second chance (other) key
@@ -162,11 +219,493 @@ class Map(ContextualValidator):
                     if len(second_chance_results) > 0:                                      # if the second chance (other key) results were found 
                         rval.add_results(second_chance_results)                                     # add the results
                     else:
-                        rval.add_results(Result(outcome=self.invalid_outcome, value=k, path=extend_path(path, f"Key('{k}')"), validator=FixedOutcome(self.invalid_outcome, is_valid=False, message="unknown key name")))      # no keys validated, it must be illegal
+                        rval.add_results(Result(outcome=self.invalid_outcome, value=k, path=extend_path(path, "Key('{}')", k), validator=FixedOutcome(self.invalid_outcome, is_valid=False, message="unknown key name")))      # no keys validated, it must be illegal
 
         else:
             rval.add_results(Result(outcome=self.invalid_outcome, value=value, path=path, validator=self))        # not a dict, it must be invalid
         return rval
 
+    def iter_validate(self, value:object, path:Path=None, context:object=None) -> Iterator[Result]:
+        """
+        validates a dict, yielding the Results as they're produced
+        :param value:       the map to validate
+        :param path:        list of parent keys for nested/compound structures
+        :param context:     the root dict that is being validated, used to pass context down to ContextualValidators
+        :return:            iterator of the Results, in the same order as validate()
+        """
+        if type(self).validate is not Map.validate or type(self)._validate_key_value_pair is not Map._validate_key_value_pair:
+            yield from super().iter_validate(value, path, context)
+            return
+        if not isinstance(value, dict):
+            yield Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
+            return
+        yield Result(outcome=self.valid_outcome, value=value, path=path, validator=self)
+        missing_required_keys = self._missing_required_keys(value)
+        if len(missing_required_keys) > 0:
+            yield Result(outcome=self.invalid_outcome, value=format_sequence(missing_required_keys, quote=""), path=extend_path(path, "RequiredKey('<all>')"), validator=FixedOutcome(self.invalid_outcome, is_valid=False, message="missing required key(s)"))
+        for k, v in value.items():
+            for key_validators in (self._candidate_keys(k), self.other_keys):                      # first chance (required/optional) keys, then the second chance (other) key
+                for key_validator in key_validators:
+                    key_result = ContextualValidator.validate_with_context(key_validator, k, extend_path(path, self._key_labels[key_validator]), context)
+                    if key_result:
+                        break # out of for each key_validator
+                else:
+                    continue
+                yield from ResultSet(key_result)
+                yield from self.map[key_validator].iter_validate(v, extend_path(path, k), context)
+                break # out of for each key_validators
+            else:
+                yield Result(outcome=self.invalid_outcome, value=k, path=extend_path(path, "Key('{}')", k), validator=FixedOutcome(self.invalid_outcome, is_valid=False, message="unknown key name"))
+
+    def _accepts_type(self, value_type:type) -> bool:
+        if type(self).validate is not Map.validate:
+            return super()._accepts_type(value_type)
+        return issubclass(value_type, dict)
+
+    def _type_mismatch(self, value:object, path:Path=None) -> ResultSet:
+        return ResultSet(super()._type_mismatch(value, path=path))
+
+    def _accepts_shape(self, value:object) -> bool:
+        """
+        rejects a map from its key names alone, with set operations: a required key is missing, or a key isn't
+        accepted by any key validator and there's no OtherKeys() to catch it, either one is always an invalid result
+        """
+        if type(self).validate is not Map.validate or type(self)._validate_key_value_pair is not Map._validate_key_value_pair:
+            return super()._accepts_shape(value)
+        if not isinstance(value, dict) or len(self._missing_required_keys(value)) > 0:
+            return False
+        return self._allowed_names is None or self._allowed_names.issuperset(value)
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a dict against the map without building any Results, stopping at the first invalid key or value
+        :param value:       the map to validate
+        :param context:     the root dict that is being validated, used to pass context down to ContextualValidators
+        :param path:        list of parent keys for nested/compound structures
+        :return:            True if validate() would return a valid ResultSet
+        """
+        if type(self).validate is not Map.validate or type(self)._validate_key_value_pair is not Map._validate_key_value_pair:
+            return super().is_valid(value, context, path)
+        if not isinstance(value, dict) or self.valid_outcome == self.invalid_outcome:
+            return False
+        if len(self._missing_required_keys(value)) > 0:
+            return False
+        paths_read = self._paths_read
+        for k, v in value.items():
+            for key_validator in self._candidate_keys(k):                                           # first chance (required/optional) keys...
+                if key_validator.is_valid(k, context, extend_path(path, self._key_labels[key_validator]) if paths_read else None):
+                    break # out of for each key_validator
+            else:
+                for key_validator in self.other_keys:                                               # ...then the second chance (other) key
+                    if key_validator.is_valid(k, context, extend_path(path, self._key_labels[key_validator]) if paths_read else None):
+                        break # out of for each key_validator
+                else:
+                    return False                                                                    # no keys validated, it must be illegal
+            if not self.map[key_validator].is_valid(v, context, extend_path(path, k) if paths_read else None):
+                return False
+        return True
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not Map.validate or type(self)._validate_key_value_pair is not Map._validate_key_value_pair:
+            return super()._reads_path()
+        return self._paths_read
+
+    @staticmethod
+    def _is_fixed_key(key_validator:KeyValidator) -> bool:
+        """
+        Class helper function that decides if a KeyValidator only ever matches one fixed key name
+        :param key_validator:       the key validator to check
+        :return:                    True if the key can be matched by its name alone
+        """
+        return (type(key_validator).validate is KeyValidator.validate
+            and isinstance(key_validator.accepted_name, str)
+            and Locator.lookup(str) is Str)
+
+    def _required_key_checks(self) -> list:
+        """
+        Class helper function that builds how each required key is found among the keys of a dict
+        - a required key is present when any key in the dict validates to something other than FAIL, for fixed
+          key names that's a hash lookup among the keys of type str, and only keys that can't be decided up front validate every key
+        :return:                    list of (accepted name, matches), matches is None for a fixed key name, or a
+                                    function fn(key) that tells whether a key is the required key
+        """
+        checks = []
+        for key_validator in self.required_keys:
+            accepted_name = key_validator.accepted_name
+            outcomes = accepted_name if isinstance(accepted_name, ScalarValidator) else key_validator
+            overridden = type(key_validator).validate is not KeyValidator.validate
+            if not overridden and outcomes.valid_outcome != Outcome.FAIL and outcomes.invalid_outcome != Outcome.FAIL:
+                checks.append((accepted_name, lambda key: True))                                    # any key at all is a non-FAIL outcome
+            elif not overridden and outcomes.valid_outcome == Outcome.FAIL and outcomes.invalid_outcome == Outcome.FAIL:
+                checks.append((accepted_name, lambda key: False))                                   # every key is a FAIL outcome
+            elif Map._is_fixed_key(key_validator) and outcomes.invalid_outcome == Outcome.FAIL:
+                checks.append((accepted_name, None))                                                # only the fixed key name is a non-FAIL outcome
+            else:
+                key_fn = key_validator.compile()
+                checks.append((accepted_name, lambda key, key_fn=key_fn: key_fn(key, None, None).outcome != Outcome.FAIL))
+        return checks
+
+    def _compile_missing_required_keys(self) -> Callable[[dict], list]:
+        """
+        Class helper function that compiles the missing required key check into a closure
+        - when every required key has a fixed name, a dict that has all of them is confirmed with one set comparison
+        :return:                    closure that returns the list of missing required key names for a dict
+        """
+        checks = self._required_key_checks()
+        by_name = [ name for name, matches in checks if matches is None ]
+        if len(by_name) == len(checks):
+            required_names = frozenset(by_name)
+            if len(required_names) == 0:
+                return lambda value: []
+            def missing_required_keys(value:dict) -> list:
+                if value.keys() >= required_names and set(map(type, value)) <= _STR_TYPE:          # the usual case, all the names are there, as str keys
+                    return []
+                names = Map._str_keys(value)
+                return [ name for name in by_name if name not in names ]
+            return missing_required_keys
+        def missing_required_keys(value:dict) -> list:
+            names = Map._str_keys(value) if by_name else None
+            return [ name for name, matches in checks if (name not in names if matches is None else not any(map(matches, value))) ]
+        return missing_required_keys
+
+    @staticmethod
+    def _str_keys(value:dict) -> object:
+        """
+        Class helper function that gets the keys of a dict that can be fixed key names, as a set-like view
+        - the Str() of a fixed key name only accepts the exact str type, a str subclass that's equal to the name isn't the key
+        :param value:               the dict
+        :return:                    the dict's keys when they're all of type str, otherwise the set of its str keys
+        """
+        if set(map(type, value)) <= _STR_TYPE:
+            return value.keys()
+        return { k for k in value if type(k) is str }
+
+    def _compile_key_match(self, compiled_keys:dict) -> Callable[[object, Path, object], tuple]:
+        """
+        Class helper function that compiles how a key finds the first key validator it validates against, in the same order as validate() tries them
+        :param compiled_keys:       dict of each key validator -> (compiled key validator, payload), the payload is returned with the key's result,
+                                    like the compiled value validator
+        :return:                    closure fn(k, path, context) that returns (key result, payload), or (None, None) when no key validator matches
+        """
+        key_labels, candidate_keys = self._key_labels, self._candidate_keys
+        compiled_keys = { key: (key_labels[key], key_fn, payload) for key, (key_fn, payload) in compiled_keys.items() }
+        other_keys = [ compiled_keys[key] for key in self.other_keys ]
+        def match(k:object, path:Path, context:object) -> tuple:
+            for key in candidate_keys(k):                                                           # first chance (required/optional) keys...
+                label, key_fn, payload = compiled_keys[key]
+                key_result = key_fn(k, extend_path(path, label), context)
+                if key_result:
+                    return key_result, payload
+            for label, key_fn, payload in other_keys:                                               # ...then the second chance (other) key
+                key_result = key_fn(k, extend_path(path, label), context)
+                if key_result:
+                    return key_result, payload
+            return None, None
+        return match
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], ResultSet]:
+        """
+        compiles the map and all its nested validators into a single closure
+        :param detail:              the results to keep
+        :param budget:              counts the failures, to stop once max_failures is reached
+        :return:                    the compiled validation closure
+        """
+        if type(self).validate is not Map.validate or type(self)._validate_key_value_pair is not Map._validate_key_value_pair:
+            return super().compile(detail, budget)
+
+        match = self._compile_key_match({ key: (key.compile(detail, budget), value.compile(detail, budget)) for key, value in self.map.items() })  # -> (key result, value_fn)
+        missing_required_keys = self._missing_required_keys
+        valid_result, invalid_result = detail.result_factory(self.valid_outcome, self, budget), detail.result_factory(self.invalid_outcome, self, budget)
+        missing_result = detail.result_factory(self.invalid_outcome, FixedOutcome(self.invalid_outcome, is_valid=False, message="missing required key(s)"), budget)
+        unknown_result = detail.result_factory(self.invalid_outcome, FixedOutcome(self.invalid_outcome, is_valid=False, message="unknown key name"), budget)
+
+        def compiled(value:object, path:Path=None, context:object=None) -> ResultSet:
+            rval = ResultSet()
+            if not isinstance(value, dict):
+                rval.add_results(invalid_result(value, path))
+                return rval
+            rval.add_results(valid_result(value, path))
+            missing = missing_required_keys(value)
+            if len(missing) > 0:
+                rval.add_results(missing_result(format_sequence(missing, quote=""), extend_path(path, "RequiredKey('<all>')")))
+            for k, v in value.items():
+                if budget is not None:
+                    if budget.exhausted():
+                        break
+                    failures = budget.failures
+                    key_result, value_fn = match(k, path, context)
+                    budget.failures = failures                                                  # the key validators that didn't match are discarded
+                else:
+                    key_result, value_fn = match(k, path, context)
+                if key_result is None:
+                    rval.add_results(unknown_result(k, extend_path(path, "Key('{}')", k)))
+                else:
+                    rval.add_results(key_result, value_fn(v, extend_path(path, k), context))
+            return rval
+        return compiled
+
+    def compile_records(self, detail:Detail=Detail.FULL) -> Callable[[list, Path, object], list[ResultSet]]:
+        """
+        compiles the map into a closure that validates a batch of records column by column, with the signature fn(records, path, context)
+        - records with the same keys, in the same order, share a shape: the keys are matched and the required keys
+          checked once per shape, and each column of values is validated as a batch, scalar values by _rejected_items()
+        - the results of each record are the same as the compiled map's, key results are shared between records
+        - records that aren't dicts, or have keys that aren't of type str, and maps whose key validators need the context,
+          are validated one at a time
+        :param detail:              the results to keep
+        :return:                    the compiled closure, it returns the results of each record, in order; when the context
+                                    is None, each record is its own context
+        """
+        compiled = self.compile(detail)
+        if type(self).validate is not Map.validate or type(self)._validate_key_value_pair is not Map._validate_key_value_pair or any(isinstance(key, ContextualValidator) for key in self.map):
+            def compiled_each(records:list, path:Path=None, context:object=None) -> list[ResultSet]:
+                return [ compiled(record, path, record if context is None else context) for record in records ]
+            return compiled_each
+
+        match = self._compile_key_match({ key: (key.compile(detail), (value, value.compile(detail))) for key, value in self.map.items() })  # -> (key result, (value, value_fn))
+        missing_required_keys = self._missing_required_keys
+        valid_result = detail.result_factory(self.valid_outcome, self)
+        missing_result = detail.result_factory(self.invalid_outcome, FixedOutcome(self.invalid_outcome, is_valid=False, message="missing required key(s)"))
+        unknown_result = detail.result_factory(self.invalid_outcome, FixedOutcome(self.invalid_outcome, is_valid=False, message="unknown key name"))
+        value_results = { id(value): (detail.result_factory(value.valid_outcome, value), detail.result_factory(value.invalid_outcome, value))
+            for value in self.map.values() if isinstance(value, ScalarValidator) and value._bulk_checkable() }
+
+        def validate_column(records:list, rows:list, k:object, value:Validator, value_fn:Callable, path:Path, context:object) -> list:
+            """
+            validates the values of a key in each record of a shape
+            """
+            value_path = extend_path(path, k)
+            column = [ records[row][k] for row in rows ]
+            factories = value_results.get(id(value))
+            if factories is None:
+                if context is None:
+                    return [ value_fn(v, value_path, records[row]) for row, v in zip(rows, column) ]
+                return [ value_fn(v, value_path, context) for v in column ]
+            valid_value, invalid_value = factories
+            rejected = value._rejected_items(column)
+            if len(rejected) == 0:
+                return [ valid_value(v, value_path) for v in column ]
+            rejected = set(rejected)
+            return [ (invalid_value if index in rejected else valid_value)(v, value_path) for index, v in enumerate(column) ]
+
+        def compiled_records(records:list, path:Path=None, context:object=None) -> list[ResultSet]:
+            records = records if isinstance(records, (list, tuple)) else list(records)
+            results, shapes = [ None ] * len(records), {}
+            for row, record in enumerate(records):
+                if type(record) is dict and set(map(type, record)) <= _STR_TYPE:                   # keys of other types can be equal to str keys, but not match the same key validators
+                    shape = tuple(record)
+                    rows = shapes.get(shape)
+                    if rows is None:
+                        shapes[shape] = [ row ]
+                    else:
+                        rows.append(row)
+                else:
+                    results[row] = compiled(record, path, record if context is None else context)
+            for shape, rows in shapes.items():
+                missing = missing_required_keys(records[rows[0]])
+                missing = missing_result(format_sequence(missing, quote=""), extend_path(path, "RequiredKey('<all>')")) if len(missing) > 0 else None
+                template, columns = [ None ] if missing is None else [ None, missing ], []                # the results of every record of the shape, in order, the value results are filled in per record
+                for k in shape:
+                    key_result, value_fns = match(k, path, None)
+                    if key_result is None:
+                        template.append(unknown_result(k, extend_path(path, "Key('{}')", k)))
+                    else:
+                        value, value_fn = value_fns
+                        template.append(key_result)
+                        columns.append((len(template), validate_column(records, rows, k, value, value_fn, path, context)))
+                        template.append(None)
+                for index, row in enumerate(rows):
+                    record_results = list(template)
+                    record_results[0] = valid_result(records[row], path)
+                    for position, column in columns:
+                        record_results[position] = column[index]
+                    results[row] = ResultSet(*record_results)
+            return results
+        return compiled_records
+
+    def compile_stream(self, detail:Detail=Detail.FULL) -> Callable[[tuple, Path, object], Generator[None, tuple, ResultSet]]:
+        """
+        compiles the map into a consumer of the JSON events of a value, that validates each key and value as it's read
+        - required keys are checked off as the keys are read, no key names are kept, values are streamed to their value validators
+        - a key that's repeated in the document is validated each time it's read
+        :param detail:              the results to keep
+        :return:                    the compiled consumer factory
+        """
+        if type(self).validate is not Map.validate or type(self)._validate_key_value_pair is not Map._validate_key_value_pair:
+            return super().compile_stream(detail)
+
+        compiled = self.compile(detail)
+        match = self._compile_key_match({ key: (key.compile(detail), (value.compile(detail), value.compile_stream(detail))) for key, value in self.map.items() })  # -> (key result, (value_fn, value_stream))
+        required_key_checks = self._required_key_checks()                                         # required keys are checked off as the keys are read, no key names are kept
+        fixed_required_keys = { name: index for index, (name, matches) in enumerate(required_key_checks) if matches is None }
+        matched_required_keys = [ (index, matches) for index, (name, matches) in enumerate(required_key_checks) if matches is not None ]
+        valid_result = detail.result_factory(self.valid_outcome, self)
+        missing_result = detail.result_factory(self.invalid_outcome, FixedOutcome(self.invalid_outcome, is_valid=False, message="missing required key(s)"))
+        unknown_result = detail.result_factory(self.invalid_outcome, FixedOutcome(self.invalid_outcome, is_valid=False, message="unknown key name"))
+
+        def stream(event:tuple, path:Path=None, context:object=None) -> Generator[None, tuple, ResultSet]:
+            if event[0] is not START_MAP:
+                value = yield from skip(event)
+                return compiled(value, path, context)
+            pairs, found = ResultSet(), [ False ] * len(required_key_checks)
+            while True:
+                kind, k = yield
+                if kind is END_MAP:
+                    break
+                index = fixed_required_keys.get(k) if type(k) is str else None
+                if index is not None:
+                    found[index] = True
+                for index, matches in matched_required_keys:
+                    if not found[index] and matches(k):
+                        found[index] = True
+                key_result, value_fns = match(k, path, context)
+                event = yield
+                if key_result is None:
+                    yield from skip(event)
+                    pairs.add_results(unknown_result(k, extend_path(path, "Key('{}')", k)))
+                elif event[0] is SCALAR:
+                    pairs.add_results(key_result, value_fns[0](event[1], extend_path(path, k), context))
+                else:
+                    pairs.add_results(key_result, (yield from value_fns[1](event, extend_path(path, k), context)))
+            rval = ResultSet(valid_result({}, path))
+            missing = [ name for (name, _matches), present in zip(required_key_checks, found) if not present ]  # the results of the check come before the pairs, like in validate()
+            if len(missing) > 0:
+                rval.add_results(missing_result(format_sequence(missing, quote=""), extend_path(path, "RequiredKey('<all>')")))
+            rval.add_results(pairs)
+            return rval
+        return stream
+
 # register the Map validator with the Locator to validate dict objects
 Locator.register(dict, Map)
+
+
+class OneOf(Or):
+    """
+    Validates a map against one of several Map alternatives, chosen by the value of a discriminator key
+    - a tagged union: each alternative requires the discriminator key with a Str() of literal values, like
+      Map({ "kind": Str("A"), ... }) | Map({ "kind": Str("B"), ... }), the tags are hashed when it's built
+    - a map is only validated by the alternative its tag selects, when that alternative is valid the results are
+      the same as the Or's, when it's invalid only its failures are kept, and an unknown or missing tag fails once
+    """
+
+    def __init__(self, *validators:Map, discriminator:str, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> None:
+        """
+        constructor
+        :param validators:      args list of the Map alternatives
+        :param discriminator:   the name of the key whose value selects the alternative
+        """
+        if not isinstance(discriminator, str) or len(discriminator) == 0:
+            raise TypeError("discriminator must be a non-zero length string")
+        super().__init__(*validators, valid_outcome=valid_outcome, invalid_outcome=invalid_outcome, comment=comment)
+        self.discriminator = discriminator
+        self._routes:dict = {}                                                                      # tag -> (alternative, label)
+        for validator, label in zip(self.validators, self._labels):
+            for tag in OneOf._tags(validator, discriminator):
+                if tag in self._routes:
+                    raise TypeError(f"OneOf tag '{tag}' is accepted by more than one alternative")
+                self._routes[tag] = (validator, label)
+        self._unknown_tag = FixedOutcome(invalid_outcome, is_valid=False, message=f"must be a known '{discriminator}' tag: {format_sequence(list(self._routes), prefix='one of (', suffix=')')}")
+
+    @staticmethod
+    def _tags(validator:Validator, discriminator:str) -> tuple:
+        """
+        private helper that gets the tags an alternative accepts, from the literal values of its discriminator key
+        """
+        if not isinstance(validator, Map) or type(validator).validate is not Map.validate:
+            raise TypeError("OneOf alternatives must be of type Map")
+        for key, value in validator.map.items():
+            if (isinstance(key, RequiredKey) and Map._is_fixed_key(key) and key.accepted_name == discriminator and key.valid_outcome != key.invalid_outcome
+                and type(value).validate is Str.validate and value.case_sensitive and value.valid_outcome != value.invalid_outcome
+                and len(value.accepted_values) > 0 and all(isinstance(tag, str) for tag in value.accepted_values)):
+                return value.accepted_values
+        raise TypeError(f"OneOf alternatives must have a RequiredKey('{discriminator}') with a Str() of literal values")
+
+    def __repr__(self) -> str:
+        return f"{super().__repr__()} by '{self.discriminator}'"
+
+    def _route(self, value:dict) -> tuple:
+        """
+        private helper that finds the alternative of a map's tag
+        :return:            (alternative, label), or None for an unknown or missing tag
+        """
+        tag = value.get(self.discriminator)
+        return self._routes.get(tag) if type(tag) is str else None
+
+    def validate(self, value:object, path:Path=None) -> ResultSet:
+        """
+        validates a map against the alternative its tag selects
+        :param value:       the value to validate
+        :param path:        list of parent keys for nested/compound structures
+        :return:            validation result set, when invalid it contains the failing results of the selected alternative
+        """
+        if not isinstance(value, dict):
+            return ResultSet(Result(self.invalid_outcome, value=value, path=path, validator=self))
+        route = self._route(value)
+        if route is None:
+            return ResultSet(Result(self.invalid_outcome, value=value, path=path, validator=self),
+                Result(self.invalid_outcome, value=value.get(self.discriminator), path=extend_path(path, self.discriminator), validator=self._unknown_tag))
+        alternative, label = route
+        result = alternative.validate(value, path=extend_path(path, label))                         # like Or, the alternatives get no context
+        return ResultSet(Result(self.valid_outcome if result else self.invalid_outcome, value=value, path=path, validator=self), result)
+
+    def _accepts_type(self, value_type:type) -> bool:
+        if type(self).validate is not OneOf.validate:
+            return super()._accepts_type(value_type)
+        return issubclass(value_type, dict)
+
+    def _type_mismatch(self, value:object, path:Path=None) -> ResultSet:
+        return ResultSet(super()._type_mismatch(value, path=path))
+
+    def _accepts_shape(self, value:object) -> bool:
+        if type(self).validate is not OneOf.validate:
+            return super()._accepts_shape(value)
+        if not isinstance(value, dict):
+            return False
+        route = self._route(value)
+        return route is not None and route[0]._accepts_shape(value)
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a map against the alternative its tag selects
+        :param value:       the value to validate
+        :param context:     unused, like validate() the alternatives are not given context
+        :param path:        list of parent keys for nested/compound structures
+        :return:            True if the selected alternative is valid
+        """
+        if type(self).validate is not OneOf.validate:
+            return super().is_valid(value, context, path)
+        if not isinstance(value, dict) or self.valid_outcome == self.invalid_outcome:
+            return False
+        route = self._route(value)
+        return route is not None and route[0].is_valid(value, None, extend_path(path, route[1]) if self._paths_read else None)
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not OneOf.validate:
+            return super()._reads_path()
+        return self._paths_read
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], ResultSet]:
+        """
+        compiles the OneOf and its alternatives into a single closure
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not OneOf.validate:
+            return super().compile(detail, budget)
+        compiled_validators = { id(validator): validator.compile(detail, budget) for validator in self.validators }
+        routes = { tag: (label, compiled_validators[id(validator)]) for tag, (validator, label) in self._routes.items() }
+        discriminator = self.discriminator
+        valid_result, invalid_result = detail.result_factory(self.valid_outcome, self, budget), detail.result_factory(self.invalid_outcome, self, budget)
+        unknown_result = detail.result_factory(self.invalid_outcome, self._unknown_tag, budget)
+        def compiled(value:object, path:Path=None, context:object=None) -> ResultSet:
+            if not isinstance(value, dict):
+                return ResultSet(invalid_result(value, path))
+            tag = value.get(discriminator)
+            route = routes.get(tag) if type(tag) is str else None
+            if route is None:
+                return ResultSet(invalid_result(value, path), unknown_result(tag, extend_path(path, discriminator)))
+            label, alternative = route
+            result = alternative(value, extend_path(path, label), None)                             # like validate(), the alternatives get no context
+            return ResultSet(valid_result(value, path) if result else invalid_result(value, path), result)
+        return compiled
@@ -0,0 +1,248 @@
+# Parallel Validation
+
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from itertools import islice
+from typing import Iterable, Iterator
+import json
+import mmap
+import os
+import pickle
+from .results import Outcome, OutcomeProvider, Result, ResultSet, ResultSummary, Detail, _OUTCOMES
+from .helpers import Path
+from .schema import Schema
+
+# the schema of the current worker process, set once by _init_worker()
+_worker_schema:Schema = None
+
+
+class _DecodedValidator(OutcomeProvider):
+    """
+    Stand-in for a validator whose results were validated in a worker process
+    - only keeps what a Result needs: the outcomes, the message and the comment
+    """
+    def __init__(self, message:str, valid_outcome:Outcome, invalid_outcome:Outcome, comment:str) -> None:
+        super().__init__(valid_outcome=valid_outcome, invalid_outcome=invalid_outcome, comment=comment)
+        self.message = message
+
+    def __repr__(self) -> str:
+        return self.message
+
+
+def load_schema(import_path:str) -> Schema:
+    """
+    Loads a schema from an import path
+    :param import_path:     'package.module:attribute', the attribute can be a Schema, or anything Schema() accepts
+    :return:                the schema
+    """
+    if not isinstance(import_path, str) or import_path.count(":") != 1:
+        raise TypeError("import_path must be a string like 'package.module:attribute'")
+    module_name, attribute = import_path.split(":")
+    schema = import_module(module_name)
+    for name in attribute.split("."):
+        schema = getattr(schema, name)
+    return schema if isinstance(schema, Schema) else Schema(schema)
+
+
+def _init_worker(schema:bytes|str) -> None:
+    """
+    private helper that receives the schema once, when a worker process starts
+    """
+    global _worker_schema
+    _worker_schema = pickle.loads(schema) if isinstance(schema, bytes) else load_schema(schema)
+
+
+def _encode(results:Result|ResultSet) -> tuple:
+    """
+    private helper that encodes a document's results for the trip back from the worker
+    - validators are sent once per document as (message, valid, invalid, comment) tuples, and rows refer to them by index
+    - validators whose message names the value, like the key name validators, are sent once per message
+    - container values are sent as empty containers of the same type, which print the same
+    :return:                (counts, invalid count, truncated, validators, rows of (outcome code, value, path labels, validator index))
+    """
+    if not isinstance(results, ResultSet):
+        results = ResultSet(results)
+    validators, validator_index, rows = [], {}, []
+    for result in results:
+        validator = result.validator
+        key = id(validator) if type(validator)._message_for is OutcomeProvider._message_for else (id(validator), result.message)
+        index = validator_index.get(key)
+        if index is None:
+            index = validator_index[key] = len(validators)
+            validators.append((result.message, validator.valid_outcome._code, validator.invalid_outcome._code, validator.comment))
+        value = result.value
+        if isinstance(value, (dict, list)):
+            value = type(value)()
+        path = result.path
+        rows.append((result.outcome._code, value, None if path is None else tuple(path), index))
+    return (results._counts, results._invalid_count, results.truncated, tuple(validators), tuple(rows))
+
+
+def _decode(encoded:tuple) -> ResultSet:
+    """
+    private helper that rebuilds a document's results from their encoding
+    """
+    counts, invalid_count, truncated, validators, rows = encoded
+    validators = [ _DecodedValidator(message, _OUTCOMES[valid], _OUTCOMES[invalid], comment) for message, valid, invalid, comment in validators ]
+    results = ResultSet(*(
+        Result(_OUTCOMES[outcome], value, None if path is None else Path.from_list(path), validators[index])
+        for outcome, value, path, index in rows
+    ))
+    results._counts, results._invalid_count, results.truncated = counts, invalid_count, truncated
+    return results
+
+
+def _validate_chunk(documents:list, context:object, detail:Detail, max_failures:int) -> list[tuple]:
+    """
+    private helper that validates a chunk of documents in a worker process
+    """
+    return [ _encode(results) for results in _worker_schema.validate_many(documents, context=context, detail=detail, max_failures=max_failures) ]
+
+
+def validate_parallel(schema:Schema|str, documents:Iterable, *, workers:int=None, chunk_size:int=256, context:object=None, detail:Detail=Detail.FULL, max_failures:int=None) -> Iterator[ResultSet]:
+    """
+    Validates documents across a pool of worker processes
+    - each worker receives the schema once, pickled, or loaded from an import path when it holds callbacks that can't be pickled
+    - documents are sent in chunks, with only a few chunks per worker in flight, so documents can be a lazy iterable
+    - each document's results are rebuilt from a compact encoding, with the same outcomes, paths, messages and counts
+      as Schema.validate(); container values are replaced by empty containers of the same type
+    :param schema:          the Schema, or an import path like 'package.module:attribute' to load it from in each worker
+    :param documents:       iterable of the documents to validate
+    :param workers:         the number of worker processes, default: os.cpu_count()
+    :param chunk_size:      the number of documents sent to a worker at a time
+    :param context:         context object to pass to any contextual validators, each document is its own context if None
+    :param detail:          the results to keep: FULL, NON_PASS, INVALID_ONLY or COUNTS_ONLY
+    :param max_failures:    the number of invalid results to stop each document at, None to validate whole documents
+    :return:                iterator of each document's results, in the order of the documents
+    """
+    shipped = _ship(schema)
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise TypeError("chunk_size must be a positive int")
+    workers = workers or os.cpu_count() or 1
+
+    documents = iter(documents)
+    chunks = iter(lambda: list(islice(documents, chunk_size)), [])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shipped,)) as executor:
+        calls = ((_validate_chunk, chunk, context, detail, max_failures) for chunk in chunks)
+        for encoded_chunk in _in_order(executor, calls, workers * 2):
+            for encoded in encoded_chunk:
+                yield _decode(encoded)
+
+
+def validate_jsonl(schema:Schema|str, path:str, *, workers:int=None, shard_size:int=1 << 22, context:object=None, detail:Detail=Detail.NON_PASS, max_failures:int=None, summary:ResultSummary=None) -> Iterator[tuple[int, ResultSet]]:
+    """
+    Validates each line of a JSON Lines file across a pool of worker processes
+    - the file is split into shards of about shard_size bytes that end at line breaks, and each worker memory-maps
+      the file to read, parse and validate its own shards, so no documents are read or pickled by this process
+    - only the lines that aren't valid are sent back, the counts of every line are added to the summary;
+      a line that isn't JSON fails with the parser's error, and blank lines are skipped
+    :param schema:          the Schema, or an import path like 'package.module:attribute' to load it from in each worker
+    :param path:            the path of the JSON Lines file
+    :param workers:         the number of worker processes, default: os.cpu_count()
+    :param shard_size:      the number of bytes a worker validates at a time
+    :param context:         context object to pass to any contextual validators, each document is its own context if None
+    :param detail:          the results to keep: FULL, NON_PASS, INVALID_ONLY or COUNTS_ONLY
+    :param max_failures:    the number of invalid results to stop each line at, None to validate whole lines
+    :param summary:         ResultSummary to add the counts of every line to, as the lines are validated
+    :return:                iterator of (line number, results) of the lines that aren't valid, in the order of the file
+    """
+    shipped = _ship(schema)
+    if not isinstance(shard_size, int) or shard_size < 1:
+        raise TypeError("shard_size must be a positive int")
+    workers = workers or os.cpu_count() or 1
+
+    line_offset = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shipped,)) as executor:
+        calls = ((_validate_shard, path, start, stop, context, detail, max_failures) for start, stop in _shards(path, shard_size))
+        for line_count, failures, shard_summary in _in_order(executor, calls, workers * 2):
+            for line, encoded in failures:
+                yield line_offset + line, _decode(encoded)
+            if summary is not None:
+                summary.add_summary(shard_summary)
+            line_offset += line_count
+
+
+def _ship(schema:Schema|str) -> bytes|str:
+    """
+    private helper that prepares a schema to be sent to the worker processes
+    :return:                the pickled schema, or the import path to load it from
+    """
+    if isinstance(schema, Schema):
+        try:
+            return pickle.dumps(schema)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(f"schema can't be pickled, pass an import path like 'package.module:attribute' instead: {e}") from e
+    if isinstance(schema, str):
+        load_schema(schema)                                                                         # fail here, not in every worker
+        return schema
+    raise TypeError("schema must be a Schema or an import path string")
+
+
+def _in_order(executor:ProcessPoolExecutor, calls:Iterable[tuple], window:int) -> Iterator[object]:
+    """
+    private helper that submits (function, *args) calls to an executor, with at most window of them in flight
+    - keeps every worker busy without reading all the calls up front
+    :return:                iterator of the calls' return values, in the order of the calls
+    """
+    in_flight = deque()
+    calls = iter(calls)
+    while True:
+        for call in islice(calls, window - len(in_flight)):
+            in_flight.append(executor.submit(*call))
+        if len(in_flight) == 0:
+            return
+        yield in_flight.popleft().result()
+
+
+def _shards(path:str, shard_size:int) -> Iterator[tuple[int, int]]:
+    """
+    private helper that splits a file into byte ranges of about shard_size bytes, each ending after a line break
+    - only the bytes after each boundary are read, up to the next line break
+    :return:                iterator of (start, stop) byte offsets
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return                                                                                  # empty files can't be memory-mapped
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                stop = start + shard_size
+                if stop < size:
+                    line_break = mapped.find(b"\n", stop - 1)
+                    stop = size if line_break < 0 else line_break + 1
+                else:
+                    stop = size
+                yield start, stop
+                start = stop
+
+
+def _validate_shard(path:str, start:int, stop:int, context:object, detail:Detail, max_failures:int) -> tuple[int, list[tuple], ResultSummary]:
+    """
+    private helper that reads, parses and validates the lines of a byte range of a file in a worker process
+    :return:                (the number of lines in the range, [ (line number in the range, encoded results) ] of the lines
+                            that aren't valid, the summary of every line)
+    """
+    line_count, parsed, failures, summary = 0, [], [], ResultSummary()
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        mapped.seek(start)
+        while mapped.tell() < stop:
+            text = mapped.readline()
+            line_count += 1
+            if text.isspace():
+                continue
+            try:
+                parsed.append((line_count, json.loads(text)))
+            except ValueError as e:                                                                 # includes bad UTF-8
+                results = ResultSet(Result(Outcome.FAIL, text.decode(errors="replace").strip(), None, _DecodedValidator(f"must be a JSON document: {e}", Outcome.PASS, Outcome.FAIL, "")))
+                summary.add_results(results)
+                failures.append((line_count, _encode(results)))
+    checked = _worker_schema.validate_many((document for line, document in parsed), context=context, detail=detail, max_failures=max_failures)
+    for (line, document), results in zip(parsed, checked):
+        summary.add_results(results)
+        if not results:
+            failures.append((line, _encode(results)))
+    failures.sort(key=lambda failure: failure[0])                                                   # puts the lines that aren't JSON in order
+    return line_count, failures, summary
@@ -17,7 +17,9 @@
 
 from __future__ import annotations
 from enum import Enum
-from .helpers import format_path
+from typing import Callable, Iterator
+from array import array
+from .helpers import format_path, Path
 
 
 class Outcome(Enum):
@@ -30,6 +32,139 @@ class Outcome(Enum):
     WARN = 'WARN'
     INFO = 'INFO'
 
+_OUTCOMES:tuple[Outcome, ...] = tuple(Outcome)                                                      # compact outcome codes, the index of each outcome
+_COUNT_BITS:int = 48                                                                                # bits per outcome in a packed count
+for _code, _outcome in enumerate(_OUTCOMES):
+    _outcome._code = _code                                                                          # kept on each member, much faster than hashing the enum
+    _outcome._count_unit = 1 << (_COUNT_BITS * _code)                                               # adding this to a packed count counts one result of the outcome
+
+
+def _is_valid(outcome:Outcome, validator:OutcomeProvider) -> bool:
+    """
+    private helper that tells whether an outcome is valid for a validator
+    - checks both valid and invalid outcomes to handle a situation where valid == invalid in the validator
+    """
+    valid_outcome, invalid_outcome = validator.valid_outcome, validator.invalid_outcome
+    return (
+        (outcome == valid_outcome or valid_outcome == Outcome.NONE)
+        and
+        (outcome != invalid_outcome or invalid_outcome == Outcome.NONE)
+    )
+
+
+class Detail(Enum):
+    """
+    Enumeration of how much detail a validation keeps in its results
+    - every level still counts every outcome, so bool() and the outcome counts of the ResultSet are the same
+    """
+    FULL = 'FULL'                   # keep every result
+    NON_PASS = 'NON_PASS'           # keep results whose outcome is not PASS, and any invalid result
+    INVALID_ONLY = 'INVALID_ONLY'   # keep only invalid results
+    COUNTS_ONLY = 'COUNTS_ONLY'     # keep no results, only the counts
+
+    def keeps(self, outcome:Outcome, validator:OutcomeProvider) -> bool:
+        """
+        tells whether a result is kept at this detail level
+        :param outcome:     the outcome of the result
+        :param validator:   the validator of the result
+        :return:            True if the result is kept
+        """
+        if self is Detail.FULL:
+            return True
+        if self is Detail.NON_PASS:
+            return outcome != Outcome.PASS or not _is_valid(outcome, validator)
+        if self is Detail.INVALID_ONLY:
+            return not _is_valid(outcome, validator)
+        return False
+
+    def result_factory(self, outcome:Outcome, validator:OutcomeProvider, budget:FailureBudget=None) -> Callable[[object, Path], Result|ResultSet]:
+        """
+        builds a function that returns the result of a validator's outcome at this detail level
+        - the decision is made once, results that aren't kept are never built, a shared count of the result is returned instead
+        :param outcome:     the outcome of the results
+        :param validator:   the validator of the results
+        :param budget:      counts the invalid results built by the function
+        :return:            function fn(value, path) that returns the Result, or a read-only ResultSet that only counts it
+        """
+        if self.keeps(outcome, validator):
+            def kept(value:object, path:Path) -> Result:
+                return Result(outcome=outcome, value=value, path=path, validator=validator)
+            factory = kept
+        else:
+            tally = _Tally(outcome, validator)
+            def counted(value:object, path:Path) -> ResultSet:
+                return tally
+            factory = counted
+        if budget is None or _is_valid(outcome, validator):
+            return factory
+        def spent(value:object, path:Path) -> Result|ResultSet:
+            budget.failures += 1
+            return factory(value, path)
+        return spent
+
+    def apply(self, results:Result|ResultSet) -> Result|ResultSet:
+        """
+        drops the results that aren't kept at this detail level, after they've been built
+        :param results:     the result or result set to reduce
+        :return:            the kept results, with the counts of all of them
+        """
+        if self is Detail.FULL:
+            return results
+        if isinstance(results, Result):
+            return results if self.keeps(results.outcome, results.validator) else _Tally(results.outcome, results.validator)
+        reduced = ResultSet(*(result for result in results if self.keeps(result.outcome, result.validator)))
+        reduced._counts, reduced._invalid_count = results._counts, results._invalid_count
+        return reduced
+
+
+class FailureBudget(object):
+    """
+    Counts the invalid results recorded during a validation, so compiled validators can stop once max_failures is reached
+    - invalid results that end up discarded, like the failed alternatives of a passing Or, are given back
+    """
+    __slots__ = ("max_failures", "failures", "truncated")
+    max_failures:int                # the number of invalid results to stop at
+    failures:int                    # the number of invalid results recorded so far
+    truncated:bool                  # True once a validator has stopped early
+
+    def __init__(self, max_failures:int=1) -> None:
+        """
+        constructor
+        :param max_failures:    the number of invalid results to stop at
+        """
+        self.reset(max_failures)
+
+    def reset(self, max_failures:int) -> None:
+        """
+        resets the budget for another validation
+        :param max_failures:    the number of invalid results to stop at
+        """
+        if not isinstance(max_failures, int) or isinstance(max_failures, bool) or max_failures < 1:
+            raise TypeError("max_failures must be a positive int")
+        self.max_failures = max_failures
+        self.failures = 0
+        self.truncated = False
+
+    def spend(self, results:Result|ResultSet) -> Result|ResultSet:
+        """
+        counts the invalid results in results that were built without the budget
+        :param results:         the result or result set to count
+        :return:                results, unchanged
+        """
+        self.failures += results._invalid_count if isinstance(results, ResultSet) else (0 if results else 1)
+        return results
+
+    def exhausted(self) -> bool:
+        """
+        checks whether max_failures has been reached, and marks the validation as truncated if it has
+        - call it before validating the next value, validators stop when it returns True
+        :return:                True if the validator should stop
+        """
+        if self.failures >= self.max_failures:
+            self.truncated = True
+            return True
+        return False
+
 
 class OutcomeProvider(object):
     """
@@ -54,6 +189,15 @@ class OutcomeProvider(object):
         self.invalid_outcome = invalid_outcome
         self.comment = comment
 
+    def _message_for(self, value:object) -> str:
+        """
+        private helper that renders the message of a result of this outcome provider
+        - the message describes the provider, unless a subclass names the value in it
+        :param value:       the value of the result
+        :return:            the message
+        """
+        return repr(self)
+
 
 class FixedOutcome(OutcomeProvider):
     """
@@ -76,18 +220,22 @@ class FixedOutcome(OutcomeProvider):
         return self.message
 
 
+# shared stand-in for results that were created without a validator
+NO_VALIDATOR = FixedOutcome(message="no validator")
+
+
 class Result(object):
     """
     Encapsulates results of a scalar validation
+    - the message and comment are only rendered when they are first read, most results are never printed
     """
+    __slots__ = ("_outcome", "value", "path", "validator", "_message", "_comment")
     _outcome:Outcome
     value:object
-    path:list[str]
+    path:Path
     validator:OutcomeProvider|str
-    message:str
-    comment:str
 
-    def __init__(self, outcome:Outcome, value:object, path:list[str], validator:OutcomeProvider=None) -> None:
+    def __init__(self, outcome:Outcome, value:object, path:Path|list[str], validator:OutcomeProvider=None) -> None:
         """
         constructor
         :param outcome:     the outcome of the validation: PASS, FAIL, etc.
@@ -102,9 +250,27 @@ class Result(object):
         self._outcome = outcome
         self.value = value
         self.path = path
-        self.validator = FixedOutcome(message="no validator") if validator is None else validator
-        self.message = repr(self.validator)
-        self.comment = "" if self.validator.comment is None or len(self.validator.comment) == 0 else f" # {self.validator.comment}"
+        self.validator = NO_VALIDATOR if validator is None else validator
+        self._message = None
+        self._comment = None
+
+    @property
+    def message(self) -> str:
+        """
+        :return:    the description of the validator, rendered on first access
+        """
+        if self._message is None:
+            self._message = self.validator._message_for(self.value)
+        return self._message
+
+    @property
+    def comment(self) -> str:
+        """
+        :return:    the validator's comment formatted for printing, rendered on first access
+        """
+        if self._comment is None:
+            self._comment = "" if self.validator.comment is None or len(self.validator.comment) == 0 else f" # {self.validator.comment}"
+        return self._comment
 
     def __repr__(self) -> str:
         """
@@ -130,12 +296,7 @@ class Result(object):
         bool representation of the result
         :return:            True if the outcome matches the validator's valid_outcome AND doesn't match the validator's invalid_outcome, False otherwise
         """
-        # check both valid and invalid outcomes to handle a situation where valid == invalid in the validator
-        return (
-            (self.outcome == self.validator.valid_outcome or self.validator.valid_outcome == Outcome.NONE)
-            and 
-            (self.outcome != self.validator.invalid_outcome or self.validator.invalid_outcome == Outcome.NONE)
-        )
+        return _is_valid(self._outcome, self.validator)
         
     @property
     def outcome(self) -> Outcome:
@@ -149,15 +310,30 @@ class Result(object):
 class ResultSet(object):
     """
     Encapsulates results of a compound validation
+    - added result sets are kept as a tree instead of being copied into each ancestor, the tree is only
+      walked when the results are iterated or printed
+    - a set that's been added to another is shared, it copies its own list of children before it's
+      changed again, so every set keeps the results it had when it was added
     """
-    _results:list[Result]
+    __slots__ = ("_children", "_len", "_invalid_count", "_counts", "_shared", "truncated")
+    _children:list                                                                                  # Results, _children lists of added result sets, and (ColumnarResultSet, row count) tuples
+    _len:int                                                                                        # total count of results in the tree
+    _invalid_count:int                                                                              # count of results in the tree that are __bool__ False
+    _counts:int                                                                                     # count of results in the tree per outcome, packed into one int so sets add them in one step
+    _shared:bool                                                                                    # True when _children is referenced by another set
+    truncated:bool                                                                                  # True when validation stopped early at max_failures, and results are missing
 
     def __init__(self, *results:object) -> None:
         """
         constructor
         :param results:     args list of results or result sets to include in this set
         """
-        self._results = []
+        self._children = []
+        self._len = 0
+        self._invalid_count = 0
+        self._counts = 0
+        self._shared = False
+        self.truncated = False
         self.add_results(*results)
 
     def __repr__(self) -> str:
@@ -165,9 +341,9 @@ class ResultSet(object):
         string representation of the result set
         :return:            newline-delimited list of the results in the set
         """
-        if len(self._results) == 0:
+        if self._len == 0:
             return "No Results"
-        return '\n'.join([ repr(result) for result in self._results ] )
+        return '\n'.join([ repr(result) for result in self._iter_results() ] )
 
     def __or__(self, other:Result|ResultSet) -> ResultSet:
         """
@@ -182,32 +358,90 @@ class ResultSet(object):
         bool representation of the result
         :return:        True if all the results in the set are also __bool__ True, False otherwise
         """
-        return all(self._results)
+        return self._invalid_count == 0
     
     def __len__(self) -> int:
         """
         :return:            the total count of results in the set
         """
-        return len(self._results)
+        return self._len
     
     def __iter__(self) -> Result:     
         """
         :return:            iterator for the results in the set
         """
-        return iter(self._results)
+        return self._iter_results()
+
+    def _iter_results(self, codes:set[int]=None) -> Iterator[Result]:
+        """
+        private helper that walks the tree of results in the order they were added
+        :param codes:       outcome codes of the results to include, None for all of them
+        :return:            iterator for the results
+        """
+        stack = [ iter(self._children) ]                                                            # explicit stack, deep trees shouldn't hit the recursion limit
+        while stack:
+            for child in stack[-1]:
+                if type(child) is list:
+                    stack.append(iter(child))
+                    break
+                if type(child) is tuple:
+                    yield from child[0]._iter_rows(child[1], codes)
+                elif codes is None or child._outcome._code in codes:
+                    yield child
+            else:
+                stack.pop()
+
+    def _node(self) -> object:
+        """
+        private helper that gets the node a parent set keeps in its tree for this set
+        :return:            the only child, or the list of children which becomes shared
+        """
+        if len(self._children) == 1:                                                                # a set with a single child doesn't need its own node
+            return self._children[0]
+        self._shared = True
+        return self._children
     
+    def _add_counts(self, outcome:Outcome, validator:OutcomeProvider, count:int=1) -> None:
+        """
+        private helper that counts results without keeping them
+        :param outcome:     the outcome of the results
+        :param validator:   the validator of the results
+        :param count:       the number of results
+        """
+        self._counts += outcome._count_unit * count
+        if not _is_valid(outcome, validator):
+            self._invalid_count += count
+
     def add_results(self, *results:object) -> None:
         """
         add results to the set
         :param results:     args list of results or result sets to add to the set
         """
-        if not all(isinstance(result, (Result, ResultSet)) for result in results):
-            raise TypeError("added results must be either a Result or a ResultSet")
+        for result in results:
+            if not isinstance(result, (Result, ResultSet)):
+                raise TypeError("added results must be either a Result or a ResultSet")
+        if any(result is self for result in results):                                               # a set added to itself adds a copy of its results so far, it can't contain its own children
+            own = ResultSet()
+            own._children, own._len, own._invalid_count, own._counts = list(self._children), self._len, self._invalid_count, self._counts
+            results = tuple(own if result is self else result for result in results)
+        if self._shared:                                                                            # copy before changing, another set still references the old children
+            self._children = list(self._children)
+            self._shared = False
+        children, length, invalid_count, counts = self._children, self._len, self._invalid_count, self._counts
         for result in results:
             if isinstance(result, ResultSet):
-                self._results.extend(result._results)
+                if result._len > 0:                                                                 # sets without any kept results still count them
+                    children.append(result._node())
+                length += result._len
+                invalid_count += result._invalid_count
+                counts += result._counts
             else:
-                self._results.append(result)
+                children.append(result)
+                length += 1
+                counts += result._outcome._count_unit
+                if not result:
+                    invalid_count += 1
+        self._len, self._invalid_count, self._counts = length, invalid_count, counts
 
     # def get_results(self, *filters:Outcome) -> list[Result]:
     #     """
@@ -231,39 +465,227 @@ class ResultSet(object):
             raise TypeError("filter(s) must be Outcome enums")
         if len(filters) == 0:
             return self
-        return ResultSet(*(result for result in self._results if result.outcome in filters))
+        return ResultSet(*self._iter_results({ filter._code for filter in filters }))
 
-    # @property
-    # def result_count(self) -> int:
-    #     """
-    #     :return:            the total count of results in the set
-    #     """
-    #     return len(self.get_results(Outcome.PASS, Outcome.INFO, Outcome.WARN, Outcome.FAIL))
+    def _count(self, outcome:Outcome) -> int:
+        """
+        private helper that unpacks the count of results with an outcome
+        """
+        return (self._counts >> (_COUNT_BITS * outcome._code)) & ((1 << _COUNT_BITS) - 1)
 
-    # @property
-    # def pass_count(self) -> int:
-    #     """
-    #     :return:            the total count of PASS results in the set
-    #     """
-    #     return len(self.get_results(Outcome.PASS))
+    @property
+    def result_count(self) -> int:
+        """
+        :return:            the total count of PASS, INFO, WARN and FAIL results in the set
+        """
+        return self.pass_count + self.info_count + self.warn_count + self.fail_count
+
+    @property
+    def pass_count(self) -> int:
+        """
+        :return:            the total count of PASS results in the set
+        """
+        return self._count(Outcome.PASS)
     
-    # @property
-    # def fail_count(self) -> int:
-    #     """
-    #     :return:            the total count of FAIL results in the set
-    #     """
-    #     return len(self.get_results(Outcome.FAIL))
+    @property
+    def fail_count(self) -> int:
+        """
+        :return:            the total count of FAIL results in the set
+        """
+        return self._count(Outcome.FAIL)
     
-    # @property
-    # def warn_count(self) -> int:
-    #     """
-    #     :return:            the total count of WARN results in the set
-    #     """
-    #     return len(self.get_results(Outcome.WARN))
+    @property
+    def warn_count(self) -> int:
+        """
+        :return:            the total count of WARN results in the set
+        """
+        return self._count(Outcome.WARN)
     
-    # @property
-    # def info_count(self) -> int:
-    #     """
-    #     :return:            the total count of INFO results in the set
-    #     """
-    #     return len(self.get_results(Outcome.INFO))
+    @property
+    def info_count(self) -> int:
+        """
+        :return:            the total count of INFO results in the set
+        """
+        return self._count(Outcome.INFO)
+
+
+class _Tally(ResultSet):
+    """
+    Read-only result set that counts a single result without keeping it
+    - compiled validators share one for each result that a detail level drops
+    """
+    __slots__ = ()
+
+    def __init__(self, outcome:Outcome, validator:OutcomeProvider) -> None:
+        super().__init__()
+        self._add_counts(outcome, validator)
+
+    def add_results(self, *results:object) -> None:
+        if len(results) > 0:
+            raise TypeError("counted results are read-only")
+
+
+class ColumnarResultSet(ResultSet):
+    """
+    Result set that keeps its results in parallel columns instead of Result objects
+    - outcome codes, values, paths and validator ids are each kept in their own array or list
+    - Result objects are only built when the results are iterated, and aren't kept
+    - rows are only ever appended, so a parent set keeps the rows it saw by remembering the row count
+    """
+    __slots__ = ("_outcomes", "_values", "_paths", "_items", "_validator_ids", "_validators", "_validator_index")
+    _outcomes:array                                                                                 # outcome code of each row
+    _values:list                                                                                    # value of each row
+    _paths:list                                                                                     # path of each row, or the parent path when the row is a sequence item
+    _items:array                                                                                    # sequence item index of each row, -1 when the row's path is complete
+    _validator_ids:array                                                                            # index into _validators of each row
+    _validators:list                                                                                # each distinct validator, in the order they were first added
+    _validator_index:dict                                                                           # id(validator) -> index into _validators
+
+    def __init__(self, *results:object) -> None:
+        """
+        constructor
+        :param results:     args list of results or result sets to include in this set
+        """
+        self._outcomes = array('b')
+        self._values = []
+        self._paths = []
+        self._items = array('q')
+        self._validator_ids = array('l')
+        self._validators = []
+        self._validator_index = {}
+        super().__init__(*results)
+
+    def _iter_results(self, codes:set[int]=None) -> Iterator[Result]:
+        return self._iter_rows(self._len, codes)
+
+    def _iter_rows(self, stop:int, codes:set[int]=None) -> Iterator[Result]:
+        """
+        private helper that builds a Result for each row
+        :param stop:        the count of rows to include, rows added later are not part of a parent's snapshot
+        :param codes:       outcome codes of the rows to include, None for all of them
+        :return:            iterator for the results
+        """
+        outcomes, values, paths, items, validator_ids, validators = self._outcomes, self._values, self._paths, self._items, self._validator_ids, self._validators
+        for row in range(stop):
+            code = outcomes[row]
+            if codes is None or code in codes:
+                item = items[row]
+                yield Result(_OUTCOMES[code], values[row], paths[row] if item < 0 else Path(paths[row], "item_{}", item), validators[validator_ids[row]])
+
+    def _node(self) -> object:
+        return (self, self._len)
+
+    def add_row(self, outcome:Outcome, value:object, path:Path, validator:OutcomeProvider, item:int=-1) -> None:
+        """
+        add a single result to the set, without building a Result
+        :param outcome:     the outcome of the validation
+        :param value:       the value that was validated
+        :param path:        the path of the value, or the path of the sequence when item is provided
+        :param validator:   the validator that validated the value
+        :param item:        the index of the value in the sequence at path, -1 when path is the value's path
+        """
+        validator_id = self._validator_index.get(id(validator))
+        if validator_id is None:
+            validator_id = self._validator_index[id(validator)] = len(self._validators)
+            self._validators.append(validator)
+        code = outcome._code
+        self._outcomes.append(code)
+        self._values.append(value)
+        self._paths.append(path)
+        self._items.append(item)
+        self._validator_ids.append(validator_id)
+        self._len += 1
+        self._counts += outcome._count_unit
+        if not _is_valid(outcome, validator):
+            self._invalid_count += 1
+
+    def add_results(self, *results:object) -> None:
+        for result in results:
+            if not isinstance(result, (Result, ResultSet)):
+                raise TypeError("added results must be either a Result or a ResultSet")
+        own = (list(self), self._counts, self._invalid_count) if any(result is self for result in results) else None   # a set added to itself adds its rows so far
+        for result in results:
+            if isinstance(result, Result):
+                self.add_row(result._outcome, result.value, result.path, result.validator)
+                continue
+            rows, result_counts, result_invalid_count = own if result is self else (result, result._counts, result._invalid_count)
+            counts, invalid_count = self._counts, self._invalid_count
+            for row in rows:
+                self.add_row(row._outcome, row.value, row.path, row.validator)
+            self._counts = counts + result_counts                                                   # the set's counts include results it didn't keep
+            self._invalid_count = invalid_count + result_invalid_count
+
+
+class ResultSummary(object):
+    """
+    Aggregated counts of the results of many validations
+    - outcome counts cover every result, path counts only cover the results kept at the validation's detail level
+    - paths are counted by pattern, every item of a sequence shares the pattern 'item_*'
+    """
+    document_count:int                                                                              # the number of documents validated
+    invalid_count:int                                                                               # the number of documents that were invalid
+    truncated_count:int                                                                             # the number of documents that stopped early at max_failures
+    outcome_counts:dict[Outcome, int]                                                               # the number of results per outcome
+    path_counts:dict[str, dict[Outcome, int]]                                                       # path pattern -> the number of results per outcome at the path
+
+    def __init__(self) -> None:
+        """
+        constructor
+        """
+        self.document_count = 0
+        self.invalid_count = 0
+        self.truncated_count = 0
+        self.outcome_counts = { outcome: 0 for outcome in Outcome }
+        self.path_counts = {}
+
+    def __repr__(self) -> str:
+        """
+        string representation of the summary
+        :return:            the document counts, the outcome counts, then the outcome counts of each path
+        """
+        lines = [ f"documents: {self.document_count}, invalid: {self.invalid_count}, truncated: {self.truncated_count}" ]
+        lines.append(", ".join(f"{outcome.name}: {count}" for outcome, count in self.outcome_counts.items() if count > 0))
+        for path, counts in self.path_counts.items():
+            lines.append(f"  {path}: " + ", ".join(f"{outcome.name}: {count}" for outcome, count in counts.items()))
+        return "\n".join(lines)
+
+    def add_results(self, results:Result|ResultSet) -> None:
+        """
+        adds the results of one document to the summary
+        :param results:     the result or result set of the document's validation
+        """
+        if not isinstance(results, ResultSet):
+            results = ResultSet(results)
+        self.document_count += 1
+        if not results:
+            self.invalid_count += 1
+        if results.truncated:
+            self.truncated_count += 1
+        for outcome in Outcome:
+            self.outcome_counts[outcome] += results._count(outcome)
+        path_counts = self.path_counts
+        for result in results:
+            path = result.path
+            if isinstance(path, Path):
+                path = path.to_pattern()
+            else:
+                path = "" if path is None else ".".join(str(label) for label in path)
+            counts = path_counts.get(path)
+            if counts is None:
+                counts = path_counts[path] = {}
+            counts[result.outcome] = counts.get(result.outcome, 0) + 1
+
+    def add_summary(self, summary:ResultSummary) -> None:
+        """
+        adds the counts of another summary to this one, e.g. one gathered in another process
+        :param summary:     the summary to add
+        """
+        self.document_count += summary.document_count
+        self.invalid_count += summary.invalid_count
+        self.truncated_count += summary.truncated_count
+        for outcome, count in summary.outcome_counts.items():
+            self.outcome_counts[outcome] += count
+        for path, other_counts in summary.path_counts.items():
+            counts = self.path_counts.setdefault(path, {})
+            for outcome, count in other_counts.items():
+                counts[outcome] = counts.get(outcome, 0) + count
@@ -1,12 +1,24 @@
 # Scalar Validators
 
 from __future__ import annotations
+from typing import Callable
 from re import Pattern, compile as compile_pattern
-from .results import Outcome, Result
+from bisect import bisect_right
+from operator import ne
+from .results import Outcome, Result, Detail, FailureBudget
 from .validator import Validator
-from .helpers import format_sequence
+from .helpers import format_sequence, Path
 from .locator import Locator
 
+try:
+    import numpy                                                                                    # optional, validates numpy arrays in vectorized passes
+except ImportError:
+    numpy = None
+
+# numpy dtype kind -> the Python type of the array's items, for the kinds that can be checked without converting the items
+_NUMPY_KINDS = { "b": bool, "i": int, "u": int, "f": float, "U": str }
+_BULK_CHUNK = 1024                                                                                  # the items checked together, after a batch of items is found to have a rejected item
+
 
 class ScalarValidator(Validator):
     """
@@ -33,25 +45,216 @@ class ScalarValidator(Validator):
         self.accepted_types:tuple = accepted_types
         self.accepted_values:tuple = accepted_values
         self.repr = f"must be type {format_sequence(self.accepted_types, prefix='in (', suffix=')')}" + (f" with value {format_sequence(self.accepted_values, prefix='one of (', suffix=')')}" if len(self.accepted_values) > 0 else '')
+        self._split_accepted_values()
+
+    def _split_accepted_values(self) -> None:
+        """
+        private helper that splits the accepted_values into lookup tables, so checking a value doesn't scan them all
+        - hashable values go into a frozenset, unhashable values into a fallback list
+        - ranges with a step of 1 (or -1) are merged into sorted, non-overlapping [start, stop) intervals for bisect
+        - ranges with any other step are kept as-is
+        """
+        hashable_values, unhashable_values, intervals, stepped_ranges = [], [], [], []
+        for accepted_value in self.accepted_values:
+            if isinstance(accepted_value, range):
+                if abs(accepted_value.step) == 1 or len(accepted_value) <= 1:
+                    if len(accepted_value) > 0:
+                        intervals.append((min(accepted_value), max(accepted_value) + 1))
+                else:
+                    stepped_ranges.append(accepted_value)
+            else:
+                try:
+                    hash(accepted_value)
+                    hashable_values.append(accepted_value)
+                except TypeError:
+                    unhashable_values.append(accepted_value)
+        merged = []
+        for start, stop in sorted(intervals):
+            if merged and start <= merged[-1][1]:                                                   # overlapping or adjacent, extend the previous interval
+                merged[-1][1] = max(merged[-1][1], stop)
+            else:
+                merged.append([start, stop])
+        self._hashable_values:frozenset = frozenset(hashable_values)
+        self._unhashable_values:tuple = tuple(unhashable_values)
+        self._interval_starts:tuple = tuple(start for start, _stop in merged)
+        self._interval_stops:tuple = tuple(stop for _start, stop in merged)
+        self._stepped_ranges:tuple = tuple(stepped_ranges)
+
+    def _in_values(self, value:object) -> bool:
+        """
+        private helper that checks whether a value is one of the exact (non-range) accepted_values
+        """
+        try:
+            if value in self._hashable_values:
+                return True
+        except TypeError:                                                                           # value is unhashable, compare it the slow way
+            if any(value == accepted_value for accepted_value in self._hashable_values):
+                return True
+        return any(value == accepted_value for accepted_value in self._unhashable_values)
+
+    def _in_ranges(self, value:object) -> bool:
+        """
+        private helper that checks whether a value is in any of the range() accepted_values
+        - like 'value in range()', an integral float matches its int equivalent
+        """
+        if self._interval_starts:
+            if isinstance(value, int):
+                number = value
+            elif isinstance(value, float) and value.is_integer():
+                number = int(value)
+            else:
+                number = None
+            if number is not None:
+                index = bisect_right(self._interval_starts, number) - 1
+                if index >= 0 and number < self._interval_stops[index]:
+                    return True
+        return any(value in accepted_range for accepted_range in self._stepped_ranges)
+
+    def _accepts(self, value:object) -> bool:
+        """
+        private helper that checks a value against the accepted_types and accepted_values
+        :param value:       the value to check
+        :return:            True if the value is accepted
+        """
+        return (type(value) in self.accepted_types                                                  # can't use isinstance() because booleans are ints
+            and (self.accepted_values == ()
+                 or self._in_values(value)
+                 or self._in_ranges(value)
+            )
+        )
+
+    def _bulk_checkable(self) -> bool:
+        """
+        private helper that tells whether the Result of validate() follows from _accepts() alone, so a batch of values
+        can be checked by _rejected_items() instead of being validated one at a time
+        """
+        return type(self).validate is ScalarValidator.validate or (type(self).validate is Str.validate and self.case_sensitive)
+
+    def _accepts_all(self, items:object) -> bool:
+        """
+        private helper that checks a batch of items in a few passes that run in C, without calling _accepts() on each one
+        - the distinct types of the items are checked once, and the distinct values once each
+        :param items:       list, tuple or array.array of the items
+        :return:            True if every item is accepted, False if any item might not be
+        """
+        if not set(map(type, items)).issubset(self.accepted_types):
+            return False
+        if self.accepted_values == ():
+            return True
+        try:
+            distinct = set(items)
+        except TypeError:                                                                           # unhashable items, check them one at a time
+            return False
+        in_values, in_ranges = self._in_values, self._in_ranges
+        return all(in_ranges(value) or in_values(value) for value in distinct.difference(self._hashable_values))
+
+    def _accepted_mask(self, array:numpy.ndarray) -> numpy.ndarray|None:
+        """
+        private helper that checks a one dimensional numpy array against the accepted_types and accepted_values in vectorized passes
+        - the type of every item is the Python type of the array's dtype, like the items of array.tolist()
+        :param array:       the numpy array
+        :return:            numpy array of bool, True for each accepted item, or None if the array can't be checked without converting it
+        """
+        item_type = _NUMPY_KINDS.get(array.dtype.kind)
+        if item_type is None or array.ndim != 1 or len(self._unhashable_values) > 0 or len(self._stepped_ranges) > 0:
+            return None
+        if item_type not in self.accepted_types:
+            return numpy.zeros(len(array), dtype=bool)
+        if self.accepted_values == ():
+            return numpy.ones(len(array), dtype=bool)
+        numeric = item_type is not str
+        values = [ value for value in self._hashable_values if isinstance(value, (bool, int, float) if numeric else str) ]
+        mask = numpy.isin(array, values) if len(values) > 0 else numpy.zeros(len(array), dtype=bool)
+        if len(self._interval_starts) > 0 and numeric:
+            if item_type is bool or min(self._interval_starts) < -2**63 or max(self._interval_stops) >= 2**63:
+                return None                                                                         # like _in_ranges(), bools would be compared as ints
+            starts, stops = numpy.array(self._interval_starts, dtype=numpy.int64), numpy.array(self._interval_stops, dtype=numpy.int64)
+            index = numpy.searchsorted(starts, array, side="right") - 1
+            in_interval = (index >= 0) & (array < stops[numpy.maximum(index, 0)])
+            if item_type is float:
+                in_interval &= numpy.isfinite(array) & (numpy.floor(array) == array)                # like 'value in range()', only integral floats
+            mask |= in_interval
+        return mask
+
+    def _rejected_items(self, items:object) -> list[int]:
+        """
+        private helper that finds the items of a sequence that _accepts() rejects, in batched passes
+        - numpy arrays are checked by _accepted_mask(), anything else by _accepts_all(), first all at once, then in
+          chunks, and only the items of a chunk with a rejected item are checked one at a time
+        :param items:       list, tuple or array.array of the items, or a numpy array
+        :return:            the indices of the rejected items, in order
+        """
+        if numpy is not None and isinstance(items, numpy.ndarray):
+            mask = self._accepted_mask(items)
+            if mask is not None:
+                return numpy.flatnonzero(~mask).tolist()
+            items = items.tolist()
+        if self._accepts_all(items):
+            return []
+        accepts, accepts_all, rejected = self._accepts, self._accepts_all, []
+        for start in range(0, len(items), _BULK_CHUNK):
+            chunk = items[start:start + _BULK_CHUNK]
+            if len(items) <= _BULK_CHUNK or not accepts_all(chunk):
+                rejected.extend(start + index for index, item in enumerate(chunk) if not accepts(item))
+        return rejected
 
-    def validate(self, value:object, path:list[str]=None) -> Result:
+    def validate(self, value:object, path:Path=None) -> Result:
         """
         validates a scalar value
         :param value:       the value to validate
         :param path:        list of parent keys for nested/compound structures
         :return:            validation result with the validation outcome
         """
-        if (type(value) in self.accepted_types                                                      # can't use isinstance() because booleans are ints
-            and (self.accepted_values == () 
-                 or value in [ accepted_value for accepted_value in self.accepted_values if not isinstance(accepted_value, range) ] 
-                 or any(value in accepted_range for accepted_range in self.accepted_values if isinstance(accepted_range, range))
-            )
-        ):
-            outcome = self.valid_outcome
-        else:
-            outcome = self.invalid_outcome
+        outcome = self.valid_outcome if self._accepts(value) else self.invalid_outcome
         return Result(outcome=outcome, value=value, path=path, validator=self)
 
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a scalar value without building a Result
+        :param value:       the value to validate
+        :param context:     unused, scalars are not contextual
+        :param path:        unused, the value alone decides
+        :return:            True if validate() would return a valid Result
+        """
+        if type(self).validate is not ScalarValidator.validate:
+            return super().is_valid(value, context, path)
+        return self.valid_outcome != self.invalid_outcome and self._accepts(value)
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not ScalarValidator.validate:
+            return super()._reads_path()
+        return False
+
+    def _accepts_type(self, value_type:type) -> bool:
+        if type(self).validate is not ScalarValidator.validate:
+            return super()._accepts_type(value_type)
+        return value_type in self.accepted_types
+
+    def _compile_result(self, check:Callable[[object], bool], detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result]:
+        """
+        private helper that wraps a predicate into a closure that returns the Result
+        """
+        if detail is Detail.FULL and budget is None:
+            valid_outcome, invalid_outcome = self.valid_outcome, self.invalid_outcome
+            def compiled(value:object, path:Path=None, context:object=None) -> Result:
+                return Result(outcome=valid_outcome if check(value) else invalid_outcome, value=value, path=path, validator=self)
+            return compiled
+        valid_result, invalid_result = detail.result_factory(self.valid_outcome, self, budget), detail.result_factory(self.invalid_outcome, self, budget)
+        def compiled_detail(value:object, path:Path=None, context:object=None) -> Result:
+            return valid_result(value, path) if check(value) else invalid_result(value, path)
+        return compiled_detail
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result]:
+        """
+        compiles the scalar checks into a closure
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not ScalarValidator.validate:
+            return super().compile(detail, budget)
+        return self._compile_result(self._accepts, detail, budget)
+
 
 class Str(ScalarValidator):
     """
@@ -68,11 +271,40 @@ class Str(ScalarValidator):
                 raise TypeError("accepted_values must be a tuple strings")
             super().__init__((str,), tuple(av.lower() for av in accepted_values), valid_outcome=valid_outcome, invalid_outcome=invalid_outcome, comment=comment)
 
-    def validate(self, value: object, path:list[str]=None) -> Result:
+    def validate(self, value: object, path:Path=None) -> Result:
         if self.case_sensitive:                                                                     # if we're case_sensitive...
             return super().validate(value=value, path=path)                                         # validate normally
         return super().validate(value.lower() if "lower" in dir(value) else value, path=path)       # otherwise, validate a lowercase value against the lowercase accepted_values saved earlier
 
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        if type(self).validate is not Str.validate:
+            return Validator.is_valid(self, value, context, path)
+        if not self.case_sensitive and (type(value) is str or "lower" in dir(value)):
+            value = value.lower()
+        return self.valid_outcome != self.invalid_outcome and self._accepts(value)
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not Str.validate:
+            return Validator._reads_path(self)
+        return False
+
+    def _accepts_type(self, value_type:type) -> bool:
+        if type(self).validate is not Str.validate or not self.case_sensitive:                      # a lowercased value may change type, can't decide by type
+            return Validator._accepts_type(self, value_type)
+        return value_type in self.accepted_types
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result]:
+        if type(self).validate is not Str.validate:
+            return Validator.compile(self, detail, budget)
+        compiled = self._compile_result(self._accepts, detail, budget)
+        if self.case_sensitive:
+            return compiled
+        def compiled_lower(value:object, path:Path=None, context:object=None) -> Result:
+            if type(value) is str or "lower" in dir(value):
+                value = value.lower()
+            return compiled(value, path, context)
+        return compiled_lower
+
 # register the Str validator with the Locator to validate str objects
 Locator.register(str, Str)
 
@@ -116,12 +348,39 @@ class Num(ScalarValidator):
                 if lte is not None: operators.append(f'<= {lte}')
                 self.repr += f"{format_sequence(operators, separator=' and ')}"                     # add the relational operators
 
-    def validate(self, value: object, path:list[str]=None) -> Result:
-        rval = Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
-        if super().validate(value).outcome == self.valid_outcome:
-            if (self.lt is None or value < self.lt) and (self.lte is None or value <= self.lte) and (self.gt is None or value > self.gt) and (self.gte is None or value >= self.gte):
-                rval = Result(outcome=self.valid_outcome, value=value, path=path, validator=self)
-        return rval
+    def _accepts(self, value:object) -> bool:
+        return (super()._accepts(value)
+            and (self.lt is None or value < self.lt) and (self.lte is None or value <= self.lte) and (self.gt is None or value > self.gt) and (self.gte is None or value >= self.gte)
+        )
+
+    def _accepts_all(self, items:object) -> bool:
+        """
+        private helper that checks a batch of items, the relational operators are only checked against the smallest and largest items
+        """
+        if not super()._accepts_all(items):
+            return False
+        if len(items) == 0 or all(operator is None for operator in (self.gt, self.gte, self.lt, self.lte)):
+            return True
+        if any(map(ne, items, items)):                                                              # NaN fails every comparison, and breaks min() and max()
+            return False
+        smallest, largest = min(items), max(items)
+        return ((self.lt is None or largest < self.lt) and (self.lte is None or largest <= self.lte)
+            and (self.gt is None or smallest > self.gt) and (self.gte is None or smallest >= self.gte)
+        )
+
+    def _accepted_mask(self, array:numpy.ndarray) -> numpy.ndarray|None:
+        mask = super()._accepted_mask(array)
+        if mask is None or not mask.any():                                                          # not a numeric array, the operators can't be applied
+            return mask
+        if self.lt is not None:
+            mask &= array < self.lt
+        if self.lte is not None:
+            mask &= array <= self.lte
+        if self.gt is not None:
+            mask &= array > self.gt
+        if self.gte is not None:
+            mask &= array >= self.gte
+        return mask
 
 
 # register the Num validator with the Locator to validate int and float objects
@@ -153,12 +412,11 @@ class Regex(ScalarValidator):
         self.patterns:Pattern = tuple((p if isinstance(p, Pattern) else compile_pattern(p) for p in accepted_values))
         self.repr = f"must be type {format_sequence(self.accepted_types, prefix='in (', suffix=')')}" + (f" with value matching {format_sequence([ pattern.pattern for pattern in self.patterns ], prefix='one of (', suffix=')')}" if len(self.patterns) > 0 else '')
 
-    def validate(self, value: object, path:list[str]=None) -> Result:
-        rval = Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
-        if super().validate(value):
-            for pattern in self.patterns:
-                match = pattern.fullmatch(value) is not None
-                if match:
-                    rval = Result(outcome=self.valid_outcome, value=value, path=path, validator=self)
-                    break # out of for each pattern
-        return rval
+    def _accepts(self, value:object) -> bool:
+        return super()._accepts(value) and any(pattern.fullmatch(value) is not None for pattern in self.patterns)
+
+    def _accepts_all(self, items:object) -> bool:
+        return False                                                                                # the patterns are matched one item at a time
+
+    def _accepted_mask(self, array:numpy.ndarray) -> numpy.ndarray|None:
+        return None
@@ -1,9 +1,13 @@
 # Schema validation wrapper
 
 from __future__ import annotations
-from .results import Outcome, Result, ResultSet
+from typing import Callable, Iterable, Iterator
+from .results import Outcome, Result, ResultSet, ResultSummary, Detail, FailureBudget
 from .validator import Validator
 from .contextual import ContextualValidator
+from .map import Map
+from .stream import iter_json_events, run
+from .engine import compile_iterative
 
 import logging
 logger = logging.getLogger(__name__)
@@ -15,24 +19,220 @@ class Schema:
     """
     def __init__(self, schema: object) -> None:
         self.validator = Validator.for_value(schema)
+        self.compiled = None
+        self.iterative = False                                                                      # whether the compiled closures validate with an explicit stack instead of recursion
+        self._compiled_details = {}                                                                 # detail level -> closure compiled for it, compiled on first use
+        self._budgeted = {}                                                                         # detail level -> list of idle (closure, FailureBudget) compiled against a budget
+        self._streams = {}                                                                          # detail level -> JSON event consumer factory, compiled on first use
+        self._records = {}                                                                          # detail level -> column-wise record batch closure, compiled on first use
+
+    def compile(self, iterative:bool=False) -> Schema:
+        """
+        Compiles the validation tree into specialized closures that validate() will use from then on
+        - compile once, after the schema is built, and reuse it for every document; results are unchanged
+        - iterative validation walks the document with an explicit stack instead of recursion, so documents of any
+          depth can be validated, e.g. with recursive schemas; shallow branches still run as compiled closures
+        :param iterative:           True to validate with an explicit stack, max_failures is still validated recursively
+        :return:                    this schema, to allow chaining
+        """
+        if not isinstance(iterative, bool):
+            raise TypeError("iterative must be a bool")
+        self.iterative = iterative
+        self._compiled_details = {}
+        self.compiled = compile_iterative(self.validator) if iterative else self.validator.compile()
+        return self
+
+    def __getstate__(self) -> dict:
+        """
+        pickles the schema without its compiled closures, a compiled schema is compiled again when unpickled
+        """
+        state = self.__dict__.copy()
+        state["compiled"] = self.compiled is not None
+        state["_compiled_details"] = {}
+        state["_budgeted"] = {}
+        state["_streams"] = {}
+        state["_records"] = {}
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        self.__dict__.update(state)
+        self.compiled = None
+        self.iterative = state.get("iterative", False)
+        if state["compiled"]:
+            self.compile(self.iterative)
 
     def __repr__(self) -> str:
         return repr(self.validator)
 
-    def validate(self, document:object, context:object=None) -> ResultSet:
+    def validate(self, document:object, context:object=None, detail:Detail=Detail.FULL, max_failures:int=None) -> ResultSet:
         """
         Validate a document against the schema
+        - below FULL detail, the validation tree is compiled for the level on first use, and results that
+          aren't kept are only counted, never built; bool() and the outcome counts are unchanged
+        - with max_failures, Map, Seq and Or stop validating once that many invalid results have been recorded,
+          and the returned ResultSet is marked truncated; bool() is still False for any document that stops early
         :param document:            the document to validate
         :param context:             context object to pass to any contextual validators
+        :param detail:              the results to keep: FULL, NON_PASS, INVALID_ONLY or COUNTS_ONLY
+        :param max_failures:        the number of invalid results to stop at, None to validate the whole document
         """
         # validate the document with context; if there's no explicit context, use the document itself
+        if max_failures is not None:
+            results = self.validate_many((document,), context=context, detail=detail, max_failures=max_failures)
+            try:
+                return next(results)
+            finally:
+                results.close()                                                                     # gives the budget back to the pool
+        if detail is not Detail.FULL:
+            return ResultSet(self._compiled_for(detail)(document, None, document if context is None else context))
+        if self.compiled is not None:
+            return self.compiled(document, None, document if context is None else context)
         return ContextualValidator.validate_with_context(self.validator, document, context=(document if context is None else context))
 
+    def iter_validate(self, document:object, context:object=None) -> Iterator[Result]:
+        """
+        Validate a document against the schema, yielding each Result as soon as it's produced
+        - the results are the same, in the same order, as iterating the ResultSet of validate(), but only the
+          current branch of the validation tree is held, and the caller can stop at any point
+        - an Or checks its sub-validators with is_valid() first, so its own result can be yielded before theirs
+        :param document:            the document to validate
+        :param context:             context object to pass to any contextual validators
+        :return:                    iterator of the Results
+        """
+        return self.validator.iter_validate(document, None, document if context is None else context)
+
+    def validate_many(self, documents:Iterable, *, context:object=None, detail:Detail=Detail.FULL, max_failures:int=None) -> Iterator[Result|ResultSet]:
+        """
+        Validate many documents against the schema, lazily
+        - the schema is compiled once for the whole batch, and the same budget is reset for each document
+        - each document's results are the same as validate(document, context, detail, max_failures) returns
+        :param documents:           iterable of the documents to validate
+        :param context:             context object to pass to any contextual validators, each document is its own context if None
+        :param detail:              the results to keep: FULL, NON_PASS, INVALID_ONLY or COUNTS_ONLY
+        :param max_failures:        the number of invalid results to stop each document at, None to validate whole documents
+        :return:                    iterator of each document's results, in the order of the documents
+        """
+        if max_failures is None:
+            compiled = self._compiled_for(detail)
+            wrap = ResultSet if detail is not Detail.FULL else None
+            for document in documents:
+                results = compiled(document, None, document if context is None else context)
+                yield results if wrap is None else wrap(results)
+            return
+        budget = FailureBudget(max_failures)                                                        # checks max_failures before anything is compiled
+        idle = self._budgeted.setdefault(detail, [])
+        try:
+            compiled, budget = idle.pop()
+        except IndexError:
+            compiled = self.validator.compile(detail, budget)
+        try:
+            for document in documents:
+                budget.reset(max_failures)
+                results = ResultSet(compiled(document, None, document if context is None else context))
+                results.truncated = budget.truncated
+                yield results
+        finally:
+            idle.append((compiled, budget))                                                         # pooled, so validations running at the same time never share a budget
+
+    def summarize_many(self, documents:Iterable, *, context:object=None, detail:Detail=Detail.NON_PASS, max_failures:int=None) -> ResultSummary:
+        """
+        Validate many documents against the schema, keeping only the counts
+        :param documents:           iterable of the documents to validate
+        :param context:             context object to pass to any contextual validators, each document is its own context if None
+        :param detail:              the results to count per path, the counts per outcome always include every result
+        :param max_failures:        the number of invalid results to stop each document at, None to validate whole documents
+        :return:                    the counts per outcome, and per path pattern, of all the documents
+        """
+        summary = ResultSummary()
+        for results in self.validate_many(documents, context=context, detail=detail, max_failures=max_failures):
+            summary.add_results(results)
+        return summary
+
+    def validate_records(self, records:Iterable, *, context:object=None, detail:Detail=Detail.FULL) -> list[Result|ResultSet]:
+        """
+        Validate a batch of records, like the rows of a table, column by column
+        - records with the same keys are matched to the schema's keys once, then each column of values is validated
+          as a batch, scalar values in batched passes, see Map.compile_records()
+        - each record's results are the same as validate(record, context, detail) returns
+        - when the schema's root isn't a Map, the records are validated one at a time, like validate_many()
+        :param records:             iterable of the records to validate
+        :param context:             context object to pass to any contextual validators, each record is its own context if None
+        :param detail:              the results to keep: FULL, NON_PASS, INVALID_ONLY or COUNTS_ONLY
+        :return:                    list of each record's results, in the order of the records
+        """
+        if not isinstance(self.validator, Map):
+            return list(self.validate_many(records, context=context, detail=detail))
+        compiled = self._records.get(detail)
+        if compiled is None:
+            compiled = self._records[detail] = self.validator.compile_records(detail)
+        results = compiled(records, None, context)
+        return results if detail is Detail.FULL else [ ResultSet(record_results) for record_results in results ]
+
+    def validate_jsonl(self, path:str, *, workers:int=None, shard_size:int=1 << 22, context:object=None, detail:Detail=Detail.NON_PASS, max_failures:int=None, summary:ResultSummary=None) -> Iterator[tuple[int, ResultSet]]:
+        """
+        Validate each line of a JSON Lines file against the schema, across a pool of worker processes
+        - see validdict.parallel.validate_jsonl(), which also takes an import path for schemas that can't be pickled
+        :param path:                the path of the JSON Lines file
+        :param workers:             the number of worker processes, default: os.cpu_count()
+        :param shard_size:          the number of bytes a worker validates at a time
+        :param context:             context object to pass to any contextual validators, each document is its own context if None
+        :param detail:              the results to keep: FULL, NON_PASS, INVALID_ONLY or COUNTS_ONLY
+        :param max_failures:        the number of invalid results to stop each line at, None to validate whole lines
+        :param summary:             ResultSummary to add the counts of every line to, as the lines are validated
+        :return:                    iterator of (line number, results) of the lines that aren't valid, in the order of the file
+        """
+        from .parallel import validate_jsonl                                                        # parallel imports this module
+        return validate_jsonl(self, path, workers=workers, shard_size=shard_size, context=context, detail=detail, max_failures=max_failures, summary=summary)
+
+    def validate_stream(self, source:object, *, context:object=None, detail:Detail=Detail.FULL, chunk_size:int=1 << 16) -> Result|ResultSet:
+        """
+        Validate a JSON document as it's read, without building it
+        - the document is read in chunks by an incremental tokenizer, and its events are streamed through the validation
+          tree, so memory is proportional to the nesting depth, plus the results kept at the detail level
+        - the results are the same as validate(json.load(source)), except that maps and sequences are replaced by
+          empty containers of the same type, which print the same; values are only built for validators that need
+          them, like callbacks
+        - the document isn't available as the context, contextual validators are given the context argument
+        :param source:              the JSON document: str, bytes, or a file object opened in text or binary mode
+        :param context:             context object to pass to any contextual validators
+        :param detail:              the results to keep: FULL, NON_PASS, INVALID_ONLY or COUNTS_ONLY
+        :param chunk_size:          the number of characters or bytes to read at a time
+        :return:                    the results of the validation
+        """
+        stream = self._streams.get(detail)
+        if stream is None:
+            stream = self._streams[detail] = self.validator.compile_stream(detail)
+        events = iter_json_events(source, chunk_size)
+        results = run(stream(next(events), None, context), events)
+        next(events, None)                                                                          # checks there's nothing after the document
+        return results if detail is Detail.FULL else ResultSet(results)
+
+    def _compiled_for(self, detail:Detail) -> Callable[[object, object, object], Result|ResultSet]:
+        """
+        private helper that gets the validation tree compiled for a detail level, compiling it on first use
+        """
+        if detail is Detail.FULL and self.compiled is not None:
+            return self.compiled
+        compiled = self._compiled_details.get(detail)
+        if compiled is None:
+            compiled = self._compiled_details[detail] = compile_iterative(self.validator, detail) if self.iterative else self.validator.compile(detail)
+        return compiled
+
+    def is_valid(self, document:object, context:object=None) -> bool:
+        """
+        Checks a document against the schema without building any results
+        - answers the same as bool(validate()), but stops at the first invalid value, use validate() for the details
+        :param document:            the document to validate
+        :param context:             context object to pass to any contextual validators
+        :return:                    True if the document is valid
+        """
+        return self.validator.is_valid(document, document if context is None else context)
+
     @staticmethod
-    def log_results(results:Result|ResultSet, *outcome_filters:Outcome, logging_config:dict=None):
+    def log_results(results:Result|ResultSet|Iterable[Result], *outcome_filters:Outcome, logging_config:dict=None):
         """
         Static helper method to log the results of a schema validation
-        :param results:             the result/resultset to log
+        :param results:             the result/resultset to log, or an iterable of results, like iter_validate() returns
         :param outcome_filters:     args list of outcomes to include in the log output
         :param logging_config:      dict that maps outcomes to logging level functions
         """
@@ -50,9 +250,15 @@ class Schema:
         }
 
         # to avoid double conversion of each result into a string, convert and map to the logger we'll use later
+        if isinstance(results, (Result, ResultSet)):
+            results = ResultSet(results).filter(*outcome_filters)
+        else:
+            if not all(isinstance(filter, Outcome) for filter in outcome_filters):
+                raise TypeError("filter(s) must be Outcome enums")
+            results = (result for result in results if len(outcome_filters) == 0 or result.outcome in outcome_filters)
         results_to_print = [
             (logging_config[result.outcome], repr(result))
-            for result in ResultSet(results).filter(*outcome_filters)
+            for result in results
         ]
 
         min_indent_depth = 1000  # sys.maxint is more accurate, but this is good enough without having to import sys
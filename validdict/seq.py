@@ -1,10 +1,21 @@
 # Sequence Validator
 
-from .results import Outcome, Result, ResultSet
-from .scalars import Num
+from array import array
+from typing import Callable, Generator, Iterator
+from .results import Outcome, Result, ResultSet, ColumnarResultSet, Detail, FailureBudget
+from .scalars import ScalarValidator, Num
 from .validator import Validator, Or
-from .helpers import extend_path
+from .helpers import extend_path, Path
 from .locator import Locator
+from .stream import SCALAR, START_SEQ, END_SEQ, skip
+
+try:
+    import numpy                                                                                    # optional, numpy arrays are validated like lists
+except ImportError:
+    numpy = None
+
+# the types of sequence Seq validates, array.array, memoryview and numpy arrays are validated like lists of their items
+_SEQUENCE_TYPES = (tuple, list, array, memoryview) if numpy is None else (tuple, list, array, memoryview, numpy.ndarray)
 
 
 class Seq(Validator):
@@ -12,10 +23,11 @@ class Seq(Validator):
     Validates that a sequence of items are of the required type(s)
     """
 
-    def __init__(self, *validators:Validator, min_len:int=None, max_len:int=None, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> None:
+    def __init__(self, *validators:Validator, min_len:int=None, max_len:int=None, columnar:bool=False, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> None:
         """
         constructor
         :param validators:      args list of validators that validate items in the list
+        :param columnar:        True to keep the results in a ColumnarResultSet, for very long sequences
         """
         if not all(isinstance(v, Validator) for v in validators):
             raise TypeError(f"validator(s) must be of type Validator")
@@ -28,6 +40,86 @@ class Seq(Validator):
             self.validator = Or(*validators)
         self.min_len = Num(gte=min_len) if min_len is not None else None
         self.max_len = Num(lte=max_len) if max_len is not None else None
+        self.columnar = columnar
+
+    def _scalar_check(self) -> Callable[[object], bool]:
+        """
+        private helper that gets the item validator's accept check, when its Result can be built from the check alone
+        :return:            the check, or None if the item validator must be run
+        """
+        validator = self.validator
+        if isinstance(validator, ScalarValidator) and validator._bulk_checkable():
+            return validator._accepts
+        return None
+
+    @staticmethod
+    def _items(value:object) -> object:
+        """
+        private helper that gets the items of a sequence as Python objects
+        - lists, tuples and array.array already hold them, memoryviews and numpy arrays are converted with tolist()
+        """
+        return value if isinstance(value, (tuple, list, array)) else value.tolist()
+
+    @staticmethod
+    def _batch(value:object, items:object) -> object:
+        """
+        private helper that gets what ScalarValidator._rejected_items() checks, numpy arrays are checked without converting them
+        """
+        return items if isinstance(value, memoryview) else value
+
+    def _add_rejected_items(self, rval:ResultSet, value:object, items:object, path:Path, validate:Callable[[object, Path, object], Result|ResultSet]) -> None:
+        """
+        private helper that adds the results of the rejected items, and counts the accepted items without building their results
+        - only for scalar item validators, at detail levels that don't keep their valid results
+        """
+        validator = self.validator
+        rejected = validator._rejected_items(Seq._batch(value, items))
+        for item_index in rejected:
+            rval.add_results(validate(items[item_index], extend_path(path, "item_{}", item_index), None))
+        rval._add_counts(validator.valid_outcome, validator, len(items) - len(rejected))
+
+    def _add_item_rows(self, rval:ColumnarResultSet, value:object, path:Path, validate:Callable[[object, Path, object], Result|ResultSet], detail:Detail=Detail.FULL, budget:FailureBudget=None) -> None:
+        """
+        private helper that adds the item results to a columnar result set, building Results only for non-scalar items
+        """
+        check = self._scalar_check()
+        items = Seq._items(value)
+        if check is None or budget is not None:
+            for item_index, item in enumerate(items):
+                if budget is not None and budget.exhausted():
+                    break
+                rval.add_results(validate(item, extend_path(path, "item_{}", item_index), None))
+            return
+        validator, add_row = self.validator, rval.add_row
+        valid_outcome, invalid_outcome = validator.valid_outcome, validator.invalid_outcome
+        parent = extend_path(path)
+        if detail is Detail.FULL:
+            for item_index, item in enumerate(items):
+                add_row(valid_outcome if check(item) else invalid_outcome, item, parent, validator, item_index)
+            return
+        keep_valid, keep_invalid = detail.keeps(valid_outcome, validator), detail.keeps(invalid_outcome, validator)
+        if not keep_valid:
+            rejected = validator._rejected_items(Seq._batch(value, items))
+            if keep_invalid:
+                for item_index in rejected:
+                    add_row(invalid_outcome, items[item_index], parent, validator, item_index)
+            else:
+                rval._add_counts(invalid_outcome, validator, len(rejected))
+            rval._add_counts(valid_outcome, validator, len(items) - len(rejected))
+            return
+        valid_count, invalid_count = 0, 0
+        for item_index, item in enumerate(items):
+            if check(item):
+                if keep_valid:
+                    add_row(valid_outcome, item, parent, validator, item_index)
+                else:
+                    valid_count += 1
+            elif keep_invalid:
+                add_row(invalid_outcome, item, parent, validator, item_index)
+            else:
+                invalid_count += 1
+        rval._add_counts(valid_outcome, validator, valid_count)                                     # the items that weren't kept are still counted
+        rval._add_counts(invalid_outcome, validator, invalid_count)
 
     def __repr__(self) -> str:
         """
@@ -36,28 +128,176 @@ class Seq(Validator):
         """
         return "must be a sequence" + ("" if self.validator is None else f" like: [ {self.validator} ]")
 
-    def validate(self, value:object, path:list[str]=None) -> ResultSet:
+    def validate(self, value:object, path:Path=None) -> ResultSet:
         """
         validates a sequence, makes sure value is a sequence and that each item in the sequence matches the sub-validators
         :param value:       the sequence to validate
         :param path:        list of parent keys for nested/compound structures
         :return:            validation result set containing the first passing result, or all the failing results
         """
-        rval = ResultSet()
-        if isinstance(value, (tuple, list)):
+        rval = ColumnarResultSet() if self.columnar else ResultSet()
+        if isinstance(value, _SEQUENCE_TYPES):
+            items = Seq._items(value)
             rval.add_results(Result(outcome=self.valid_outcome, value=value, path=path, validator=self))
             if self.min_len is not None:
-                rval.add_results(self.min_len.validate(len(value), path=extend_path(path, "min_len")))
+                rval.add_results(self.min_len.validate(len(items), path=extend_path(path, "min_len")))
             if self.max_len is not None:
-                rval.add_results(self.max_len.validate(len(value), path=extend_path(path, "max_len")))
-            if self.validator:
+                rval.add_results(self.max_len.validate(len(items), path=extend_path(path, "max_len")))
+            if self.validator and self.columnar:
+                self._add_item_rows(rval, value, path, lambda item, item_path, context: self.validator.validate(item, path=item_path))
+            elif self.validator:
                 item_index = 0
-                for item in value:
-                    rval.add_results(self.validator.validate(item, path=extend_path(path, "item_"+str(item_index))))
+                for item in items:
+                    rval.add_results(self.validator.validate(item, path=extend_path(path, "item_{}", item_index)))
                     item_index += 1
         else:
             rval.add_results(Result(outcome=self.invalid_outcome, value=value, path=path, validator=self))
         return rval
-    
+
+    def iter_validate(self, value:object, path:Path=None, context:object=None) -> Iterator[Result]:
+        """
+        validates a sequence, yielding the Results as they're produced
+        :param value:       the sequence to validate
+        :param path:        list of parent keys for nested/compound structures
+        :param context:     unused, like validate() the items are not given context
+        :return:            iterator of the Results, in the same order as validate()
+        """
+        if type(self).validate is not Seq.validate:
+            yield from super().iter_validate(value, path, context)
+            return
+        if not isinstance(value, _SEQUENCE_TYPES):
+            yield Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
+            return
+        items = Seq._items(value)
+        yield Result(outcome=self.valid_outcome, value=value, path=path, validator=self)
+        if self.min_len is not None:
+            yield self.min_len.validate(len(items), path=extend_path(path, "min_len"))
+        if self.max_len is not None:
+            yield self.max_len.validate(len(items), path=extend_path(path, "max_len"))
+        if self.validator:
+            iter_validate = self.validator.iter_validate
+            for item_index, item in enumerate(items):
+                yield from iter_validate(item, extend_path(path, "item_{}", item_index))
+
+    def _accepts_type(self, value_type:type) -> bool:
+        if type(self).validate is not Seq.validate:
+            return super()._accepts_type(value_type)
+        return issubclass(value_type, _SEQUENCE_TYPES)
+
+    def _type_mismatch(self, value:object, path:Path=None) -> ResultSet:
+        return ResultSet(super()._type_mismatch(value, path=path))
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a sequence without building any Results, stopping at the first invalid item
+        :param value:       the sequence to validate
+        :param context:     unused, like validate() the items are not given context
+        :param path:        list of parent keys for nested/compound structures
+        :return:            True if validate() would return a valid ResultSet
+        """
+        if type(self).validate is not Seq.validate:
+            return super().is_valid(value, context, path)
+        if not isinstance(value, _SEQUENCE_TYPES) or self.valid_outcome == self.invalid_outcome:
+            return False
+        items = Seq._items(value)
+        if self.min_len is not None and not self.min_len.is_valid(len(items)):
+            return False
+        if self.max_len is not None and not self.max_len.is_valid(len(items)):
+            return False
+        if self.validator:
+            validator = self.validator
+            if len(items) > 0 and self._scalar_check() is not None:                                 # checked in batched passes
+                return validator.valid_outcome != validator.invalid_outcome and len(validator._rejected_items(Seq._batch(value, items))) == 0
+            if validator._reads_path():
+                return all(validator.is_valid(item, None, extend_path(path, "item_{}", item_index)) for item_index, item in enumerate(items))
+            return all(validator.is_valid(item) for item in items)
+        return True
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not Seq.validate:
+            return super()._reads_path()
+        return self.validator is not None and self.validator._reads_path()
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], ResultSet]:
+        """
+        compiles the sequence and its item validator into a single closure
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not Seq.validate:
+            return super().compile(detail, budget)
+        min_len = self.min_len.compile(detail, budget) if self.min_len is not None else None
+        max_len = self.max_len.compile(detail, budget) if self.max_len is not None else None
+        item_fn = self.validator.compile(detail, budget) if self.validator else None
+        valid_result, invalid_result = detail.result_factory(self.valid_outcome, self, budget), detail.result_factory(self.invalid_outcome, self, budget)
+        result_set, columnar, add_item_rows, add_rejected_items, items_of = (ColumnarResultSet if self.columnar else ResultSet), self.columnar, self._add_item_rows, self._add_rejected_items, Seq._items
+        bulk = item_fn is not None and budget is None and self._scalar_check() is not None and not detail.keeps(self.validator.valid_outcome, self.validator)   # only the rejected items need results
+        def compiled(value:object, path:Path=None, context:object=None) -> ResultSet:
+            rval = result_set()
+            if not isinstance(value, _SEQUENCE_TYPES):
+                rval.add_results(invalid_result(value, path))
+                return rval
+            items = items_of(value)
+            rval.add_results(valid_result(value, path))
+            if min_len is not None:
+                rval.add_results(min_len(len(items), extend_path(path, "min_len"), None))
+            if max_len is not None:
+                rval.add_results(max_len(len(items), extend_path(path, "max_len"), None))
+            if item_fn is not None and columnar:
+                add_item_rows(rval, value, path, item_fn, detail, budget)
+            elif bulk:
+                add_rejected_items(rval, value, items, path, item_fn)
+            elif item_fn is not None and budget is not None:
+                for item_index, item in enumerate(items):
+                    if budget.exhausted():
+                        break
+                    rval.add_results(item_fn(item, extend_path(path, "item_{}", item_index), None))
+            elif item_fn is not None:
+                for item_index, item in enumerate(items):
+                    rval.add_results(item_fn(item, extend_path(path, "item_{}", item_index), None))     # like validate(), items get no context
+            return rval
+        return compiled
+
+    def compile_stream(self, detail:Detail=Detail.FULL) -> Callable[[tuple, Path, object], Generator[None, tuple, ResultSet]]:
+        """
+        compiles the sequence into a consumer of the JSON events of a value, that validates each item as it's read
+        :param detail:      the results to keep
+        :return:            the compiled consumer factory
+        """
+        if type(self).validate is not Seq.validate:
+            return super().compile_stream(detail)
+        compiled = self.compile(detail)
+        min_len = self.min_len.compile(detail) if self.min_len is not None else None
+        max_len = self.max_len.compile(detail) if self.max_len is not None else None
+        item_fn = self.validator.compile(detail) if self.validator else None
+        item_stream = self.validator.compile_stream(detail) if self.validator else None
+        valid_result, result_set = detail.result_factory(self.valid_outcome, self), (ColumnarResultSet if self.columnar else ResultSet)
+        def stream(event:tuple, path:Path=None, context:object=None) -> Generator[None, tuple, ResultSet]:
+            if event[0] is not START_SEQ:
+                value = yield from skip(event)
+                return compiled(value, path, context)
+            items, item_index = result_set(), 0
+            while True:
+                event = yield
+                kind = event[0]
+                if kind is END_SEQ:
+                    break
+                if item_fn is None:
+                    yield from skip(event)
+                elif kind is SCALAR:
+                    items.add_results(item_fn(event[1], extend_path(path, "item_{}", item_index), None))   # like validate(), items get no context
+                else:
+                    items.add_results((yield from item_stream(event, extend_path(path, "item_{}", item_index), None)))
+                item_index += 1
+            rval = result_set(valid_result([], path))
+            if min_len is not None:                                                                 # the length checks come before the items, like in validate()
+                rval.add_results(min_len(item_index, extend_path(path, "min_len"), None))
+            if max_len is not None:
+                rval.add_results(max_len(item_index, extend_path(path, "max_len"), None))
+            rval.add_results(items)
+            return rval
+        return stream
+
 # register the Seq validator with the Locator to validate list objects
 Locator.register(list, Seq)
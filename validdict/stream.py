@@ -0,0 +1,313 @@
+# Streaming JSON Events
+# - an incremental JSON tokenizer that turns a document into events, so validators can consume it without
+#   the whole document ever being built, and the helpers that consume the events of one value
+
+from __future__ import annotations
+from json.decoder import scanstring, JSONDecodeError
+from json.scanner import NUMBER_RE
+from typing import Generator, Iterator
+import codecs
+import io
+import re
+
+# event kinds, each event is a (kind, value) tuple, the value is only set for SCALAR and KEY events
+SCALAR = "scalar"                                                                                   # a string, number, bool or null value
+START_MAP = "start_map"
+KEY = "key"                                                                                         # the name of the next value of the map
+END_MAP = "end_map"
+START_SEQ = "start_seq"
+END_SEQ = "end_seq"
+
+_START_MAP_EVENT = (START_MAP, None)
+_END_MAP_EVENT = (END_MAP, None)
+_START_SEQ_EVENT = (START_SEQ, None)
+_END_SEQ_EVENT = (END_SEQ, None)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_TOKEN = re.compile(r'[ \t\n\r]*(?:([{}\[\]:,])|"([^"\\\x00-\x1f]*)"|(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?|(true|false|null|NaN|-?Infinity))')  # the common tokens, strings without escapes
+_LOOKAHEAD = 64                                                                                     # the characters to buffer before matching a token, so common tokens are rarely split
+_LITERALS = (("true", True), ("false", False), ("null", None), ("NaN", float("nan")), ("Infinity", float("inf")), ("-Infinity", float("-inf")))
+_LITERAL_VALUES = dict(_LITERALS)
+_LONGEST_LITERAL = max(len(literal) for literal, _value in _LITERALS)
+
+
+class _Tokenizer(object):
+    """
+    Reads JSON tokens from a source, one chunk at a time
+    - only the unread part of the current chunk is buffered, plus whatever a single token needs
+    """
+    def __init__(self, source:object, chunk_size:int) -> None:
+        """
+        constructor
+        :param source:      str, bytes, or a file object opened in text or binary mode
+        :param chunk_size:  the number of characters or bytes to read at a time
+        """
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        elif isinstance(source, str):
+            source = io.StringIO(source)
+        self.read = source.read
+        self.chunk_size = chunk_size
+        self.decoder = None                                                                         # set when the source turns out to be binary
+        self.buffer = ""
+        self.position = 0
+        self.offset = 0                                                                             # the number of characters dropped from the front of the buffer
+        self.eof = False
+
+    def fill(self) -> None:
+        """
+        drops the characters that were read, and appends the next chunk of the source
+        - reads at least as much as is still buffered, so a token that spans many chunks is rescanned a bounded number of times
+        """
+        chunk = self.read(max(self.chunk_size, len(self.buffer) - self.position))
+        self.eof = len(chunk) == 0
+        if isinstance(chunk, bytes):
+            if self.decoder is None:
+                self.decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = self.decoder.decode(chunk, final=self.eof)                                      # a character split between chunks is decoded with the next chunk
+        self.offset += self.position
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def error(self, message:str) -> ValueError:
+        """
+        :return:            the error to raise for invalid JSON at the current position
+        """
+        return ValueError(f"{message}: char {self.offset + self.position}")
+
+    def next_token(self) -> tuple[str, object]:
+        """
+        reads the next token
+        :return:            (kind, value), the kind is one of '{', '}', '[', ']', ':', ',', 'string' or 'value', or None at the end of the source
+        """
+        while True:
+            buffer = self.buffer
+            position = self.position = _WHITESPACE.match(buffer, self.position).end()
+            if position == len(buffer):
+                if self.eof:
+                    return None, None
+                self.fill()
+                continue
+            char = buffer[position]
+            if char in "{}[]:,":
+                self.position = position + 1
+                return char, None
+            if char == '"':
+                try:
+                    value, self.position = scanstring(buffer, position + 1, True)
+                    return "string", value
+                except JSONDecodeError as e:
+                    if self.eof:
+                        raise self.error(e.msg) from None
+                    self.fill()                                                                     # the string may continue in the next chunk
+                    continue
+            match = NUMBER_RE.match(buffer, position)
+            if match is not None:
+                if len(buffer) - match.end() <= 2 and not self.eof:
+                    self.fill()                                                                     # the number may continue in the next chunk, even after a partial '.5' or 'e+5'
+                    continue
+                integer, fraction, exponent = match.groups()
+                self.position = match.end()
+                if fraction or exponent:
+                    return "value", float(integer + (fraction or "") + (exponent or ""))
+                return "value", int(integer)
+            for literal, value in _LITERALS:
+                if buffer.startswith(literal, position):
+                    self.position = position + len(literal)
+                    return "value", value
+            if len(buffer) - position < _LONGEST_LITERAL and not self.eof:
+                self.fill()                                                                         # a literal may continue in the next chunk
+                continue
+            raise self.error("Expecting value")
+
+
+def _tokens(tokenizer:_Tokenizer) -> Iterator[tuple[str, object]]:
+    """
+    private helper that reads the tokens of a source, see _Tokenizer.next_token()
+    - the common tokens are matched in a tight loop over the buffer, the tokenizer only handles the rest,
+      like escaped strings, refilling the buffer, and the end of the source
+    """
+    match_token, next_token = _TOKEN.match, tokenizer.next_token
+    while True:
+        buffer, position = tokenizer.buffer, tokenizer.position
+        limit = len(buffer) if tokenizer.eof else len(buffer) - _LOOKAHEAD
+        while position < limit:
+            match = match_token(buffer, position)
+            if match is None:
+                break
+            group = match.lastindex
+            if group == 1:
+                tokenizer.position = position = match.end()                                         # kept up to date for the errors of the parser
+                yield match.group(1), None
+            elif group == 2:
+                tokenizer.position = position = match.end()
+                yield "string", match.group(2)
+            elif group == 6:
+                tokenizer.position = position = match.end()
+                yield "value", _LITERAL_VALUES[match.group(6)]
+            elif len(buffer) - match.end() > 2 or tokenizer.eof:                                    # otherwise the number may continue in the next chunk
+                tokenizer.position = position = match.end()
+                integer, fraction, exponent = match.group(3, 4, 5)
+                yield "value", (float(integer + (fraction or "") + (exponent or "")) if fraction or exponent else int(integer))
+            else:
+                break
+        token = next_token()
+        yield token
+        if token[0] is None:
+            return
+
+
+def iter_json_events(source:object, chunk_size:int=1 << 16) -> Iterator[tuple[str, object]]:
+    """
+    Reads a JSON document incrementally, as a stream of events
+    - accepts the same JSON as json.loads(), memory is proportional to the nesting depth and the longest single token
+    :param source:          str, bytes, or a file object opened in text or binary mode
+    :param chunk_size:      the number of characters or bytes to read at a time
+    :return:                iterator of (kind, value) events: SCALAR, START_MAP, KEY, END_MAP, START_SEQ or END_SEQ
+    """
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise TypeError("chunk_size must be a positive int")
+    return _events(_Tokenizer(source, chunk_size))
+
+
+def _events(tokenizer:_Tokenizer) -> Iterator[tuple[str, object]]:
+    """
+    private helper that parses the tokens of a source into events, see iter_json_events()
+    """
+    next_token = _tokens(tokenizer).__next__
+    stack = []                                                                                      # True for each open map, False for each open sequence
+    kind, value = next_token()
+    while True:
+        # the token starts a value
+        if kind == "{":
+            yield _START_MAP_EVENT
+            kind, value = next_token()
+            if kind == "}":
+                yield _END_MAP_EVENT
+            else:
+                stack.append(True)
+                if kind != "string":
+                    raise tokenizer.error("Expecting property name enclosed in double quotes")
+                yield KEY, value
+                if next_token()[0] != ":":
+                    raise tokenizer.error("Expecting ':' delimiter")
+                kind, value = next_token()
+                continue
+        elif kind == "[":
+            yield _START_SEQ_EVENT
+            kind, value = next_token()
+            if kind == "]":
+                yield _END_SEQ_EVENT
+            else:
+                stack.append(False)
+                continue
+        elif kind == "string" or kind == "value":
+            yield SCALAR, value
+        else:
+            raise tokenizer.error("Expecting value")
+
+        # the value is complete, close any containers it completes, up to the start of the next value
+        while True:
+            if len(stack) == 0:
+                if next_token()[0] is not None:
+                    raise tokenizer.error("Extra data")
+                return
+            kind, value = next_token()
+            if kind == ",":
+                kind, value = next_token()
+                if stack[-1]:
+                    if kind != "string":
+                        raise tokenizer.error("Expecting property name enclosed in double quotes")
+                    yield KEY, value
+                    if next_token()[0] != ":":
+                        raise tokenizer.error("Expecting ':' delimiter")
+                    kind, value = next_token()
+                break
+            if kind == "}" and stack[-1]:
+                stack.pop()
+                yield _END_MAP_EVENT
+            elif kind == "]" and not stack[-1]:
+                stack.pop()
+                yield _END_SEQ_EVENT
+            else:
+                raise tokenizer.error("Expecting ',' delimiter")
+
+
+def placeholder(event:tuple[str, object]) -> object:
+    """
+    :return:                the value of a scalar event, or an empty container of the type a start event begins
+    """
+    kind, value = event
+    if kind is START_MAP:
+        return {}
+    if kind is START_SEQ:
+        return []
+    return value
+
+
+def skip(event:tuple[str, object]) -> Generator[None, tuple, object]:
+    """
+    Consumes the events of a value without building it
+    :param event:           the first event of the value
+    :return:                the value of a scalar, or an empty container of the same type, which prints the same in a Result
+    """
+    kind = event[0]
+    if kind is not START_MAP and kind is not START_SEQ:
+        return event[1]
+    depth = 1
+    while depth > 0:
+        kind = (yield)[0]
+        if kind is START_MAP or kind is START_SEQ:
+            depth += 1
+        elif kind is END_MAP or kind is END_SEQ:
+            depth -= 1
+    return {} if event[0] is START_MAP else []
+
+
+def materialize(event:tuple[str, object]) -> Generator[None, tuple, object]:
+    """
+    Consumes the events of a value, building it
+    :param event:           the first event of the value
+    :return:                the value, as json.loads() would return it
+    """
+    kind, value = event
+    if kind is not START_MAP and kind is not START_SEQ:
+        return value
+    root = {} if kind is START_MAP else []
+    stack, key = [ root ], None
+    while len(stack) > 0:
+        kind, value = yield
+        if kind is KEY:
+            key = value
+            continue
+        if kind is END_MAP or kind is END_SEQ:
+            stack.pop()
+            continue
+        if kind is START_MAP:
+            value = {}
+        elif kind is START_SEQ:
+            value = []
+        parent = stack[-1]
+        if type(parent) is dict:
+            parent[key] = value
+        else:
+            parent.append(value)
+        if kind is not SCALAR:
+            stack.append(value)
+    return root
+
+
+def run(stream:Generator[None, tuple, object], events:Iterator[tuple[str, object]]) -> object:
+    """
+    Sends events to a consumer until it returns
+    :param stream:          the consumer, already given the first event of its value
+    :param events:          iterator of the remaining events
+    :return:                what the consumer returned
+    """
+    try:
+        stream.send(None)
+        for event in events:
+            stream.send(event)
+    except StopIteration as stop:
+        return stop.value
+    raise ValueError("Unexpected end of the events")
@@ -0,0 +1,71 @@
+# Prefix Trie
+
+from __future__ import annotations
+from typing import Iterator
+
+
+class PrefixTrie(object):
+    """
+    Trie of string prefixes that finds every prefix a string starts with in O(len(string))
+    - each prefix is added to either the case-sensitive branch, or the case-folded branch where both
+      the prefix and the strings looked up are lowercased
+    - each prefix carries a payload, the same prefix may be added more than once with different payloads
+    """
+    _END = None     # key of the list of (prefix, payload) tuples that end at a node, no character is None
+
+    def __init__(self) -> None:
+        """
+        constructor
+        """
+        self._sensitive:dict = {}
+        self._folded:dict = {}
+
+    def add(self, prefix:str, payload:object, case_sensitive:bool=True) -> None:
+        """
+        adds a prefix to the trie
+        :param prefix:          the prefix to add
+        :param payload:         the object to return when a string starts with the prefix
+        :param case_sensitive:  False to match the prefix regardless of case
+        """
+        node = self._sensitive if case_sensitive else self._folded
+        for char in (prefix if case_sensitive else prefix.lower()):
+            node = node.setdefault(char, {})
+        node.setdefault(PrefixTrie._END, []).append((prefix, payload))
+
+    @staticmethod
+    def _walk(node:dict, value:str) -> Iterator[tuple[str, object]]:
+        """
+        private helper that yields the (prefix, payload) tuples found along the path of value, shortest prefix first
+        """
+        for char in value:
+            node = node.get(char)
+            if node is None:
+                return
+            yield from node.get(PrefixTrie._END, ())
+
+    def matches(self, value:str) -> Iterator[tuple[str, object]]:
+        """
+        finds all the prefixes that a string starts with
+        :param value:           the string to look up
+        :return:                iterator of (prefix, payload) tuples, case-sensitive matches first, shortest prefix first
+        """
+        yield from PrefixTrie._walk(self._sensitive, value)
+        if len(self._folded) > 0:
+            yield from PrefixTrie._walk(self._folded, value.lower())
+
+    def first(self, value:str, default:object=None) -> object:
+        """
+        finds the payload of the first prefix that a string starts with
+        :param value:           the string to look up
+        :param default:         the value to return when no prefix matches
+        :return:                the payload of the first matching prefix, or default
+        """
+        for _prefix, payload in self.matches(value):
+            return payload
+        return default
+
+    def __bool__(self) -> bool:
+        """
+        :return:                True if any prefix has been added
+        """
+        return len(self._sensitive) > 0 or len(self._folded) > 0
@@ -1,9 +1,11 @@
 # Validator Base Class
 
 from __future__ import annotations
-from .results import Outcome, OutcomeProvider, Result, ResultSet
-from .helpers import extend_path
+from typing import Callable, Generator, Iterator
+from .results import Outcome, OutcomeProvider, Result, ResultSet, Detail, FailureBudget
+from .helpers import extend_path, Path
 from .locator import Locator
+from .stream import SCALAR, START_MAP, placeholder, skip, materialize
 
 
 class Validator(OutcomeProvider):
@@ -37,7 +39,7 @@ class Validator(OutcomeProvider):
         """
         return Or(self, other)
 
-    def validate(self, value:object, path:list[str]=None) -> Result|ResultSet:
+    def validate(self, value:object, path:Path=None) -> Result|ResultSet:
         """
         abstract validation method
         :param value:       the value to validate
@@ -46,6 +48,120 @@ class Validator(OutcomeProvider):
         """
         raise NotImplementedError(self)
 
+    def iter_validate(self, value:object, path:Path=None, context:object=None) -> Iterator[Result]:
+        """
+        validates a value, yielding its Results one at a time, in the same order as the ResultSet of validate()
+        - this default implementation iterates the results of validate(), compound validators yield their
+          results as they're produced, so only the current branch of the tree is held
+        :param value:       the value to validate
+        :param path:        list of parent keys for nested/compound structures
+        :param context:     the context validation is occurring against, only used by contextual validators
+        :return:            iterator of the Results
+        """
+        results = self.validate(value, path=path)
+        if isinstance(results, Result):
+            yield results
+        else:
+            yield from results
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a value without building any Result or ResultSet objects
+        - the answer always matches bool(validate(value)), subclasses short-circuit on the first invalid outcome
+        - this default implementation falls back on validate(), so custom validators work without overriding it
+        :param value:       the value to validate
+        :param context:     the context validation is occurring against, only used by contextual validators
+        :param path:        list of parent keys for nested/compound structures, the same as validate() is given
+        :return:            True if the value is valid
+        """
+        return bool(self.validate(value, path=path))
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result|ResultSet]:
+        """
+        compiles the validator into a closure with the signature fn(value, path, context)
+        - the compiled closure produces the same results as validate(), without the per-call dispatch
+        - this default implementation simply binds validate(), subclasses specialize it where it pays off
+        :param detail:      the results to keep, subclasses don't build the results that are dropped
+        :param budget:      counts the failures, subclasses stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        validate = self.validate
+        def compiled(value:object, path:Path=None, context:object=None) -> Result|ResultSet:
+            return validate(value, path=path)
+        return Validator._with_detail(compiled, detail, budget)
+
+    def compile_stream(self, detail:Detail=Detail.FULL) -> Callable[[tuple, Path, object], Generator[None, tuple, Result|ResultSet]]:
+        """
+        compiles the validator into a consumer of the JSON events of a value, see validdict.stream
+        - the consumer is a generator started with the value's first event, that is sent the value's remaining
+          events and returns the same results as the compiled closure, with empty containers in place of maps and sequences
+        - this default implementation builds the value from its events and validates it with compile(), unless
+          the value's type can't be accepted, subclasses validate containers without building them
+        :param detail:      the results to keep
+        :return:            the compiled consumer factory, with the signature fn(first event, path, context)
+        """
+        compiled, accepts_type = self.compile(detail), self._accepts_type
+        def stream(event:tuple, path:Path=None, context:object=None) -> Generator[None, tuple, Result|ResultSet]:
+            if event[0] is not SCALAR and accepts_type(dict if event[0] is START_MAP else list):
+                value = yield from materialize(event)
+            else:
+                value = yield from skip(event)                                                      # the value is certain to be invalid, or a scalar
+            return compiled(value, path, context)
+        return stream
+
+    @staticmethod
+    def _with_detail(compiled:Callable[[object, Path, object], Result|ResultSet], detail:Detail, budget:FailureBudget=None) -> Callable[[object, Path, object], Result|ResultSet]:
+        """
+        private helper that wraps a closure that builds every result, to drop the results the detail level doesn't keep,
+        and to count its failures against the budget
+        """
+        if detail is Detail.FULL and budget is None:
+            return compiled
+        apply = detail.apply
+        if budget is None:
+            def reduced(value:object, path:Path=None, context:object=None) -> Result|ResultSet:
+                return apply(compiled(value, path, context))
+            return reduced
+        spend = budget.spend
+        def spent(value:object, path:Path=None, context:object=None) -> Result|ResultSet:
+            return apply(spend(compiled(value, path, context)))
+        return spent
+
+    def _accepts_type(self, value_type:type) -> bool:
+        """
+        private helper that tells whether validate() could ever be valid for a value of the provided type
+        - True when it can't be decided from the type alone, which is always safe
+        :param value_type:  the exact type of the value
+        :return:            False only if every value of the type is certain to be invalid
+        """
+        return True
+
+    def _reads_path(self) -> bool:
+        """
+        private helper that tells whether is_valid() could answer differently for a value at different paths, like a callback that reads its path
+        - True when it can't be decided, which is always safe, containers only build the paths they give is_valid() when it is
+        :return:            False only if is_valid() never depends on the path
+        """
+        return True
+
+    def _accepts_shape(self, value:object) -> bool:
+        """
+        private helper that tells whether validate() could be valid for a value, from its structure alone, like the key names of a map
+        - True when it can't be decided without validating the value, which is always safe
+        :param value:       the value
+        :return:            False only if validate() is certain to be invalid for the value
+        """
+        return True
+
+    def _type_mismatch(self, value:object, path:Path=None) -> Result|ResultSet:
+        """
+        private helper that builds what validate() returns for a value of a type that _accepts_type() rejects
+        :param value:       the value of the rejected type
+        :param path:        list of parent keys for nested/compound structures
+        :return:            the invalid result, identical to the one validate() would return
+        """
+        return Result(outcome=self.invalid_outcome, value=value, path=path, validator=self)
+
     @staticmethod
     def for_value(value:object, *, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> Validator:
         """
@@ -66,26 +182,92 @@ class Or(Validator):
     """
     Represents a logical OR group of validators that can be applied to a value
     - Created when other validators are |'d together
+    - When adaptive, the sub-validators are tried in the order of how often each has been the valid one, reordered
+      every _reorder_interval valid values, but the results are the same as in declaration order: the valid
+      sub-validator declared first is the one whose results are returned
     """
+    _reorder_interval:int = 256                                                                     # the number of valid values between reorders, when adaptive
 
-    def __init__(self, *validators:Validator, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> None:
+    def __init__(self, *validators:Validator, adaptive:bool=False, valid_outcome:Outcome=Outcome.PASS, invalid_outcome:Outcome=Outcome.FAIL, comment:str="") -> None:
         """
         constructor
         :param validators:  args list of validators to add to the set
+        :param adaptive:    try the sub-validators that are valid most often first, also when any Or being flattened is adaptive
         """
         if len(validators) < 2:
             raise TypeError("Or must encapsulate at least 2 validators")
         if not all(isinstance(validator, Validator) for validator in validators):
             raise TypeError("validators must be of type Validator")
+        if not isinstance(adaptive, bool):
+            raise TypeError(f"adaptive must be of type bool (not {type(adaptive)})")
         super().__init__(
             valid_outcome=valid_outcome, invalid_outcome=invalid_outcome, comment=comment
         )
         self.validators: list[Validator] = []
         for validator in validators:
-            if isinstance(validator, Or):
+            if type(validator) is Or:                                                               # subclasses, like OneOf, validate their alternatives their own way
                 self.validators.extend(validator.validators)
+                adaptive = adaptive or validator.adaptive                                           # e.g. Or(..., adaptive=True) | Bool() stays adaptive
             else:
                 self.validators.append(validator)
+        self._labels = [ f"Or({self._get_sub_validator_repr(validator)})" for validator in self.validators ]  # path labels for the sub-validator results
+        self._dispatch:dict = {}                                                                    # value type -> tuple of (validator, label, can_accept) for every sub-validator
+        self._shape_checks = tuple(type(validator)._accepts_shape is not Validator._accepts_shape for validator in self.validators)
+        if not any(self._shape_checks):
+            self._shape_checks = ()                                                                 # flags of the sub-validators that can reject a value by its structure, if any can
+        self._paths_read = any(validator._reads_path() for validator in self.validators)          # the paths of the sub-validators are only built for is_valid() when one reads them
+        self.adaptive = adaptive
+        self._order = tuple(range(len(self.validators)))                                            # the order the sub-validators are tried in, when adaptive
+        self._hits = [ 0 ] * len(self.validators)                                                   # the number of times each sub-validator has been the valid one, halved at each reorder
+        self._hit_count = 0                                                                         # the number of valid values since the last reorder
+
+    def _alternatives(self, value_type:type) -> tuple:
+        """
+        private helper that gets the sub-validators to try for a value type, in their original order
+        - each is flagged with whether it can accept the type at all, sub-validators that can't are not
+          run, their type mismatch result is used instead
+        - sub-validators that can't be decided by type, such as callbacks, are always run
+        :param value_type:  the exact type of the value being validated
+        :return:            tuple of (validator, label, can_accept) tuples
+        """
+        alternatives = self._dispatch.get(value_type)
+        if alternatives is None:
+            alternatives = self._dispatch[value_type] = tuple(
+                (validator, label, validator._accepts_type(value_type)) for validator, label in zip(self.validators, self._labels)
+            )
+        return alternatives
+
+    def _pruned(self, value:object, alternatives:tuple) -> tuple:
+        """
+        private helper that finds the sub-validators that don't need to be run to find the valid one, because their
+        _accepts_shape() rejects the value, e.g. Map alternatives missing a required key, or without a key for one of the value's
+        - they're certain to be invalid, so they're only run when no other sub-validator is valid, to report their failures
+        - is_valid() doesn't need it, the sub-validators' own is_valid() stop at the first missing or unknown key
+        :param value:       the value being validated
+        :param alternatives: the sub-validators to try for the value's type, from _alternatives()
+        :return:            tuple of flags, True for each sub-validator that's certain to be invalid, or None when none are
+        """
+        if len(self._shape_checks) == 0:
+            return None
+        pruned = tuple(
+            can_accept and shape_check and not validator._accepts_shape(value)
+            for (validator, _label, can_accept), shape_check in zip(alternatives, self._shape_checks)
+        )
+        return pruned if any(pruned) else None
+
+    def _count_hit(self, index:int) -> None:
+        """
+        private helper that counts the valid sub-validator of an adaptive Or, and reorders the sub-validators by their hits
+        every _reorder_interval valid values, the hits are halved so the order follows the values as they change
+        :param index:       the index of the valid sub-validator
+        """
+        hits = self._hits
+        hits[index] += 1
+        self._hit_count += 1
+        if self._hit_count >= self._reorder_interval:
+            self._order = tuple(sorted(range(len(hits)), key=lambda index: -hits[index]))          # sorted() is stable, ties stay in declaration order
+            hits[:] = [ hit // 2 for hit in hits ]
+            self._hit_count = 0
 
     def _get_sub_validator_repr(self, validator: Validator) -> str:
         """
@@ -103,23 +285,209 @@ class Or(Validator):
         )
         return f"must be {validators_string}"
 
-    def validate(self, value: object, path: list[str] = None) -> ResultSet:
+    def validate(self, value: object, path: Path = None) -> ResultSet:
         """
         validates a value against two or more validators
         :param value:       the value to validate
         :param path:        list of parent keys for nested/compound structures
         :return:            validation result set, when invalid it contains all the failing results
         """
-        results = ResultSet()
-        for validator in self.validators:
-            # validate the value with the sub-validator
-            result = validator.validate(value, path=extend_path(path, f"Or({self._get_sub_validator_repr(validator)})"))
+        alternatives = self._alternatives(type(value))
+        pruned = self._pruned(value, alternatives)
+        tried = {}
+        # only the sub-validators that could be valid are run to find the valid one, in the order of their hits when adaptive,
+        # the ones that can't accept the value's type, or are ruled out by its shape, are only run to report their failures
+        for index in self._order if self.adaptive else range(len(alternatives)):
+            validator, label, can_accept = alternatives[index]
+            if not can_accept or (pruned is not None and pruned[index]):
+                continue
+            result = tried[index] = validator.validate(value, path=extend_path(path, label))
             if result:
-                # if any sub-validator passes, the overall result is valid
+                if self.adaptive:
+                    for earlier in range(index):
+                        # the valid sub-validator declared first is returned, whatever order they were tried in
+                        validator, label, can_accept = alternatives[earlier]
+                        if can_accept and earlier not in tried and (pruned is None or not pruned[earlier]) and validator.is_valid(value, None, extend_path(path, label) if self._paths_read else None):
+                            index, result = earlier, validator.validate(value, path=extend_path(path, label))
+                            break
+                    self._count_hit(index)
                 return ResultSet(Result(outcome=self.valid_outcome, value=value, path=path, validator=self), result)
-            results.add_results(result)
+        results = ResultSet()
+        for index, (validator, label, can_accept) in enumerate(alternatives):
+            if not can_accept:
+                results.add_results(validator._type_mismatch(value, path=extend_path(path, label)))
+            else:
+                results.add_results(tried[index] if index in tried else validator.validate(value, path=extend_path(path, label)))
         return ResultSet(Result(self.invalid_outcome, value=value, path=path, validator=self), results)
 
+    def iter_validate(self, value:object, path:Path=None, context:object=None) -> Iterator[Result]:
+        """
+        validates a value against two or more validators, yielding the Results as they're produced
+        - the Or result comes first, so the valid sub-validator is found with is_valid() before any results are yielded,
+          the same one validate() returns: the first one declared that's valid at its own path
+        :param value:       the value to validate
+        :param path:        list of parent keys for nested/compound structures
+        :param context:     unused, like validate() the sub-validators are not given context
+        :return:            iterator of the Results, in the same order as validate()
+        """
+        if type(self).validate is not Or.validate:
+            yield from super().iter_validate(value, path, context)
+            return
+        alternatives = self._alternatives(type(value))
+        pruned = self._pruned(value, alternatives)
+        for index, (validator, label, can_accept) in enumerate(alternatives):
+            if can_accept and (pruned is None or not pruned[index]) and validator.is_valid(value, None, extend_path(path, label) if self._paths_read else None):
+                yield Result(outcome=self.valid_outcome, value=value, path=path, validator=self)
+                yield from validator.iter_validate(value, extend_path(path, label))
+                return
+        yield Result(self.invalid_outcome, value=value, path=path, validator=self)
+        for validator, label, can_accept in alternatives:
+            if can_accept:
+                yield from validator.iter_validate(value, extend_path(path, label))
+            else:
+                yield from ResultSet(validator._type_mismatch(value, path=extend_path(path, label)))
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        checks a value against the sub-validators, stopping at the first valid one
+        :param value:       the value to validate
+        :param context:     unused, like validate() the sub-validators are not given context
+        :param path:        list of parent keys for nested/compound structures
+        :return:            True if any sub-validator is valid
+        """
+        if type(self).validate is not Or.validate:
+            return super().is_valid(value, context, path)
+        # a Result is only valid when its outcome is the valid_outcome and not also the invalid_outcome
+        paths_read = self._paths_read
+        if not self.adaptive:
+            return self.valid_outcome != self.invalid_outcome and any(
+                validator.is_valid(value, None, extend_path(path, label) if paths_read else None) for validator, label, can_accept in self._alternatives(type(value)) if can_accept
+            )
+        if self.valid_outcome == self.invalid_outcome:
+            return False
+        alternatives = self._alternatives(type(value))
+        for index in self._order:
+            validator, label, can_accept = alternatives[index]
+            if can_accept and validator.is_valid(value, None, extend_path(path, label) if paths_read else None):
+                return True                                                                         # the hits aren't counted, is_valid() also probes for iter_validate() and enclosing Ors
+        return False
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not Or.validate:
+            return super()._reads_path()
+        return self._paths_read
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], ResultSet]:
+        """
+        compiles the Or and all its sub-validators into a single closure
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not Or.validate:
+            return super().compile(detail, budget)
+        compiled_validators = [ validator.compile(detail, budget) for validator in self.validators ]
+        shape_checks = self._shape_checks or (False,) * len(self.validators)
+        dispatch = {}
+        def alternatives_for(value_type:type) -> tuple:
+            alternatives = dispatch[value_type] = tuple(
+                (label, compiled_validator if can_accept else None, validator._type_mismatch, validator._accepts_shape if can_accept and shape_check else None, validator.is_valid)
+                for (validator, label, can_accept), compiled_validator, shape_check in zip(self._alternatives(value_type), compiled_validators, shape_checks)
+            )
+            return alternatives
+        valid_result, invalid_result, apply = detail.result_factory(self.valid_outcome, self, budget), detail.result_factory(self.invalid_outcome, self, budget), detail.apply
+        adaptive, count_hit, declared, paths_read = self.adaptive, self._count_hit, range(len(self.validators)), self._paths_read
+        def compiled(value:object, path:Path=None, context:object=None) -> ResultSet:
+            alternatives = dispatch.get(type(value))
+            if alternatives is None:
+                alternatives = alternatives_for(type(value))
+            if budget is not None:
+                failures, truncated = budget.failures, budget.truncated                         # each alternative is given the same budget, only the failures of a failing Or are kept
+            tried = {}
+            for index in self._order if adaptive else declared:
+                label, alternative, _type_mismatch, accepts_shape, _is_valid = alternatives[index]
+                if alternative is None:                                                         # the sub-validator can't accept the type, its result is only built for the failures
+                    continue
+                if accepts_shape is not None and not accepts_shape(value):
+                    tried[index] = None                                                         # certain to be invalid, only run when reporting the failures
+                    continue
+                if budget is not None:
+                    budget.failures = failures
+                result = tried[index] = alternative(value, extend_path(path, label), None)      # like validate(), sub-validators get no context
+                if result:
+                    if adaptive:
+                        for earlier in range(index):                                            # the valid one declared first is returned, whatever order they were tried in
+                            label, alternative, _type_mismatch, _accepts_shape, is_valid = alternatives[earlier]
+                            if alternative is not None and earlier not in tried and is_valid(value, None, extend_path(path, label) if paths_read else None):
+                                if budget is not None:
+                                    budget.failures = failures
+                                index, result = earlier, alternative(value, extend_path(path, label), None)
+                                break
+                        count_hit(index)
+                    if budget is not None:
+                        budget.failures, budget.truncated = failures, truncated                 # a discarded alternative that stopped early doesn't truncate a valid Or
+                    return ResultSet(valid_result(value, path), result)
+            results = ResultSet()
+            for index, (label, alternative, type_mismatch, _accepts_shape, _is_valid) in enumerate(alternatives):
+                if alternative is None:
+                    results.add_results(apply(type_mismatch(value, extend_path(path, label))))
+                elif tried.get(index) is not None:
+                    results.add_results(tried[index])
+                else:
+                    if budget is not None:
+                        budget.failures = failures
+                    results.add_results(alternative(value, extend_path(path, label), None))
+            if budget is not None:
+                budget.failures = failures + results._invalid_count
+            return ResultSet(invalid_result(value, path), results)
+        return compiled
+
+    def compile_stream(self, detail:Detail=Detail.FULL) -> Callable[[tuple, Path, object], Generator[None, tuple, ResultSet]]:
+        """
+        compiles the Or into a consumer of the JSON events of a value
+        - the events can't be replayed, so every sub-validator that can accept the value's type is sent the events
+          at the same time, and the first valid one is chosen at the end, just like validate() would
+        :param detail:      the results to keep
+        :return:            the compiled consumer factory
+        """
+        if type(self).validate is not Or.validate:
+            return super().compile_stream(detail)
+        streams = [ validator.compile_stream(detail) for validator in self.validators ]
+        valid_result, invalid_result, apply = detail.result_factory(self.valid_outcome, self), detail.result_factory(self.invalid_outcome, self), detail.apply
+        def stream(event:tuple, path:Path=None, context:object=None) -> Generator[None, tuple, ResultSet]:
+            value = placeholder(event)
+            alternatives = self._alternatives(type(value))
+            outcomes, running = [ None ] * len(alternatives), []
+            for index, ((validator, label, can_accept), alternative) in enumerate(zip(alternatives, streams)):
+                if not can_accept:                                                                  # the sub-validator can't accept the type, its result is never valid
+                    outcomes[index] = apply(validator._type_mismatch(value, extend_path(path, label)))
+                    continue
+                consumer = alternative(event, extend_path(path, label), None)                       # like validate(), sub-validators get no context
+                try:
+                    consumer.send(None)
+                    running.append((index, consumer))
+                except StopIteration as stop:
+                    outcomes[index] = stop.value
+            if len(running) == 0:
+                yield from skip(event)                                                              # no sub-validator accepts the type, the value isn't needed
+            while len(running) > 0:
+                event = yield
+                still_running = []
+                for index, consumer in running:
+                    try:
+                        consumer.send(event)
+                        still_running.append((index, consumer))
+                    except StopIteration as stop:
+                        outcomes[index] = stop.value
+                running = still_running
+            results = ResultSet()
+            for result in outcomes:
+                if result:
+                    return ResultSet(valid_result(value, path), result)
+                results.add_results(result)
+            return ResultSet(invalid_result(value, path), results)
+        return stream
+
 
 class Any(Validator):
     """
@@ -133,7 +501,7 @@ class Any(Validator):
         """
         return "may be anything"
 
-    def validate(self, value: object, path: list[str] = None) -> Result:
+    def validate(self, value: object, path: Path = None) -> Result:
         """
         validates anything
         :param value:       the value to validate
@@ -142,3 +510,48 @@ class Any(Validator):
         :return:            validation result with the validation outcome
         """
         return Result(outcome=self.valid_outcome, value=value, path=path, validator=self)
+
+    def is_valid(self, value:object, context:object=None, path:Path=None) -> bool:
+        """
+        accepts anything
+        :param value:       the value to validate
+        :param context:     unused
+        :param path:        unused
+        :return:            True unless the validator's valid and invalid outcomes are the same
+        """
+        if type(self).validate is not Any.validate:
+            return super().is_valid(value, context, path)
+        return self.valid_outcome != self.invalid_outcome
+
+    def _reads_path(self) -> bool:
+        if type(self).validate is not Any.validate:
+            return super()._reads_path()
+        return False
+
+    def compile(self, detail:Detail=Detail.FULL, budget:FailureBudget=None) -> Callable[[object, Path, object], Result]:
+        """
+        compiles the validator into a closure that accepts anything
+        :param detail:      the results to keep
+        :param budget:      counts the failures, to stop once max_failures is reached
+        :return:            the compiled validation closure
+        """
+        if type(self).validate is not Any.validate:
+            return super().compile(detail, budget)
+        valid_result = detail.result_factory(self.valid_outcome, self, budget)
+        def compiled(value:object, path:Path=None, context:object=None) -> Result:
+            return valid_result(value, path)
+        return compiled
+
+    def compile_stream(self, detail:Detail=Detail.FULL) -> Callable[[tuple, Path, object], Generator[None, tuple, Result]]:
+        """
+        compiles the validator into a consumer that accepts any value, without building it
+        :param detail:      the results to keep
+        :return:            the compiled consumer factory
+        """
+        if type(self).validate is not Any.validate:
+            return super().compile_stream(detail)
+        compiled = self.compile(detail)
+        def stream(event:tuple, path:Path=None, context:object=None) -> Generator[None, tuple, Result]:
+            value = yield from skip(event)
+            return compiled(value, path, context)
+        return stream